@@ -10,6 +10,7 @@ Copyright Intel Corporation 2020
 """
 
 import json
+from functools import lru_cache
 
 SINGLE_QUOTE = "'"
 DOUBLE_QUOTE = '"'
@@ -20,12 +21,15 @@ FALSE = 'False'
 TYPE = 'ty'          # Key
 TYPE_TEXT = 't'     # Value for Text annotation
 TYPE_DELTA = 'delta'   # Value for Delta annotation
+TYPE_LINE_TO = 'line_to'   # Value for LineTo annotation (to a milestone of another program)
+TYPE_SLIP = 'slip'     # Value for Slip annotation (to a milestone of another program)
 
 ### General Keys
 TEXT = 't'
 START = 's'
 END = 'e'
 AFTER_TEXT = 'at'
+TO_PROGRAM = 'p'     # The other program of a cross program annotation
 
 
 ### TextFormat related constants
@@ -63,6 +67,10 @@ DF_WWs = 'ww'
 DF_QTR = 'q'
 DF_YRS = 'y'
 
+### Distinct cell texts whose parsed JSON is kept - the same annotation is often pasted
+### into hundreds of cells
+ANNOTATION_CACHE_SIZE = 4096
+
 
 def sq_to_dq( s ):
     return s.replace(SINGLE_QUOTE, DOUBLE_QUOTE)
@@ -104,7 +112,56 @@ def cell_to_json( c_str ):
 
     return json.loads(c_str)
 
+class NormalizedDict(dict):
+    """
+    dict whose keys were lower cased once (by normalize_keys) so an_key_in_dict
+    is a single lookup instead of a scan of every key
+    """
+    pass
+
+def normalize_keys(d):
+    """
+    Returns a NormalizedDict of d - the first of any keys differing only in case wins
+    """
+    if isinstance(d, NormalizedDict):
+        return d
+    
+    n_d = NormalizedDict()
+    for key, value in d.items():
+        if isinstance(key, str):
+            key = key.lower()
+        if key not in n_d:
+            n_d[key] = value
+    return n_d
+
+def looks_like_json_dict( text ):
+    """
+    Cheap prescreen - annotation cells are JSON dictionaries so must start with a {
+    """
+    return isinstance(text, str) and text.lstrip().startswith('{')
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def _cell_text_to_dict( text ):
+    """
+    Returns (NormalizedDict, None) or (None, error text) - errors are cached too
+    NOTE: The returned dict is shared between callers and must not be modified
+    """
+    try:
+        j = cell_to_json(c_str=text)
+    except:
+        return (None, 'Error converting to JSON: ' + text)
+    
+    if not isinstance(j, dict):
+        return (None, "Cell must be JSON dictionary")
+    
+    return (normalize_keys(j), None)
+
 def an_key_in_dict(k, d):
+    if isinstance(d, NormalizedDict):
+        if k.lower() in d:
+            return k.lower()
+        raise ValueError('Key not found'+k)
+
     for key in d.keys():
         if k.lower() == key.lower():
             return key
@@ -126,6 +183,9 @@ def is_annotation_class( obj ):
     if isinstance(obj, Delta):
         return True
     
+    if isinstance(obj, CrossProgram):
+        return True
+    
     return False
 
 """
@@ -141,6 +201,10 @@ PHASE: text between two (usually adjacent) milestones
    type':'phase', text:'text to show', 'first':{'col':} }
 
 LINE_TO: a line between (usually the previous milestone - to a milestone in another line)
+    {'ty':'line_to', 's':'A0', 'p':'Other Program', 'e':'PRQ'}
+
+SLIP: slip (in WWs) from a milestone to the matching milestone of another program
+    {'ty':'slip', 's':'A0', 'p':'Other Program', 'e':'A0'}
 """
 class TextFormat:
     def __init__(self, fill_rgb=None, line_rgb = None, line_width= None, line_dash = None,\
@@ -172,81 +236,37 @@ class TextFormat:
             'font_underline '+str(self.font_underline)+'\n'
         return s
 
-def dict_to_TextFormat(d):
-    #FILL_RGB = 'fill_rgb' 
-    try:
-        key = an_key_in_dict(FILL_RGB, j)
-        fill_rgb = text_rgb_triple(s=j[key])  
-    except:
-        fill_rgb = None
+### TextFormat keys and the conversion of their cell values (None - used as is)
+TEXT_FORMAT_CONVERTERS = [
+    (FILL_RGB, text_rgb_triple),    # Assumes '(128,128,128)' value format
+    (LINE_RGB, None),
+    (LINE_WIDTH, None),
+    (LINE_DASH, None),
+    (FONT_NAME, None),
+    (FONT_SIZE, None),
+    (FONT_RGB, text_rgb_triple),
+    (FONT_BOLD, text_to_bool),
+    (FONT_ITALIC, text_to_bool),
+    (FONT_UNDERLINE, text_to_bool),
+    ]
 
-    #LINE_RGB = 'line_rgb' 
-    try:
-        key = an_key_in_dict(LINE_RGB, j)
-        line_rgb = j[key]
-    except:
-        line_rgb = None
-    
-    #LINE_WIDTH = 'line_width'   
-    try:
-        key = an_key_in_dict(LINE_WIDTH, j)
-        line_width = j[key]
-    except:
-        line_width = None
-    
-    #LINE_DASH = 'line_dash'
-    try:
-        key = an_key_in_dict(LINE_DASH, j)
-        line_dash = j[key]
-    except:
-        line_dash = None
-    
-    #FONT_NAME = 'font_name'
-    try:
-        key = an_key_in_dict(FONT_NAME, j)
-        font_name = j[key]
-    except:
-        font_name = None
-
-    #FONT_SIZE = 'font_size'
-    try:
-        key = an_key_in_dict(FONT_SIZE, j)
-        font_size = j[key]
-    except:
-        font_size = None
-
-    #FONT_RGB = 'font_rgb
-    # Assumes '(128,128,128)' value format
-    try:
-        key = an_key_in_dict(FONT_RGB, j)
-        font_rgb = text_rgb_triple(s=j[key])   
-    except:
-        font_rgb = None
-
-    #FONT_BOLD = 'font_bold'
-    try:
-        key = an_key_in_dict(FONT_BOLD, j)
-        font_bold = text_to_bool(s=j[key])  
-    except:
-        font_bold = None
-    
-    #FONT_ITALIC = 'font_italic'
-    try:
-        key = an_key_in_dict(FONT_ITALIC, j)
-        font_italic = text_to_bool(s=j[key])  
-    except:
-        font_italic = None
-    
-    #FONT_UNDERLINE = 'font_underline'
-    try:
-        key = an_key_in_dict(FONT_UNDERLINE, j)
-        font_underline = text_to_bool(s=j[key])  
-    except:
-        font_underline= None
+def dict_to_TextFormat(d):
+    """
+    Missing keys, or values that don't convert, are left as None
+    """
+    d = normalize_keys(d)
+
+    text_format_args = {}
+    for key, convert in TEXT_FORMAT_CONVERTERS:
+        value = d.get(key)
+        if value is not None and convert is not None:
+            try:
+                value = convert(value)
+            except:
+                value = None
+        text_format_args[key] = value
     
-    return TextFormat(fill_rgb=fill_rgb, line_rgb=line_rgb, line_width=line_width, line_dash=line_dash,\
-        font_name=font_name, font_size=font_size, font_rgb=font_rgb,
-        font_bold=font_bold, font_italic=font_italic, font_underline=font_underline)
+    return TextFormat(**text_format_args)
 
 class Text:
     def __init__(self, my_col, text, milestone, text_format=None):
@@ -350,14 +370,65 @@ def json_to_Delta(my_col, j):
     return Delta(my_col=my_col, text=text, start=start, end=end, date_format=date_format, \
                 after_text=after_text, text_format=text_format)
 
-def cell_text_to_annotation( my_col, text ):
+class CrossProgram:
+    """
+    Annotation from the start milestone of this program to the end milestone of to_program
+    """
+    def __init__(self, my_col, text, start, to_program, end, text_format ):
+        self.my_col = my_col
+        self.text = text
+        self.start = start
+        self.to_program = to_program
+        self.end = end
+        self.text_format = text_format
+    
+    def to_text(self):
+        return self.text
+
+class LineTo(CrossProgram):
+    pass
+
+class Slip(CrossProgram):
+    pass
+
+def json_to_CrossProgram(cls, my_col, j):
     try:
-        j = cell_to_json(c_str=text)
+        text = an_value_for_key(k=TEXT,d=j)
     except:
-        raise ValueError('Error converting to JSON: ' + text)
+        text = ''
+
+    try:
+        start = an_value_for_key(k=START,d=j).strip()
+    except:
+        raise ValueError("Must provide "+ START + "Key")
     
-    if not isinstance(j, dict):
-        return ValueError("Cell must be JSON dictionary")
+    try:
+        to_program = an_value_for_key(k=TO_PROGRAM,d=j).strip()
+    except:
+        raise ValueError("Must provide "+ TO_PROGRAM + "Key")
+    
+    ### The same milestone of the other program if no end is given
+    try:
+        end = an_value_for_key(k=END, d=j).strip()
+    except:
+        end = start
+    
+    text_format = dict_to_TextFormat(d=j)
+
+    return cls(my_col=my_col, text=text, start=start, to_program=to_program, end=end, \
+        text_format=text_format)
+
+def cell_text_to_annotation( my_col, text ):
+    """
+    Each distinct cell text is only parsed once (see _cell_text_to_dict) - a new
+    annotation object is still returned for each call
+    """
+    if not looks_like_json_dict(text):
+        raise ValueError('Not a JSON dictionary: ' + str(text))
+
+    j, error_text = _cell_text_to_dict(text)
+    if j is None:
+        raise ValueError(error_text)
     
     try:
         t = an_value_for_key(k=TYPE, d=j)
@@ -375,6 +446,12 @@ def cell_text_to_annotation( my_col, text ):
     if t == TYPE_MILESTONE.lower():
         return json_to_Milestone(my_col=my_col, j=j)
     
+    if t == TYPE_LINE_TO.lower():
+        return json_to_CrossProgram(cls=LineTo, my_col=my_col, j=j)
+    
+    if t == TYPE_SLIP.lower():
+        return json_to_CrossProgram(cls=Slip, my_col=my_col, j=j)
+    
     print("Found JSON: but did not match: ", my_col, text)
 
     raise ValueError('Valid JSON -> No Valid Annotation: ' + text)
@@ -0,0 +1,117 @@
+"""
+bench_emit.py
+
+Shapes/sec of the ways a roadmap slide's shapes can be drawn:
+
+    add_*       add_rounded_rectangle_marker / add_text_box for every shape
+    add_* ids   add_* inside a roadmap_emitter.allocating_shape_ids block (as render_roadmap_slide does)
+    scene       a roadmap_scene.Scene emitted through python-pptx (emit_scene fast=False)
+    prototype   the same scene emitted by copying prototype XML (emit_scene fast=True)
+
+    python bench_emit.py -n 2000
+"""
+
+from contextlib import nullcontext
+import time
+
+import click
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.util import Pt
+
+import roadmap_emitter as rem
+import roadmap_pptx as rp
+import roadmap_scene as scn
+
+NUMBER_OF_SHAPES = 'number_of_shapes'
+REPEATS = 'repeats'
+
+### Roughly what a program row is made of - bar, milestone markers and their labels
+MILESTONES_PER_ROW = 4
+FILLS = [RGBColor(0,113,197), RGBColor(0,174,239), RGBColor(255,192,0), RGBColor(128,0,0)]
+
+def shape_specs(number_of_shapes):
+    """
+    (is text box, left_cm, top_cm, width_cm, text, style arguments) for number_of_shapes shapes
+    """
+    specs = []
+    row = 0
+    while len(specs) < number_of_shapes:
+        top_cm = 2.0 + (row % 30) * 0.5
+        specs.append((False, 1.0, top_cm, 20.0, None, {'line_rgb':RGBColor(0,0,0), 'font_bold':True}))
+        for m in range(MILESTONES_PER_ROW):
+            left_cm = 2.0 + m * 4.0
+            specs.append((False, left_cm, top_cm, 0.6, f"M{m}", {'fill_rgb':FILLS[m], 'line_rgb':None, \
+                'font_size':Pt(8)}))
+            specs.append((True, left_cm + 0.7, top_cm, 1.5, f"WW{row % 52 + 1}", {'font_size':Pt(8)}))
+        row = row + 1
+    return specs[:number_of_shapes]
+
+def new_shapes():
+    pptx = Presentation()
+    return pptx.slides.add_slide(pptx.slide_layouts[6]).shapes
+
+def draw_add(specs, allocate_ids=False):
+    shapes = new_shapes()
+    with rem.allocating_shape_ids(shapes) if allocate_ids else nullcontext():
+        for is_text_box, left_cm, top_cm, width_cm, text, style_args in specs:
+            if is_text_box:
+                rp.add_text_box(shapes=shapes, left_cm=left_cm, top_cm=top_cm, width_cm=width_cm, \
+                    height_cm=0.4, text=text, **style_args)
+            else:
+                rp.add_rounded_rectangle_marker(shapes=shapes, left_cm=left_cm, top_cm=top_cm, \
+                    width_cm=width_cm, height_cm=0.4, text=text, **style_args)
+    return shapes
+
+def draw_add_ids(specs):
+    return draw_add(specs, allocate_ids=True)
+
+def layout_scene(specs):
+    scene = scn.Scene()
+    for is_text_box, left_cm, top_cm, width_cm, text, style_args in specs:
+        style_id = rp.shape_style_id(**style_args)
+        if is_text_box:
+            scene.add_text_box(left_cm=left_cm, top_cm=top_cm, width_cm=width_cm, height_cm=0.4, \
+                text=text, style_id=style_id)
+        else:
+            scene.add_shape(mso_shape=MSO_SHAPE.ROUNDED_RECTANGLE, left_cm=left_cm, top_cm=top_cm, \
+                width_cm=width_cm, height_cm=0.4, adjustments=[1.0], text=text, style_id=style_id)
+    return scene
+
+def draw_scene(specs):
+    shapes = new_shapes()
+    with rem.allocating_shape_ids(shapes):
+        return rp.emit_scene(scene=layout_scene(specs), shapes=shapes, fast=False)
+
+def draw_prototype(specs):
+    shapes = new_shapes()
+    with rem.allocating_shape_ids(shapes):
+        ### New emitter every time so building the prototypes is part of the time
+        return rem.PrototypeEmitter().emit(scene=layout_scene(specs), shapes=shapes, \
+            emit_primitive=rp.emit_primitive)
+
+def time_it(draw, specs, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        shapes = draw(specs)
+        seconds = time.perf_counter() - start
+        assert len(shapes) == len(specs)
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+@click.command()
+@click.option('-n', NUMBER_OF_SHAPES, type=int, default=2000, help='Shapes per slide')
+@click.option('-r', REPEATS, type=int, default=3, help='Best of this many runs')
+def bench_emit(number_of_shapes, repeats):
+    specs = shape_specs(number_of_shapes)
+    baseline = None
+    for name, draw in [('add_*', draw_add), ('add_* ids', draw_add_ids), ('scene', draw_scene), \
+        ('prototype', draw_prototype)]:
+        seconds = time_it(draw, specs, repeats)
+        baseline = seconds if baseline is None else baseline
+        print(f"{name:>10}: {number_of_shapes/seconds:10.0f} shapes/sec {seconds:8.3f}s  x{baseline/seconds:0.1f}")
+
+if __name__ == '__main__':
+    bench_emit()
@@ -182,6 +182,13 @@ class WW:
     def contains(self, date_time):
         return self._isoweek.contains(date_time)
     
+    def ordinal(self):
+        """
+        Consecutive week number (week 1 is the first week of year 1 AD) - handy for
+        vectorized comparisons and array indexing of WWs
+        """
+        return self._isoweek.toordinal()
+    
     def to_datetime(self, day_dot=1):
         """
         Leverages isoweek
@@ -256,6 +263,9 @@ def WW_from_isoweek( iso_week, dot_day=1 ):
     date_time = iso_week.day(dot_day-1)
     return WW_from_date(date_field=date_time)
 
+def WW_from_ordinal( ordinal ):
+    return WW_from_isoweek(Week.fromordinal(ordinal))
+
 def WW_from_string( ww_string, quarter_treatment= 0.5):
     """
     ww_string -  WWww:yy or Qn'yy or YYYYwwWW
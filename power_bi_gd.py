@@ -5,6 +5,7 @@ functions that allow access to Marcu's version of the Atlas Golden Doc
 """
 import pandas as pd
 import intel_ww as iw
+import roadmap_helper as rh
 from numpy import nan
 
 BUSINESS = 'Business'.replace(' ','')
@@ -69,21 +70,26 @@ def types( df, type_col = TYPE):
     return list(df[type_col].unique())
 
 def children_names_from_str( names ):
-    try:
-        children = [s[1:].strip() for s in names.split('\n')]
-        return children
-    except:
+    if not isinstance(names, str):
         return None
+    ### Child names here have no "Type:" prefix - any ':' is part of the name
+    return list(rh.parse_name_id_cells(pd.Series([names]), type_prefix=False)[rh.CELL_NAME])
 
 def populate_earliest_ti_from_children( df, which_type=SI_PRODUCT, type_col=TYPE, date_cols = [A0_TI]):
-    for _, row in df.loc[df[type_col] == which_type].iterrows():
-        children = children_names_from_str(row[CHILD_COMPONENTS])
+    si_rows = df.loc[df[type_col] == which_type]
+
+    ### Parse every child component cell once up front
+    children = rh.parse_name_id_cells(si_rows[CHILD_COMPONENTS], type_prefix=False)
+    children_by_row = children.groupby(rh.CELL_ROW, sort=False)[rh.CELL_NAME].apply(list)
+
+    for i, row in si_rows.iterrows():
+        names = children_by_row.get(i, [])
 
         for col in date_cols:
             current_ww = iw.WW_from_string(ww_string=row[col])
             if current_ww is not None:
                 continue
-            for name in children:
+            for name in names:
                 name_ww_str = df.loc[df[FULL_NAME_IN_SPEEDATLAS] == name, col ].values[0]
                 name_ww = iw.WW_from_string(ww_string=name_ww_str)
                 if name_ww is None:
@@ -7,7 +7,10 @@ render differently formated roadmaps onto the roadmap_pptx.py presentations
 
 ###
 from collections import OrderedDict
+import numpy as np
 from pptx import Presentation
+from pptx.enum.text import PP_ALIGN
+from pptx.util import Pt
 
 import intel_roadmap as ir
 import intel_ww as iw
@@ -16,60 +19,126 @@ import roadmap_table as rt
 import roadmap_helper as rh
 import roadmap_pptx as rp
 import annotations as an
+import roadmap_annotations as ra
+import roadmap_emitter as rem
+import roadmap_template as rtm
 
 
 NOT_PROVIDED = "???"
 PROG_PROG_VERT_DISTANCE_CM = 0.5
+TITLE_HEIGHT_CM = 1.0
+TITLE_FONT_SIZE = Pt(20)
 
 def render_swimlanes_and_qts(roadmap_slide, roadmap_canvas, swimlane_table ):
     roadmap_canvas.render_yrs_qts_table(shapes=roadmap_slide.slide.shapes)
     swimlane_table.render_swimlanes_table(shapes=roadmap_slide.slide.shapes)
 
+def window_mask( roadmap_table, roadmap_canvas, milestone_columns, align_zero=False ):
+    """
+    Boolean mask of the roadmap_table rows that could appear inside the canvas window
+    (or None if every row has to be rendered - align_zero positions are relative)
+    """
+    if align_zero:
+        return None
+    
+    return roadmap_table.window_mask(start_ww=roadmap_canvas.grid.left_edge_ww,\
+        end_ww=roadmap_canvas.grid.right_edge_ww, milestone_columns=milestone_columns)
+
 def render_roadmap( roadmap_slide, roadmap_configuration, roadmap_table, \
-    swimlane_table, align_zero=False ):
+    swimlane_table, align_zero=False, pack=False ):
     
     """
     Returns simple_name_dict
+
+    With pack=True the programs in a swimlane share sub-rows when their bars don't
+    overlap (roadmap_pptx.pack_intervals) and the swimlane table rows are sized to
+    their packed sub-row counts - so the swimlane table has to be rendered afterwards
     """
     if not roadmap_table.is_concept_format:
 
         ### Holds Program Informations based on simple name - useful to know where they were rendered
         shorthand_name_dict = {}   
+
+        ### Cull the products that are entirely outside the canvas window up front
+        in_window = window_mask(roadmap_table=roadmap_table, roadmap_canvas=roadmap_slide.roadmap_canvas,\
+            milestone_columns=roadmap_configuration.milestones.values(), align_zero=align_zero)
         
+        lanes = []
         for biz in roadmap_table.business_list():
             for ss in roadmap_table.simple_segment_list(business=biz):
-                rows = roadmap_table.by_type_simplesegment(business=biz, simple_segment=ss, type_name=rt.SI_PRODUCT )
+                mask = roadmap_table.mask_for_col_tuples(col_tuples=[(rt.BUSINESS, biz), \
+                    (rt.SIMPLESEGMENT, ss), (rt.TYPE, rt.SI_PRODUCT)])
+                if in_window is not None:
+                    mask = mask & in_window
+                rows = roadmap_table.df.iloc[np.flatnonzero(mask)]
                 
                 if rows.shape[0] == 0:
                     continue
                 
-                row_count = 0
+                try:
+                    row_index = swimlane_table.grid.row_index_for_business_segment(business_name=biz, \
+                        segment_name=ss)
+                except:
+                    print('Skipping:',biz, ss)
+                    continue
                 
+                programs = []
                 for i, row in rows.iterrows():
-                    try:
-                        y_offset = swimlane_table.y_value_in_cm_for_segment(business=biz, segment=ss)
-                    except:
-                        print('Skipping:',biz, ss)
-                        continue
-                    
-                    pi = rp.rt_to_ProgramInformation(roadmap_table=roadmap_table, roadmap_configuration=roadmap_configuration,\
-                        shorthand_name=row[rt.SHORTHAND_NAME], from_roadmap_top_cm=y_offset + (row_count * PROG_PROG_VERT_DISTANCE_CM),\
-                            missing_ms=NOT_PROVIDED)
-                    
-                    ### Note - the render program function actually updates each of the
-                    ### milestones with x axis information about where they were rendered.
-                    pi = roadmap_slide.render_program(program_information=pi, align_zero=align_zero)               
-                    
-                    shorthand_name_dict[pi.shorthand_name] = pi
-
-                    row_count = row_count + 1
+                    programs.append(rp.rt_to_ProgramInformation(roadmap_table=roadmap_table, \
+                        roadmap_configuration=roadmap_configuration, shorthand_name=row[rt.SHORTHAND_NAME], \
+                        from_roadmap_top_cm=0.0, missing_ms=NOT_PROVIDED))
+                lanes.append((row_index, programs))
+        
+        for pi in render_lanes(roadmap_slide=roadmap_slide, swimlane_table=swimlane_table, lanes=lanes, \
+            align_zero=align_zero, pack=pack):
+            shorthand_name_dict[pi.shorthand_name] = pi
         
     else:
         shorthand_name_dict = render_roadmap_concept(roadmap_slide=roadmap_slide, roadmap_configuration=roadmap_configuration,\
-            roadmap_table=roadmap_table, swimlane_table=swimlane_table, align_zero=align_zero)
+            roadmap_table=roadmap_table, swimlane_table=swimlane_table, align_zero=align_zero, pack=pack)
     
     return shorthand_name_dict
 
+def lane_sub_rows( roadmap_slide, programs, align_zero=False, pack=False ):
+    """
+    Sub-row of each program in a swimlane - one each in order, or packed
+
+    returns (list of sub-rows, number of sub-rows)
+    """
+    if not pack:
+        return (list(range(len(programs))), len(programs))
+    
+    extents = [roadmap_slide.program_extent_cm(program_information=pi, align_zero=align_zero) \
+        for pi in programs]
+    return rp.pack_intervals(extents, gap=rp.PACK_GAP_CM)
+
+def render_lanes( roadmap_slide, swimlane_table, lanes, align_zero=False, pack=False ):
+    """
+    Renders the programs of each (swimlane table row index, [ProgramInformation, ...]) lane
+
+    returns the rendered ProgramInformations
+    """
+    lane_rows = [lane_sub_rows(roadmap_slide=roadmap_slide, programs=programs, align_zero=align_zero, \
+        pack=pack) for row_index, programs in lanes]
+    
+    if pack:
+        lane_row_counts = {}
+        for (row_index, programs), (sub_rows, row_count) in zip(lanes, lane_rows):
+            lane_row_counts[row_index] = max(row_count, lane_row_counts.get(row_index, 0))
+        swimlane_table.size_lanes(lane_row_counts)
+    
+    rendered = []
+    for (row_index, programs), (sub_rows, row_count) in zip(lanes, lane_rows):
+        y_offset = swimlane_table.row_top_cm(row_index)
+        for pi, sub_row in zip(programs, sub_rows):
+            pi.from_roadmap_top_cm = y_offset + (sub_row * PROG_PROG_VERT_DISTANCE_CM)
+            
+            ### Note - the render program function actually updates each of the
+            ### milestones with x axis information about where they were rendered.
+            rendered.append(roadmap_slide.render_program(program_information=pi, align_zero=align_zero))
+    
+    return rendered
+
 def add_to_ordered_dict(d, key1, key2, key3, obj):
     if key1 not in d.keys():
         d[key1] = OrderedDict()
@@ -82,7 +151,7 @@ def add_to_ordered_dict(d, key1, key2, key3, obj):
 
 def render_roadmap_concept( roadmap_slide, roadmap_configuration, roadmap_table, \
 
-    swimlane_table, align_zero=False ):
+    swimlane_table, align_zero=False, pack=False ):
 
    #major_col_in_df_name = roadmap_configuration.roadmap_columns[roadmap_configuration.major_column_name]
     #minor_col_in_df_name = roadmap_configuration.roadmap_columns[roadmap_configuration.minor_column_name]
@@ -93,7 +162,15 @@ def render_roadmap_concept( roadmap_slide, roadmap_configuration, roadmap_table,
     product_name_col_in_df = roadmap_configuration.name_col
             
     shorthand_name_dict = {}   
+
+    ### Every column that isn't part of the swimlane naming can hold a milestone
+    milestone_columns = [c for c in roadmap_table.df.columns if c not in \
+        [major_col_in_df_name, minor_col_in_df_name, product_name_col_in_df]]
+    in_window = window_mask(roadmap_table=roadmap_table, roadmap_canvas=roadmap_slide.roadmap_canvas,\
+        milestone_columns=milestone_columns, align_zero=align_zero)
     
+    lanes = []
+    lane_keys = []
     for major_key in roadmap_configuration.swimlanes_hierarchy.keys():
         print(major_key)
         for minor_key in roadmap_configuration.swimlanes_hierarchy[major_key]:
@@ -102,72 +179,156 @@ def render_roadmap_concept( roadmap_slide, roadmap_configuration, roadmap_table,
             major_minor_tuples = [ (major_col_in_df_name,[major_key]),\
                 (minor_col_in_df_name,[minor_key]) ]
             
-            rows = roadmap_table.rows_isin_col_tuples(col_tuples=major_minor_tuples)
+            mask = roadmap_table.mask_for_col_tuples(col_tuples=major_minor_tuples, op=rt.OP_ISIN)
+            if in_window is not None:
+                mask = mask & in_window
+            rows = roadmap_table.df.iloc[np.flatnonzero(mask)]
 
             if rows.shape[0] == 0:
                     continue
             
-            row_count = 0
-                
+            try:
+                row_index = swimlane_table.grid.row_index_for_major_column_minor_column(major_value=major_key, \
+                    minor_value=minor_key)
+            except:
+                print('Skipping:', major_key, minor_key)
+                continue
+            
+            programs = []
             for i, row in rows.iterrows():
                 print(row[major_col_in_df_name], row[minor_col_in_df_name], \
                     row[product_name_col_in_df])
-                try:
-                    y_offset = \
-                        swimlane_table.y_value_in_cm_for_major_column_minor_column(major_value=row[major_col_in_df_name], \
-                            minor_value=row[minor_col_in_df_name])
-                except:
-                    print('Skipping:',row[major_col_in_df_name], row[minor_col_in_df_name], \
-                        row[product_name_col_in_df])
-                    continue
                 
                 pi = rp.concept_rt_to_ProgramInformation(major_value=major_key, minor_value=minor_key,\
                     name=row[product_name_col_in_df], my_row=row, roadmap_configuration=roadmap_configuration,\
-                     from_roadmap_top_cm=y_offset + (row_count * PROG_PROG_VERT_DISTANCE_CM),\
-                        missing_ms=NOT_PROVIDED)
+                     from_roadmap_top_cm=0.0, missing_ms=NOT_PROVIDED)
                 
                 print('+++++', [str(m) for m in pi.milestones])
                 print('-----', pi.annotations())
-                
-                ### Note - the render program function actually updates each of the
-                ### milestones with x axis information about where they were rendered.
-                pi = roadmap_slide.render_program(program_information=pi, align_zero=align_zero)               
-                
-                shorthand_name_dict = add_to_ordered_dict(shorthand_name_dict,major_key,minor_key,pi.shorthand_name, pi)
-
-                row_count = row_count + 1
+                programs.append(pi)
+            
+            lanes.append((row_index, programs))
+            lane_keys.append((major_key, minor_key))
+    
+    rendered = render_lanes(roadmap_slide=roadmap_slide, swimlane_table=swimlane_table, lanes=lanes, \
+        align_zero=align_zero, pack=pack)
+    
+    ### render_lanes returns the programs lane by lane
+    lane_of_program = [key for key, (row_index, programs) in zip(lane_keys, lanes) for pi in programs]
+    for (major_key, minor_key), pi in zip(lane_of_program, rendered):
+        shorthand_name_dict = add_to_ordered_dict(shorthand_name_dict,major_key,minor_key,pi.shorthand_name, pi)
         
     return shorthand_name_dict
 
-def render_annotations( shorthand_name_dict, roadmap_slide, roadmap_canvas, align_zero=False ):
-    for key1, major in shorthand_name_dict.items():
-        for key2, minor in major.items():
-            for key3, pi in minor.items():
-                print('>>>>>>>>', key3, pi.annotations())
-                roadmap_slide.render_annotations(pi=pi, all_pis_dict=shorthand_name_dict)
+def render_annotations( shorthand_name_dict, roadmap_slide, roadmap_canvas, align_zero=False, \
+    annotation_store=None ):
+    """
+    Compiles (and validates) every annotation up front then draws them
+
+    returns the list of roadmap_annotations.AnnotationError found
+    """
+    compiled = ra.compile_annotations(programs=ra.programs_list(shorthand_name_dict), \
+        annotation_store=annotation_store)
+    for error in compiled.errors:
+        print('Annotation error:', error)
     
+    ra.render_records(roadmap_slide=roadmap_slide, compiled=compiled, align_zero=align_zero)
+    return compiled.errors
 
-def render_roadmap_from_paths(golden_doc_path, roadmap_helper_path, roadmap_config_path, \
-    roadmap_template_path, start_ww, end_ww, roadmap_title=None, \
-        roadmap_top_cm=1.5, roadmap_height_cm=16.5, input_slide_index=0, \
-            align_zero=False ):
+def layout_programs( roadmap_configuration, roadmap_table ):
+    """
+    Program informations for every row of the roadmap table - without rendering or
+    culling to a canvas window. Rows that can't be turned into a program are returned
+    as roadmap_annotations.AnnotationErrors
+
+    returns (programs, errors)
+    """
+    programs = []
+    errors = []
+    if roadmap_table.is_concept_format:
+        major_col = roadmap_configuration.major_column_name
+        minor_col = roadmap_configuration.minor_column_name
+        name_col = roadmap_configuration.name_col
+        for i, row in roadmap_table.df.iterrows():
+            try:
+                programs.append(rp.concept_rt_to_ProgramInformation(major_value=row[major_col], \
+                    minor_value=row[minor_col], name=row[name_col], my_row=row, \
+                    roadmap_configuration=roadmap_configuration, from_roadmap_top_cm=0.0, \
+                    missing_ms=NOT_PROVIDED))
+            except Exception as e:
+                errors.append(ra.AnnotationError(source=f"row {i}", program_name=row[name_col], \
+                    message=str(e)))
+    else:
+        rows = roadmap_table.rows_matching_col_tuples([(rt.TYPE, rt.SI_PRODUCT)])
+        for shorthand_name in rows[rt.SHORTHAND_NAME]:
+            try:
+                programs.append(rp.rt_to_ProgramInformation(roadmap_table=roadmap_table, \
+                    roadmap_configuration=roadmap_configuration, shorthand_name=shorthand_name, \
+                    from_roadmap_top_cm=0.0, missing_ms=NOT_PROVIDED))
+            except Exception as e:
+                errors.append(ra.AnnotationError(source=rt.SHORTHAND_NAME, program_name=shorthand_name, \
+                    message=str(e)))
     
-    if golden_doc_path is not None:
-        ### Read roadmap information from "golden doc" and helper files
-        roadmap_table = rt.RoadmapTable(path_to_roadmap=golden_doc_path, \
-            path_to_helper_file=roadmap_helper_path)
+    return (programs, errors)
+
+def validate_roadmap_from_paths( golden_doc_path, roadmap_helper_path, roadmap_config_path, \
+    roadmap_config=None ):
+    """
+    Fail fast check of every program and annotation without rendering anything
+
+    returns the list of roadmap_annotations.AnnotationError found
+    """
+    if roadmap_config is None:
+        r_c = rc.load_roadmap_config(roadmap_config_path)
     else:
-        raise ValueError("Must provide valid golden_doc_path")
+        r_c = roadmap_config
+    
+    roadmap_table = rt.RoadmapTable(path_to_roadmap=golden_doc_path, \
+        path_to_helper_file=roadmap_helper_path, column_projection=r_c.column_projection())
+    
+    programs, errors = layout_programs(roadmap_configuration=r_c, roadmap_table=roadmap_table)
+    compiled = ra.compile_annotations(programs=programs, \
+        annotation_store=roadmap_table.annotation_store())
+    
+    return errors + compiled.errors
 
+def load_roadmap_table( golden_doc_path, roadmap_helper_path, roadmap_configuration ):
+    """
+    Reads the roadmap table (and helper) - only the columns the configuration refers to
+    """
+    if golden_doc_path is None:
+        raise ValueError("Must provide valid golden_doc_path")
     
-    print(roadmap_table.annotations_list())
+    return rt.RoadmapTable(path_to_roadmap=golden_doc_path, path_to_helper_file=roadmap_helper_path, \
+        column_projection=roadmap_configuration.column_projection())
+
+def render_title( roadmap_slide, title, roadmap_top_cm ):
+    """
+    Title in the slide's title placeholder or - without one - above the roadmap
+    """
+    if title is None:
+        return
     
-    #roadmap_table.df.to_excel('/Users/scotttan/Intel Corporation/Graphics Golden Doc Development - RoadmapPPTGeneration/ElastiScenarios/OutputAfterFixUp.xlsx')
+    if roadmap_slide.slide.shapes.title is not None:
+        roadmap_slide.slide.shapes.title.text = title
+        return
     
-    ### Read in the roadmap input parsing and output configuration information
-    r_c = rc.RoadmapConfig(roadmap_config_path)
-    print(r_c.swimlanes_hierarchy)
+    cac = roadmap_slide.roadmap_canvas
+    rp.add_text_box(shapes=roadmap_slide.shapes, left_cm=cac.canvas_left_edge_cm, \
+        top_cm=max(0.0, roadmap_top_cm - TITLE_HEIGHT_CM), width_cm=cac.canvas_width_cm, \
+        height_cm=TITLE_HEIGHT_CM, text=title, text_align=PP_ALIGN.LEFT, font_size=TITLE_FONT_SIZE, \
+        font_bold=True)
+
+def render_roadmap_slide( slide, roadmap_configuration, roadmap_table, start_ww, end_ww, \
+    roadmap_top_cm=1.5, roadmap_height_cm=16.5, align_zero=False, pack=False, title=None ):
+    """
+    Renders one roadmap (canvas, swimlanes, programs and annotations) onto slide with
+    an already loaded roadmap table
 
+    returns the RoadmapSlide
+    """
+    r_c = roadmap_configuration
+    
     ### Create the rendering canvas 
     cag = rp.CanvasGrid(start_ww=start_ww,end_ww=end_ww)
     cac = rp.RoadmapCanvas(grid=cag, canvas_top_cm=roadmap_top_cm, canvas_height_cm=roadmap_height_cm)
@@ -175,34 +336,105 @@ def render_roadmap_from_paths(golden_doc_path, roadmap_helper_path, roadmap_conf
     ### Create the swimlane grid and table
     slg = rp.SwimlanesGrid(hierarchy=r_c.swimlanes_hierarchy, \
         major_column_name=r_c.major_column_name,\
-        minor_column_name=r_c.minor_column_name)
+        minor_column_name=r_c.minor_column_name, row_index=r_c.swimlane_row_index)
         
     slt = rp.SwimlaneTable(grid=slg,table_top_cm=cac.top_of_draw_area,\
         table_left_edge_cm=0.0, table_height_cm=cac.draw_area_height)
 
-    ## Read in the presentation
-    pptx = Presentation(roadmap_template_path)
-
     ## Create the RoadmapSlide object so we can render onto it
-    rs = rp.RoadmapSlide(slide=pptx.slides[input_slide_index],roadmap_canvas=cac,\
+    rs = rp.RoadmapSlide(slide=slide,roadmap_canvas=cac,\
         roadmap_top_cm=roadmap_top_cm)
 
-    render_swimlanes_and_qts(roadmap_slide=rs, roadmap_canvas=cac, swimlane_table=slt)
+    ### Every shape added to the slide while rendering gets its id from one allocator
+    with rem.allocating_shape_ids(rs.shapes):
+        shorthand_name_dict= render_roadmap(roadmap_slide=rs, roadmap_configuration=r_c,\
+             roadmap_table=roadmap_table, swimlane_table=slt,align_zero=align_zero, pack=pack)
 
-    shorthand_name_dict= render_roadmap(roadmap_slide=rs, roadmap_configuration=r_c,\
-         roadmap_table=roadmap_table, swimlane_table=slt,align_zero=align_zero)
-        
-    #for key, value in shorthand_name_dict.items():
-    #    print('-'*2,key)
-    #    for ms in value.milestones:
-    #        print('-'*4,f"{ms.marker_left_cm:f2.2}", end='')
-    #        print('-'*4,f"{ms.marker_width_cm:f2.2}")
+        ### After render_roadmap - packing sizes the swimlane rows (programs are only emitted
+        ### later so they still end up on top of the tables)
+        render_swimlanes_and_qts(roadmap_slide=rs, roadmap_canvas=cac, swimlane_table=slt)
+        render_title(roadmap_slide=rs, title=title, roadmap_top_cm=roadmap_top_cm)
+            
+        render_annotations(shorthand_name_dict=shorthand_name_dict,roadmap_slide=rs,\
+            roadmap_canvas=r_c, align_zero=align_zero, annotation_store=roadmap_table.annotation_store())
+
+        ### Programs, milestones and annotations were only laid out so far
+        rs.emit()
+
+    return rs
+
+def render_roadmap_from_paths(golden_doc_path, roadmap_helper_path, roadmap_config_path, \
+    roadmap_template_path, start_ww, end_ww, roadmap_title=None, \
+        roadmap_top_cm=1.5, roadmap_height_cm=16.5, input_slide_index=0, \
+            align_zero=False, roadmap_config=None, pack=False ):
+    
+    ### Read in the roadmap input parsing and output configuration information
+    ### (an already compiled roadmap_config is used as is)
+    if roadmap_config is None:
+        r_c = rc.load_roadmap_config(roadmap_config_path)
+    else:
+        r_c = roadmap_config
+
+    print(r_c.swimlanes_hierarchy)
+
+    ### Read roadmap information from "golden doc" and helper files
+    roadmap_table = load_roadmap_table(golden_doc_path=golden_doc_path, \
+        roadmap_helper_path=roadmap_helper_path, roadmap_configuration=r_c)
     
-    render_annotations(shorthand_name_dict=shorthand_name_dict,roadmap_slide=rs,\
-        roadmap_canvas=r_c, align_zero=align_zero)
+    print(roadmap_table.annotations_list())
+
+    ## Copy of the presentation (the template is only read and parsed once per process)
+    pptx = rtm.TEMPLATES.presentation(roadmap_template_path)
+
+    render_roadmap_slide(slide=pptx.slides[input_slide_index], roadmap_configuration=r_c, \
+        roadmap_table=roadmap_table, start_ww=start_ww, end_ww=end_ww, roadmap_top_cm=roadmap_top_cm, \
+        roadmap_height_cm=roadmap_height_cm, align_zero=align_zero, pack=pack, title=roadmap_title)
+
+    return pptx
 
+def render_deck( pptx, slide_specs, roadmap_configuration, roadmap_table, roadmap_top_cm=1.5, \
+    roadmap_height_cm=16.5, input_slide_index=0 ):
+    """
+    Renders a roadmap_deck.SlideSpec per slide - the first onto the input slide and the
+    rest onto copies of it, placed right after it
+
+    returns pptx
+    """
+    base_slide = pptx.slides[input_slide_index]
+    ### Copied before anything is drawn on the input slide
+    slides = [base_slide] + [rtm.duplicate_slide(pptx, base_slide, index=input_slide_index + i) \
+        for i in range(1, len(slide_specs))]
+    
+    for slide, spec in zip(slides, slide_specs):
+        print('Rendering', spec)
+        render_roadmap_slide(slide=slide, roadmap_configuration=roadmap_configuration.with_swimlanes(spec.swimlanes), \
+            roadmap_table=roadmap_table, start_ww=spec.start_ww, end_ww=spec.end_ww, \
+            roadmap_top_cm=roadmap_top_cm, roadmap_height_cm=roadmap_height_cm, \
+            align_zero=spec.align_zero, pack=spec.pack, title=spec.title)
+    
     return pptx
 
+def render_deck_from_paths( golden_doc_path, roadmap_helper_path, roadmap_config_path, \
+    roadmap_template_path, slide_specs, roadmap_top_cm=1.5, roadmap_height_cm=16.5, \
+        input_slide_index=0, roadmap_config=None ):
+    """
+    Every slide of slide_specs in one presentation - the configuration, roadmap table and
+    template are loaded once and shared by all the slides
+    """
+    if roadmap_config is None:
+        r_c = rc.load_roadmap_config(roadmap_config_path)
+    else:
+        r_c = roadmap_config
+    
+    roadmap_table = load_roadmap_table(golden_doc_path=golden_doc_path, \
+        roadmap_helper_path=roadmap_helper_path, roadmap_configuration=r_c)
+    
+    pptx = rtm.TEMPLATES.presentation(roadmap_template_path)
+    
+    return render_deck(pptx=pptx, slide_specs=slide_specs, roadmap_configuration=r_c, \
+        roadmap_table=roadmap_table, roadmap_top_cm=roadmap_top_cm, roadmap_height_cm=roadmap_height_cm, \
+        input_slide_index=input_slide_index)
+
 if __name__ == '__main__':
     import pandas as pd
     from pptx import Presentation
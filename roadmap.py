@@ -16,6 +16,8 @@ import roadmap_table as rt
 import roadmap_helper as rh
 import roadmap_pptx as rp
 import render_roadmap as rr
+import roadmap_deck as rd
+import roadmap_parallel as rpl
 
 ### Valid Variable names to check values passed from external file
 ### The values in the 'def roadmap' must be kept consistent with these values
@@ -30,6 +32,11 @@ END_WW = 'end_ww'
 TITLE_TEXT = 'title_text'
 ALIGN_ZERO = 'align_zero'
 DO_NOT_ALIGN_ZERO = 'do_not_align_zero'
+SAVE_CONFIG_PATH = 'save_config_path'
+VALIDATE = 'validate'
+PACK_PROGRAMS = 'pack_programs'
+DECK_SPEC_PATH = 'deck_spec_path'
+WORKERS = 'workers'
 
 VALID_PARMETERS = [ROAMDAP_CONFIG_PATH,
     GOLDEN_DOC_PATH,
@@ -40,9 +47,14 @@ VALID_PARMETERS = [ROAMDAP_CONFIG_PATH,
     END_WW,
     TITLE_TEXT,
     ALIGN_ZERO,
-    DO_NOT_ALIGN_ZERO,]
+    DO_NOT_ALIGN_ZERO,
+    SAVE_CONFIG_PATH,
+    VALIDATE,
+    PACK_PROGRAMS,
+    DECK_SPEC_PATH,
+    WORKERS,]
 
-TRUE_FALSE_FLAGS = [ALIGN_ZERO, DO_NOT_ALIGN_ZERO]
+TRUE_FALSE_FLAGS = [ALIGN_ZERO, DO_NOT_ALIGN_ZERO, VALIDATE, PACK_PROGRAMS]
 
 @click.command()
 @click.argument( ROAMDAP_CONFIG_PATH, type=click.Path(exists=True))
@@ -56,17 +68,35 @@ TRUE_FALSE_FLAGS = [ALIGN_ZERO, DO_NOT_ALIGN_ZERO]
     type=click.Path(writable=True), default=None)
 @click.option('-s','--'+START_WW, default=None, help="start ww in the format of ww'yy (start_ww)")
 @click.option('-e','--'+END_WW, default=None, help="end ww in the format of ww'yy (end_ww)")
-@click.option('-t', TITLE_TEXT, default='Roadmap', help="Roadmap Title Text (title_text)")
+@click.option('-t', TITLE_TEXT, default=None, help="Roadmap Title Text - no title if not set (title_text)")
 @click.option('-az','--alignzero', ALIGN_ZERO, is_flag=True, default=False,\
      help="Set to true to normalize all first milestones to 01'00)")
 @click.option('-daz','--donotalignzero', DO_NOT_ALIGN_ZERO, is_flag=True, default=False,\
      help="Set to true to override -a/--alignzero)")
+@click.option('-sc', SAVE_CONFIG_PATH, help='Optional path to save the compiled configuration as a .json '+\
+    'snapshot, which can be passed back in place of the Excel configuration (save_config_path)', \
+    type=click.Path(writable=True), default=None)
+@click.option('-v','--'+VALIDATE, VALIDATE, is_flag=True, default=False,\
+     help="Only check the programs and annotations (nothing is rendered) - exits 1 on errors")
+@click.option('-pk','--packprograms', PACK_PROGRAMS, is_flag=True, default=False,\
+     help="Let programs share a row in their swimlane when they don't overlap")
+@click.option('-d', DECK_SPEC_PATH, help='Optional path to a .json deck spec - one slide per entry, each '+\
+    'with its own window, swimlanes, align zero and title (deck_spec_path)', \
+    type=click.Path(exists=True), default=None)
+@click.option('-w','--'+WORKERS, WORKERS, type=int, default=None,\
+     help="Processes rendering the slides of a deck spec in parallel - 0 for one per CPU (workers)")
 
 def roadmap(golden_doc_path, roadmap_helper_path, roadmap_config_path, \
     roadmap_template_path, output_side_path, start_ww, end_ww,\
-        title_text, align_zero, do_not_align_zero ):
+        title_text, align_zero, do_not_align_zero, save_config_path, validate, pack_programs, \
+            deck_spec_path, workers ):
     
-    command_dict = rc.RoadmapConfig(path_to_roadmap_config_excel=roadmap_config_path).commands
+    ### roadmap_config_path can be the Excel configuration or a saved .json snapshot
+    r_c = rc.load_roadmap_config(roadmap_config_path)
+    command_dict = r_c.commands
+
+    if save_config_path is not None:
+        r_c.save(save_config_path)
 
     ## golden_doc_path is provided by the user and validity checked by the click package
 
@@ -91,6 +121,23 @@ def roadmap(golden_doc_path, roadmap_helper_path, roadmap_config_path, \
             command_dict[OUTPUT_SIDE_PATH] != '':
             output_side_path = command_dict[OUTPUT_SIDE_PATH]
     
+    if deck_spec_path is None:
+        if DECK_SPEC_PATH in command_dict.keys() and \
+            command_dict[DECK_SPEC_PATH] != '':
+            deck_spec_path = command_dict[DECK_SPEC_PATH]
+    
+    if title_text is None:
+        if TITLE_TEXT in command_dict.keys() and \
+            command_dict[TITLE_TEXT] != '':
+            title_text = command_dict[TITLE_TEXT]
+    
+    if workers is None:
+        if WORKERS in command_dict.keys() and \
+            command_dict[WORKERS] != '':
+            workers = int(command_dict[WORKERS])
+        else:
+            workers = 1
+    
     if start_ww is None:
         if START_WW in command_dict.keys() and \
             command_dict[START_WW] != '':
@@ -106,6 +153,11 @@ def roadmap(golden_doc_path, roadmap_helper_path, roadmap_config_path, \
             command_dict[ALIGN_ZERO] != '':
             align_zero= (command_dict[ALIGN_ZERO].upper() == rc.TRUE_VALUE_TEXT.upper())
     
+    if pack_programs is False:
+        if PACK_PROGRAMS in command_dict.keys() and \
+            command_dict[PACK_PROGRAMS] != '':
+            pack_programs = (command_dict[PACK_PROGRAMS].upper() == rc.TRUE_VALUE_TEXT.upper())
+    
     ### You should probably never set do_not_align_zero in the roadmap config
     ### command tab, since its only purpose is to allow a command line ride override of
     ## the align_zero setting set in the configuration file.
@@ -129,8 +181,35 @@ def roadmap(golden_doc_path, roadmap_helper_path, roadmap_config_path, \
     print('title_text',title_text)
     print('align_zero',align_zero)
     print('do_not_align_zero',do_not_align_zero)
+    print('pack_programs',pack_programs)
+    print('deck_spec_path',deck_spec_path)
+    print('workers',workers)
     print('-------------------------------------------')
 
+    if validate:
+        errors = rr.validate_roadmap_from_paths(golden_doc_path=golden_doc_path, \
+            roadmap_helper_path=roadmap_helper_path, roadmap_config_path=roadmap_config_path, \
+            roadmap_config=r_c)
+        for error in errors:
+            print('ERROR:', error)
+        print(f'{len(errors)} error(s) found')
+        sys.exit(1 if len(errors) > 0 else 0)
+
+    if deck_spec_path is not None:
+        ### Every slide of the deck from one load of the table, configuration and template
+        try:
+            slide_specs = rd.load_deck_spec(deck_spec_path, defaults={rd.START_WW:start_ww, \
+                rd.END_WW:end_ww, rd.ALIGN_ZERO:align_zero, rd.PACK:pack_programs, rd.TITLE:title_text})
+        except ValueError as e:
+            sys.exit('Invalid deck spec '+str(deck_spec_path)+': '+str(e))
+        
+        pptx = rpl.render_deck_parallel_from_paths(golden_doc_path=golden_doc_path, \
+            roadmap_helper_path=roadmap_helper_path, roadmap_config_path=roadmap_config_path, \
+            roadmap_template_path=roadmap_template_path, slide_specs=slide_specs, \
+            roadmap_top_cm=1.5, input_slide_index=0, roadmap_config=r_c, workers=workers)
+        pptx.save(output_side_path)
+        return
+
     start_ww_ww = iw.WW_from_string(start_ww)
     if start_ww_ww is None:
         sys.exit('Invalid start_ww date format:'+start_ww)
@@ -147,8 +226,9 @@ def roadmap(golden_doc_path, roadmap_helper_path, roadmap_config_path, \
         roadmap_config_path=roadmap_config_path,\
         roadmap_template_path=roadmap_template_path, 
         start_ww=start_ww_ww, end_ww=end_ww_ww,
-        roadmap_title=None, \
-        roadmap_top_cm=1.5, input_slide_index=0, align_zero=align_zero )
+        roadmap_title=title_text, \
+        roadmap_top_cm=1.5, input_slide_index=0, align_zero=align_zero, \
+        roadmap_config=r_c, pack=pack_programs )
     
     pptx.save(output_side_path)
 
@@ -0,0 +1,316 @@
+"""
+roadmap_annotations.py
+
+Compiles every annotation of a roadmap - the JSON annotation cells of the concept rows
+and the rows of the ANNOTATIONS sheet - into AnnotationRecords that refer to programs
+and milestones by index.
+
+All of the parsing, name matching and validation happens once in compile_annotations(),
+so bad references are reported (as AnnotationErrors) before anything is rendered and
+the render loop only does index lookups.
+"""
+
+from collections import namedtuple
+
+import pandas as pd
+
+import annotations as an
+import intel_ww as iw
+import roadmap_pptx as rp
+import roadmap_style as rs
+import roadmap_table as rt
+
+### Annotation type codes
+AT_TEXT = 0
+AT_DELTA = 1
+AT_SLIP = 2
+AT_INLINEWWS = 3
+AT_LINE_TO = 4
+
+VALID_DATE_FORMATS = [None, '', an.DF_D, an.DF_WWs, an.DF_QTR, an.DF_YRS]
+
+class AnnotationRecord:
+    """
+    program / end_program - index into the compiled program list
+    start / end - index into that program's milestones
+    """
+    __slots__ = ['type_code', 'program', 'start', 'end', 'end_program', 'style_id', \
+        'date_format', 'text', 'source']
+
+    def __init__(self, type_code, program, start=None, end=None, end_program=None, style_id=None,\
+        date_format=None, text='', source=''):
+        self.type_code = type_code
+        self.program = program
+        self.start = start
+        self.end = end
+        self.end_program = program if end_program is None else end_program
+        self.style_id = style_id
+        self.date_format = date_format
+        self.text = text
+        self.source = source
+
+    def __str__(self):
+        return f"{self.source}: type={self.type_code} program={self.program} start={self.start} "+\
+            f"end_program={self.end_program} end={self.end} text='{self.text}'"
+
+class AnnotationError:
+    def __init__(self, source, program_name, message):
+        self.source = source
+        self.program_name = program_name
+        self.message = message
+
+    def __str__(self):
+        return f"{self.source} ({self.program_name}): {self.message}"
+
+class CompiledAnnotations:
+    def __init__(self, programs, index):
+        self.programs = programs
+        self.index = index
+        self.records = []
+        self.errors = []
+        self._program_records = {}
+
+    def add(self, record):
+        self.records.append(record)
+        self._program_records.setdefault(record.program, []).append(record)
+
+    def records_for_program(self, program):
+        """
+        Records drawn from program (index into programs)
+        """
+        return self._program_records.get(program, [])
+
+    def is_valid(self):
+        return len(self.errors) == 0
+
+def programs_list(shorthand_name_dict):
+    """
+    Program informations in render order from the (possibly nested - major/minor/name)
+    dict returned by render_roadmap.render_roadmap
+    """
+    programs = []
+    for value in shorthand_name_dict.values():
+        if isinstance(value, dict):
+            programs.extend(programs_list(value))
+        else:
+            programs.append(value)
+    return programs
+
+def delta_date_text(date_format, wws):
+    if date_format is None or date_format == '' or date_format == an.DF_D:
+        return iw.wws_to_days_text(wws=wws)
+    if date_format == an.DF_WWs:
+        return iw.wws_to_text(wws=wws)
+    if date_format == an.DF_QTR:
+        return iw.wws_to_qtr_text(wws=wws)
+    if date_format == an.DF_YRS:
+        return iw.wws_to_years_text(wws=wws)
+    raise ValueError('Unknown date format: '+str(date_format))
+
+### Where a milestone was drawn on the slide (rendered is False for milestones outside the window)
+MilestoneGeometry = namedtuple('MilestoneGeometry', ['left_cm', 'right_cm', 'center_y_cm', 'rendered'])
+NOT_RENDERED = MilestoneGeometry(left_cm=None, right_cm=None, center_y_cm=None, rendered=False)
+
+class RenderIndex:
+    """
+    Built once after the program pass:
+        program name -> program index
+        (program index, milestone name) -> milestone index
+        (program index, milestone index) -> MilestoneGeometry
+    so every cross program reference resolves with dict / list lookups
+    """
+    def __init__(self, programs):
+        self.programs = programs
+        self.program_index = {}
+        self.milestone_index = {}
+        self.geometry = []
+        for i, pi in enumerate(programs):
+            self.program_index.setdefault(str(pi.shorthand_name).strip(), i)
+            
+            ms_top_cm = pi.from_roadmap_top_cm + rp.ADD_TO_CENTER_MILESTONE_IN_PRODUCT_SHAPE
+            ms_geometry = []
+            for j, ms in enumerate(pi.milestones):
+                self.milestone_index.setdefault((i, str(ms.text).strip()), j)
+                self.milestone_index.setdefault((i, str(ms.text).strip().upper()), j)
+                if ms.is_rendered():
+                    ms_geometry.append(MilestoneGeometry(left_cm=ms.marker_left_cm, \
+                        right_cm=ms.marker_left_cm+ms.marker_width_cm, \
+                        center_y_cm=ms_top_cm+rp.PRODUCT_MILESTONE_SHAPE_HEIGHT_CM/2.0, rendered=True))
+                else:
+                    ms_geometry.append(NOT_RENDERED)
+            self.geometry.append(ms_geometry)
+
+    def program(self, name):
+        if pd.isna(name):
+            raise ValueError('Missing program name')
+        try:
+            return self.program_index[str(name).strip()]
+        except KeyError:
+            raise ValueError(f"Program '{name}' not found (or not in the roadmap window)")
+
+    def milestone(self, program, name):
+        if pd.isna(name):
+            raise ValueError('Missing milestone name')
+        name = str(name).strip()
+        if (program, name) in self.milestone_index:
+            return self.milestone_index[(program, name)]
+        if (program, name.upper()) in self.milestone_index:
+            return self.milestone_index[(program, name.upper())]
+        raise ValueError(f"Milestone '{name}' not found in {self.programs[program].shorthand_name}")
+    
+    def lookup(self, program_name, milestone_name):
+        """
+        returns (program index, milestone index)
+        """
+        program = self.program(program_name)
+        return (program, self.milestone(program=program, name=milestone_name))
+    
+    def milestone_geometry(self, program, milestone):
+        return self.geometry[program][milestone]
+
+def compile_annotations(programs, annotations_list=None, annotation_store=None, styles=rs.STYLES):
+    """
+    programs - list of program informations (rendered or not - only their names and milestones are used)
+    annotation_store - roadmap_table.AnnotationStore of the ANNOTATIONS sheet
+    annotations_list - rows of the ANNOTATIONS sheet (RoadmapTable.annotations_list()) - only
+        used without an annotation_store
+
+    returns CompiledAnnotations
+    """
+    index = RenderIndex(programs)
+    compiled = CompiledAnnotations(programs=programs, index=index)
+
+    for p_i, pi in enumerate(programs):
+        if not hasattr(pi, 'annotations'):
+            continue     ### Only concept rows carry annotation cells
+        for col_name, ann in pi.annotations().items():
+            source = f"{pi.shorthand_name}[{col_name}]"
+            try:
+                compiled.add(_compile_cell_annotation(index=index, programs=programs, \
+                    p_i=p_i, ann=ann, source=source, styles=styles))
+            except ValueError as e:
+                compiled.errors.append(AnnotationError(source=source, program_name=pi.shorthand_name,\
+                     message=str(e)))
+
+    if annotation_store is not None:
+        ### Each program picks up just its own rows, anything left over refers to
+        ### programs that aren't there (and is reported as an error)
+        ### (programs can share a shorthand name - their rows are compiled once)
+        row_numbers = []
+        for pi in programs:
+            row_numbers.extend(annotation_store.rows_owned_by(pi.shorthand_name))
+        row_numbers = list(dict.fromkeys(row_numbers))
+        owned = set(row_numbers)
+        row_numbers.extend([i for i in range(len(annotation_store)) if i not in owned])
+        rows = [(i, annotation_store.row(i)) for i in row_numbers]
+    elif annotations_list is not None:
+        rows = list(enumerate(annotations_list))
+    else:
+        rows = []
+
+    for row_number, row in rows:
+        source = f"{rt.ANNOTATIONS_SHEET} row {row_number+1}"
+        try:
+            record = _compile_sheet_annotation(index=index, row=row, source=source)
+        except ValueError as e:
+            compiled.errors.append(AnnotationError(source=source, \
+                program_name=row.get(rt.A), message=str(e)))
+            continue
+        if record is not None:
+            compiled.add(record)
+
+    return compiled
+
+def _compile_cell_annotation(index, programs, p_i, ann, source, styles):
+    pi = programs[p_i]
+    if isinstance(ann, an.Text):
+        start = index.milestone(program=p_i, name=ann.milestone)
+        style_id = styles.text_format_style_id(text_format=ann.text_format, \
+            style_id=rp.TEXT_ANNOTATION_STYLE_ID)
+        return AnnotationRecord(type_code=AT_TEXT, program=p_i, start=start, end=start, \
+            style_id=style_id, text=ann.text, source=source)
+
+    if isinstance(ann, an.Delta):
+        start = index.milestone(program=p_i, name=ann.start)
+        end = index.milestone(program=p_i, name=ann.end)
+        if ann.date_format not in VALID_DATE_FORMATS:
+            raise ValueError(f"Unknown date format '{ann.date_format}'")
+
+        ww_delta = pi.milestones[start].ww_date.ww_delta_from(pi.milestones[end].ww_date)
+        text = str(ann.text) + delta_date_text(date_format=ann.date_format, wws=ww_delta) + \
+            str(ann.after_text)
+        style_id = styles.text_format_style_id(text_format=ann.text_format, \
+            style_id=rp.DELTA_ANNOTATION_STYLE_ID)
+        return AnnotationRecord(type_code=AT_DELTA, program=p_i, start=start, end=end, \
+            style_id=style_id, date_format=ann.date_format, text=text, source=source)
+
+    if isinstance(ann, an.CrossProgram):
+        start = index.milestone(program=p_i, name=ann.start)
+        end_program, end = index.lookup(program_name=ann.to_program, milestone_name=ann.end)
+        type_code = AT_SLIP if isinstance(ann, an.Slip) else AT_LINE_TO
+        style_id = styles.text_format_style_id(text_format=ann.text_format, \
+            style_id=rp.TEXT_ANNOTATION_STYLE_ID)
+        return AnnotationRecord(type_code=type_code, program=p_i, start=start, end_program=end_program, \
+            end=end, style_id=style_id, text=str(ann.text), source=source)
+
+    raise ValueError('Unsupported annotation: '+type(ann).__name__)
+
+def _compile_sheet_annotation(index, row, source):
+    command = row.get(rt.COMMAND_COL)
+    if pd.isna(command) or str(command).strip() == '':
+        return None
+    command = str(command).strip().upper()
+
+    if command == rt.ANNOTTION_SLIP:
+        start_program, start = index.lookup(program_name=row.get(rt.SLIP_START_SHORT_NAME), \
+            milestone_name=row.get(rt.SLIP_START_MILESTONE))
+        end_program, end = index.lookup(program_name=row.get(rt.SLIP_END_SHORT_NAME), \
+            milestone_name=row.get(rt.SLIP_END_MILESTONE))
+        return AnnotationRecord(type_code=AT_SLIP, program=start_program, start=start, \
+            end_program=end_program, end=end, source=source)
+
+    if command == rt.ANNOTATION_INLINEWWS:
+        program = index.program(row.get(rt.INLINEWWS_PRODUCT))
+        return AnnotationRecord(type_code=AT_INLINEWWS, program=program, source=source)
+
+    raise ValueError(f"Unknown {rt.COMMAND_COL} '{command}'")
+
+def render_records(roadmap_slide, compiled, align_zero=False):
+    """
+    Draws the compiled annotations - annotations with milestones outside of the
+    canvas window (never rendered) are skipped
+    """
+    programs = compiled.programs
+    index = compiled.index
+    for record in compiled.records:
+        pi = programs[record.program]
+        end_pi = programs[record.end_program]
+
+        if record.type_code == AT_INLINEWWS:
+            if not all([ms.is_rendered() for ms in pi.milestones]):
+                print(f"Skipping annotation {record.source} - milestone outside of window")
+                continue
+            roadmap_slide.annotate_inline(pi=pi, align_zero=align_zero)
+            continue
+
+        start_ms = pi.milestones[record.start]
+        end_ms = end_pi.milestones[record.end]
+        start_geometry = index.milestone_geometry(program=record.program, milestone=record.start)
+        end_geometry = index.milestone_geometry(program=record.end_program, milestone=record.end)
+        if not (start_geometry.rendered and end_geometry.rendered):
+            print(f"Skipping annotation {record.source} - milestone outside of window")
+            continue
+
+        if record.type_code == AT_TEXT:
+            roadmap_slide.render_text_record(pi=pi, milestone=start_ms, shape_text=record.text, \
+                style_id=record.style_id)
+        elif record.type_code == AT_DELTA:
+            roadmap_slide.render_delta_record(pi=pi, milestone_before=start_ms, \
+                shape_text=record.text, style_id=record.style_id)
+        elif record.type_code == AT_SLIP:
+            roadmap_slide.annotate_slip(start_pi=pi, start_ms=start_ms, end_pi=end_pi, end_ms=end_ms,\
+                align_zero=align_zero)
+        elif record.type_code == AT_LINE_TO:
+            roadmap_slide.render_line_to_record(start_geometry=start_geometry, end_geometry=end_geometry,\
+                shape_text=record.text, style_id=record.style_id)
+    return
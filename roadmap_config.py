@@ -4,6 +4,11 @@ keys / row_names / etc. that enable the parsing of the roadmap input data
 and the formatting of the roadmap file
 """
 from collections import OrderedDict
+from types import MappingProxyType
+import json
+import os
+
+import numpy as np
 import pandas as pd
 
 ### Sheet names in the config file
@@ -14,6 +19,10 @@ VALUE = 'VALUE'
 COMMENT = 'COMMENT'
 COMMAND_COLUMNS = [COMMAND,VALUE,COMMENT]
 
+### COMMANDS row naming a base configuration (Excel or .json snapshot) this one overlays
+### relative paths are relative to the directory of the overlay configuration
+EXTENDS = 'extends'
+
 TRUE_VALUE_TEXT = 'TRUE'
 FALSE_VALUE_TEXT = 'FALSE'
 
@@ -36,18 +45,251 @@ SEGMENT = 'SEGMENT'
 SEGMENT_LABEL = 'SEGMENT LABEL'
 SL_COLUMNS = [BUSINESS,SEGMENT, SEGMENT_LABEL]
 
+### Compiled configuration snapshots
+SNAPSHOT_EXTENSION = '.json'
+SNAPSHOT_FORMAT = 'format'
+SNAPSHOT_FORMAT_NAME = 'roadmap_config'
+SNAPSHOT_VERSION = 'version'
+SNAPSHOT_VERSION_NUMBER = 1
+
+### Base configurations parsed in this process - (absolute path, modified time) -> RoadmapConfig
+_base_config_cache = {}
+_base_configs_loading = set()
+
+
+class ColumnProjection:
+    """
+    The subset of roadmap table columns (and their types) that a configuration
+    references. Used by the roadmap_table to avoid reading unused columns.
+    """
+    def __init__(self, columns, dtypes=None):
+        self.columns = list(OrderedDict.fromkeys(columns))
+        self.dtypes = OrderedDict() if dtypes is None else dtypes
+        return
+    
+    def __str__(self):
+        return 'columns:'+str(self.columns)+' dtypes:'+str(dict(self.dtypes))
+
+    def usecols(self, required_columns=None):
+        """
+        Callable for pandas usecols= - missing columns are silently ignored
+        """
+        wanted = set(self.columns)
+        if required_columns is not None:
+            wanted.update(required_columns)
+        return lambda col: col in wanted
 
 class RoadmapConfig:
-    def __init__(self, path_to_roadmap_config_excel):
+    """
+    Compiled, read only roadmap configuration.
+
+    Built from the Excel configuration file, or from a snapshot written by save()
+    (which loads without touching openpyxl - see load_roadmap_config()).
+
+    An Excel configuration with an 'extends' COMMANDS row is an overlay on that base
+    configuration: its COMMANDS, SWIMLANES businesses and ROADMAP_COLUMNS tags replace
+    the base ones, and any of its sheets other than COMMANDS may be left out. The base is
+    parsed once per process and shared by every overlay that extends it.
+    """
+    def __init__(self, path_to_roadmap_config_excel=None, snapshot=None):
+        if (path_to_roadmap_config_excel is None) == (snapshot is None):
+            raise ValueError('Must supply one of path_to_roadmap_config_excel or snapshot')
         
+        if snapshot is not None:
+            self._compile_snapshot(snapshot=snapshot)
+            return
+
         ef = pd.ExcelFile(path_to_roadmap_config_excel)
 
         ##### Parse the ROADMAP_COLUMNS SHEET 
-        self.commands = self.parse_sheet(ef=ef, sheet_name=COMMAND_COLUMNS_SHEET,\
+        commands = self.parse_sheet(ef=ef, sheet_name=COMMAND_COLUMNS_SHEET,\
             col_names=COMMAND_COLUMNS, tag_column=COMMAND, value_column=VALUE, only_type=None)
         
-        self.swimlanes_hierarchy, self.major_column_name, self.minor_column_name, self.name_col\
-             = sheet_to_major_minor_name(ef=ef, sheet_name=SWIMLANES_SHEET)
+        base = None
+        if str(commands.get(EXTENDS, '')).strip() != '':
+            base = base_config(path=commands[EXTENDS], \
+                relative_to=os.path.dirname(os.path.abspath(path_to_roadmap_config_excel)))
+
+        ### An overlay only needs the sheets it changes
+        if base is not None and SWIMLANES_SHEET not in ef.sheet_names:
+            swimlanes_hierarchy, major_column_name, minor_column_name, name_col = \
+                (OrderedDict(), base.major_column_name, base.minor_column_name, base.name_col)
+        else:
+            swimlanes_hierarchy, major_column_name, minor_column_name, name_col\
+                 = sheet_to_major_minor_name(ef=ef, sheet_name=SWIMLANES_SHEET)
+
+        ##### ROADMAP_COLUMNS is optional - without it every column of the roadmap table is read
+        if ROADMAP_COLUMNS_SHEET in ef.sheet_names:
+            roadmap_columns, column_types = parse_roadmap_columns(ef=ef, \
+                sheet_name=ROADMAP_COLUMNS_SHEET)
+        else:
+            roadmap_columns, column_types = (OrderedDict(), OrderedDict())
+
+        if base is not None:
+            commands = overlay(base.commands, commands)
+            swimlanes_hierarchy = overlay(base.swimlanes_hierarchy, swimlanes_hierarchy)
+            roadmap_columns = overlay(base.roadmap_columns, roadmap_columns)
+            column_types = overlay(base.column_types, column_types)
+
+        self._compile(source_path=str(path_to_roadmap_config_excel), commands=commands, \
+            swimlanes_hierarchy=swimlanes_hierarchy, major_column_name=major_column_name, \
+            minor_column_name=minor_column_name, name_col=name_col, \
+            roadmap_columns=roadmap_columns, column_types=column_types)
+    
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError('RoadmapConfig is read only - can not set '+name)
+        object.__setattr__(self, name, value)
+
+    def _compile(self, source_path, commands, swimlanes_hierarchy, major_column_name, \
+        minor_column_name, name_col, roadmap_columns, column_types):
+        """
+        Validates the parsed values once and freezes them into read only mappings
+        """
+        validate(swimlanes_hierarchy=swimlanes_hierarchy, major_column_name=major_column_name, \
+            minor_column_name=minor_column_name, name_col=name_col, \
+            roadmap_columns=roadmap_columns, column_types=column_types)
+
+        self.source_path = source_path
+        self.commands = MappingProxyType(OrderedDict(commands))
+        self.swimlanes_hierarchy = MappingProxyType(OrderedDict( \
+            [(major, MappingProxyType(OrderedDict(minors))) for major, minors in swimlanes_hierarchy.items()]))
+        self.major_column_name = major_column_name
+        self.minor_column_name = minor_column_name
+        self.name_col = name_col
+        self.roadmap_columns = MappingProxyType(OrderedDict(roadmap_columns))
+        self.column_types = MappingProxyType(OrderedDict(column_types))
+        self.milestones = MappingProxyType(OrderedDict( [(tag, col) for tag, col in roadmap_columns.items() \
+            if column_types[tag] == MILESTONE] ))
+
+        ### (major, minor, label, row_index) - row order of the swimlanes table
+        swimlane_rows = []
+        for major, minors in swimlanes_hierarchy.items():
+            for minor, label in minors.items():
+                swimlane_rows.append( (major, minor, label, len(swimlane_rows)) )
+        self.swimlane_rows = tuple(swimlane_rows)
+        self.swimlane_row_index = MappingProxyType( \
+            {(major, minor):row_index for major, minor, label, row_index in swimlane_rows} )
+
+        self._frozen = True
+        return
+    
+    def _compile_snapshot(self, snapshot):
+        if snapshot.get(SNAPSHOT_FORMAT) != SNAPSHOT_FORMAT_NAME or \
+            snapshot.get(SNAPSHOT_VERSION) != SNAPSHOT_VERSION_NUMBER:
+            raise ValueError('Not a roadmap config snapshot (or unsupported version)')
+        
+        swimlanes_hierarchy = OrderedDict()
+        for major, minor, label in snapshot['swimlanes']:
+            swimlanes_hierarchy.setdefault(major, OrderedDict())[minor] = label
+        
+        roadmap_columns = OrderedDict()
+        column_types = OrderedDict()
+        for tag, col_type, col in snapshot['roadmap_columns']:
+            roadmap_columns[tag] = col
+            column_types[tag] = col_type
+        
+        self._compile(source_path=snapshot['source_path'], \
+            commands=OrderedDict([tuple(c) for c in snapshot['commands']]), \
+            swimlanes_hierarchy=swimlanes_hierarchy, major_column_name=snapshot['major_column_name'], \
+            minor_column_name=snapshot['minor_column_name'], name_col=snapshot['name_col'], \
+            roadmap_columns=roadmap_columns, column_types=column_types)
+        return
+
+    def to_snapshot(self, strict=True):
+        """
+        Plain (JSON friendly) dict holding everything needed to rebuild this config
+
+        strict - False keeps command values JSON can't hold (e.g. dates) as they are -
+            for pickling, not for save()
+        """
+        value = snapshot_value if strict else (lambda key, value: value)
+        return OrderedDict([
+            (SNAPSHOT_FORMAT, SNAPSHOT_FORMAT_NAME),
+            (SNAPSHOT_VERSION, SNAPSHOT_VERSION_NUMBER),
+            ('source_path', self.source_path),
+            ('commands', [[value(key, key), value(key, v)] for key, v in self.commands.items()]),
+            ('swimlanes', [[major, minor, label] for major, minor, label, row_index in self.swimlane_rows]),
+            ('major_column_name', self.major_column_name),
+            ('minor_column_name', self.minor_column_name),
+            ('name_col', self.name_col),
+            ('roadmap_columns', [[tag, self.column_types[tag], col] for tag, col in self.roadmap_columns.items()]),
+            ])
+    
+    def save(self, path):
+        """
+        Writes the compiled configuration to a (small) JSON snapshot file
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_snapshot(), f, indent=1)
+        return path
+
+    ### Pickled (e.g. for roadmap_parallel's worker processes) as a non-strict snapshot -
+    ### the read only mappings can't be pickled themselves
+    def __getstate__(self):
+        return self.to_snapshot(strict=False)
+
+    def __setstate__(self, snapshot):
+        self._compile_snapshot(snapshot=snapshot)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(snapshot=json.load(f, object_pairs_hook=OrderedDict))
+
+    def with_swimlanes(self, swimlanes=None):
+        """
+        Read only copy of this configuration showing only some of the swimlanes - each entry
+        of swimlanes is a major (business) name, for all of its minors, or a (major, minor)
+        pair. None is every swimlane (returns self)
+        """
+        if swimlanes is None:
+            return self
+        
+        keep = set()
+        for entry in swimlanes:
+            if isinstance(entry, str):
+                if entry not in self.swimlanes_hierarchy:
+                    raise ValueError(f"Unknown swimlane '{entry}'")
+                keep.update([(entry, minor) for minor in self.swimlanes_hierarchy[entry]])
+            else:
+                major, minor = entry
+                if (major, minor) not in self.swimlane_row_index:
+                    raise ValueError(f"Unknown swimlane '{major}', '{minor}'")
+                keep.add((major, minor))
+        
+        ### Same compiled values with fewer swimlanes (not through a snapshot - commands
+        ### may hold values a snapshot can't, e.g. dates)
+        swimlanes_hierarchy = OrderedDict()
+        for major, minor, label, row_index in self.swimlane_rows:
+            if (major, minor) in keep:
+                swimlanes_hierarchy.setdefault(major, OrderedDict())[minor] = label
+        
+        config = RoadmapConfig.__new__(RoadmapConfig)
+        config._compile(source_path=self.source_path, commands=self.commands, \
+            swimlanes_hierarchy=swimlanes_hierarchy, major_column_name=self.major_column_name, \
+            minor_column_name=self.minor_column_name, name_col=self.name_col, \
+            roadmap_columns=self.roadmap_columns, column_types=self.column_types)
+        return config
+
+    def column_projection(self):
+        """
+        Returns a ColumnProjection covering the name/grouping columns and every
+        ROADMAP_COLUMNS entry - or None if the config doesn't declare its columns.
+
+        Milestone columns are read as str so work week text is never coerced to numbers.
+        """
+        if len(self.roadmap_columns) == 0:
+            return None
+
+        columns = [self.major_column_name, self.minor_column_name, self.name_col]
+        dtypes = OrderedDict()
+        for tag, col in self.roadmap_columns.items():
+            columns.append(col)
+            if self.column_types[tag] == MILESTONE:
+                dtypes[col] = str
+        
+        return ColumnProjection(columns=columns, dtypes=dtypes)
 
     def parse_sheet(self, ef, sheet_name, col_names,tag_column=TAG, value_column=VALUE,\
          only_type=None):
@@ -78,6 +320,43 @@ class RoadmapConfig:
 
         return new_dict
 
+def parse_roadmap_columns( ef, sheet_name ):
+    """
+    TAG            TYPE            VALUE
+    A0             Milestone       A0 TI
+    Comments       Non Milestone   Comments
+
+    returns (OrderedDict tag->column name, OrderedDict tag->type)
+    """
+    try:
+        i = ef.sheet_names.index(sheet_name)
+    except:
+        raise ValueError(f"Error finding'{sheet_name}' sheet name")
+
+    df = ef.parse(sheet_name=ef.sheet_names[i], usecols=list(range(len(CS_COLUMNS))))
+    df.columns = CS_COLUMNS
+
+    columns = OrderedDict()
+    types = OrderedDict()
+    for i, row in df.iterrows():
+        if pd.isna(row[VALUE]) or pd.isna(row[TAG]):
+            print('Skipping:', row[TAG])
+            continue
+        
+        col_type = str(row[TYPE]).strip() if pd.notna(row[TYPE]) else NON_MILESTONE
+        if col_type.upper() == MILESTONE.upper():
+            col_type = MILESTONE
+        elif col_type.upper() == NON_MILESTONE.upper():
+            col_type = NON_MILESTONE
+        else:
+            raise ValueError(f"Unknown {TYPE} '{row[TYPE]}' for {TAG} '{row[TAG]}'"+\
+                f" - must be '{MILESTONE}' or '{NON_MILESTONE}'")
+
+        columns[row[TAG]] = str(row[VALUE]).strip()
+        types[row[TAG]] = col_type
+    
+    return columns, types
+
 def sheet_to_major_minor_name( ef, sheet_name ):
     """
     Business   Segment  ProductName
@@ -95,18 +374,83 @@ def sheet_to_major_minor_name( ef, sheet_name ):
     
     major_column, minor_column, name_col = (df.columns[0], df.columns[1], df.columns[2])
 
-    df[minor_column].fillna(value='', inplace=True)
-    df[name_col].fillna(value='', inplace=True)
+    df = df.dropna(subset=[major_column]).fillna({minor_column:'', name_col:''})
 
+    ### One pass over the unique (major, minor) pairs - in the order they first appear
     od = OrderedDict()
-    for biz in df[major_column].unique():
-        od[biz]=OrderedDict()
-        for seg in df.loc[df[major_column] == biz][minor_column].unique():
-            for i,row in df.loc[(df[major_column] == biz) & (df[minor_column] == seg)].iterrows():
-                od[biz][seg] = seg  ## Note this level of the dict is now redudant....could refactor
+    for biz, seg in df[[major_column, minor_column]].drop_duplicates().itertuples(index=False):
+        if biz not in od:
+            od[biz]=OrderedDict()
+        od[biz][seg] = seg  ## Note this level of the dict is now redudant....could refactor
     
     return (od, major_column, minor_column, name_col)
 
+def validate(swimlanes_hierarchy, major_column_name, minor_column_name, name_col, \
+    roadmap_columns, column_types):
+    """
+    Raises ValueError describing the first problem found in a parsed configuration
+    """
+    if len(swimlanes_hierarchy) == 0:
+        raise ValueError(f"No swimlanes found in the {SWIMLANES_SHEET} sheet")
+    
+    for col in [major_column_name, minor_column_name, name_col]:
+        if pd.isna(col) or str(col).strip() == '' or str(col).startswith('Unnamed'):
+            raise ValueError(f"{SWIMLANES_SHEET} sheet needs 3 column headings, found: "+\
+                str([major_column_name, minor_column_name, name_col]))
+    
+    for tag in roadmap_columns.keys():
+        if column_types.get(tag) not in [MILESTONE, NON_MILESTONE]:
+            raise ValueError(f"Unknown {TYPE} for {TAG} '{tag}'")
+    
+    return
+
+def snapshot_value(key, value):
+    """
+    value as a plain JSON value (numpy scalars become Python ones) - ValueError for
+    values a snapshot can't hold unchanged (e.g. dates), rather than saving them as text
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise ValueError(f"Can not save '{key}' value {value!r} ({type(value).__name__}) in a snapshot"+\
+        " - use text in the configuration")
+
+def overlay(base_dict, overlay_dict):
+    """
+    Returns a new OrderedDict of base_dict with the overlay_dict keys replacing (or
+    appended after) the base keys - e.g. an overlay SWIMLANES business replaces that
+    whole business from the base
+    """
+    merged = OrderedDict(base_dict)
+    for key, value in overlay_dict.items():
+        merged[key] = value
+    return merged
+
+def base_config(path, relative_to=''):
+    """
+    Returns the RoadmapConfig for path, parsing it only once per process (until the file changes)
+    """
+    path = os.path.abspath(os.path.join(relative_to, str(path)))
+    key = (path, os.path.getmtime(path))
+    if key not in _base_config_cache:
+        if path in _base_configs_loading:
+            raise ValueError(f"Circular '{EXTENDS}' reference to {path}")
+        _base_configs_loading.add(path)
+        try:
+            _base_config_cache[key] = load_roadmap_config(path)
+        finally:
+            _base_configs_loading.discard(path)
+    return _base_config_cache[key]
+
+def load_roadmap_config(path):
+    """
+    Loads a JSON snapshot (.json) or parses an Excel configuration file
+    """
+    if str(path).lower().endswith(SNAPSHOT_EXTENSION):
+        return RoadmapConfig.load(path)
+    return RoadmapConfig(path_to_roadmap_config_excel=path)
+
 if __name__ == '__main__':
     RC_PATH = '/Users/scotttan/Intel Corporation/Graphics Golden Doc Development - RoadmapPPTGeneration/ElastiScenarios/ElastiConfig.xlsx'
 
@@ -0,0 +1,131 @@
+"""
+roadmap_deck.py
+
+Deck specs - the slides rendered into one presentation from one load of the roadmap
+table, configuration and template (see render_roadmap.render_deck_from_paths).
+
+A deck spec file is JSON - a list of slides (or {"slides": [...]}). Each slide can set
+its own window, swimlanes, align_zero, pack and title. Anything a slide leaves out
+comes from the defaults (the command line / COMMANDS values):
+
+    [
+     {"title": "All", "start_ww": "1'21", "end_ww": "52'23"},
+     {"title": "Client", "swimlanes": ["Client"]},
+     {"title": "Compute", "swimlanes": [["Datacenter", "Compute"]], "align_zero": true}
+    ]
+
+A swimlanes entry is a major (business) name - for all of its minors - or a
+[major, minor] pair ("swimlanes": "Client" is the same as ["Client"]). Without swimlanes a slide shows every swimlane.
+"""
+
+import json
+
+import intel_ww as iw
+
+START_WW = 'start_ww'
+END_WW = 'end_ww'
+SWIMLANES = 'swimlanes'
+ALIGN_ZERO = 'align_zero'
+PACK = 'pack'
+TITLE = 'title'
+SLIDES = 'slides'
+
+SLIDE_KEYS = [START_WW, END_WW, SWIMLANES, ALIGN_ZERO, PACK, TITLE]
+
+TRUE_TEXTS = ['true', 'yes', '1']
+FALSE_TEXTS = ['false', 'no', '0']
+
+class SlideSpec:
+    def __init__(self, start_ww, end_ww, swimlanes=None, align_zero=False, pack=False, title=None):
+        self.start_ww = start_ww
+        self.end_ww = end_ww
+        self.swimlanes = swimlanes
+        self.align_zero = align_zero
+        self.pack = pack
+        self.title = title
+
+    def __str__(self):
+        swimlanes = 'all' if self.swimlanes is None else self.swimlanes
+        return f"SlideSpec({self.title}: {self.start_ww} to {self.end_ww} swimlanes:{swimlanes} "+\
+            f"align_zero:{self.align_zero} pack:{self.pack})"
+
+def to_ww(value, name):
+    """
+    WW from a WW or a ww'yy / Qn'yy / YYYYwwWW string
+    """
+    if isinstance(value, iw.WW):
+        return value
+    ww = None if value is None else iw.WW_from_string(str(value))
+    if ww is None:
+        raise ValueError(f"Invalid {name} date format: {value}")
+    return ww
+
+def to_bool(value, name):
+    """
+    bool from a bool, 0 / 1 or a true / false, yes / no, 1 / 0 string (any case)
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return value == 1
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in TRUE_TEXTS:
+            return True
+        if text in FALSE_TEXTS:
+            return False
+    raise ValueError(f"Invalid {name} value: {value!r} - expecting true or false")
+
+def to_swimlanes(value):
+    """
+    List of major names / (major, minor) pairs from a swimlanes value - a single major
+    name is a list of one
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"Invalid {SWIMLANES} value: {value!r} - expecting a list")
+
+    swimlanes = []
+    for entry in value:
+        if isinstance(entry, str):
+            swimlanes.append(entry)
+        elif isinstance(entry, (list, tuple)) and len(entry) == 2:
+            swimlanes.append(tuple(entry))
+        else:
+            raise ValueError(f"Invalid {SWIMLANES} entry: {entry!r} - expecting a major name "+\
+                "or a [major, minor] pair")
+    return swimlanes
+
+def slide_spec_from_dict(d, defaults=None):
+    """
+    SlideSpec from a deck spec slide entry - missing values come from defaults
+    """
+    unknown = [key for key in d.keys() if key not in SLIDE_KEYS]
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown deck spec slide key(s) {unknown} - expecting {SLIDE_KEYS}")
+
+    values = dict(defaults if defaults is not None else {})
+    values.update(d)
+    return SlideSpec(start_ww=to_ww(values.get(START_WW), START_WW), \
+        end_ww=to_ww(values.get(END_WW), END_WW), swimlanes=to_swimlanes(values.get(SWIMLANES)), \
+        align_zero=to_bool(values.get(ALIGN_ZERO, False), ALIGN_ZERO), \
+        pack=to_bool(values.get(PACK, False), PACK), \
+        title=values.get(TITLE))
+
+def deck_spec_from_list(slides, defaults=None):
+    if isinstance(slides, dict):
+        slides = slides.get(SLIDES, [])
+    specs = [slide_spec_from_dict(d, defaults=defaults) for d in slides]
+    if len(specs) == 0:
+        raise ValueError('Deck spec has no slides')
+    return specs
+
+def load_deck_spec(path, defaults=None):
+    """
+    List of SlideSpecs from a deck spec JSON file
+    """
+    with open(path) as f:
+        return deck_spec_from_list(json.load(f), defaults=defaults)
@@ -0,0 +1,198 @@
+"""
+roadmap_emitter.py
+
+Fast writing of roadmap_scene.Scene primitives into a slide's shape tree.
+
+The first primitive of each kind / style / geometry is drawn through python-pptx
+(roadmap_pptx.emit_primitive) and its XML (p:sp or p:cxnSp) is kept as a prototype.
+Every later primitive with the same key is a copy of the prototype with only the
+id, name, offset, extent (and flips for connectors) and text patched - no
+python-pptx property setters are called for it.
+
+Polylines (their path is different every time) always go through python-pptx.
+
+Shape ids come from a ShapeIdAllocator - python-pptx looks the slide's max shape id
+up (an xpath over every id in the slide) for every shape it adds. Inside an
+allocating_shape_ids block the shapes python-pptx adds take their ids from the
+allocator too; python-pptx's classes are only patched while a block is active.
+"""
+
+from contextlib import contextmanager
+import copy
+
+from pptx.oxml.ns import qn
+from pptx.oxml.shapes.autoshape import CT_Shape
+from pptx.shapes.freeform import FreeformBuilder
+from pptx.shapes.shapetree import _BaseShapes
+
+import roadmap_scene as scn
+
+C_NV_PR_TAG = qn('p:cNvPr')
+SP_PR_TAG = qn('p:spPr')
+XFRM_TAG = qn('a:xfrm')
+OFF_TAG = qn('a:off')
+EXT_TAG = qn('a:ext')
+TX_BODY_TAG = qn('p:txBody')
+P_TAG = qn('a:p')
+
+class ShapeIdAllocator:
+    """
+    Hands out shape ids for one slide - seeded once from the ids already in the slide
+    """
+    def __init__(self, shapes):
+        self.next_id = shapes._spTree.max_shape_id + 1
+
+    def allocate(self):
+        shape_id = self.next_id
+        self.next_id = shape_id + 1
+        return shape_id
+
+    def seen(self, shape_id):
+        """
+        shape_id was used by something that did not ask the allocator
+        """
+        self.next_id = max(self.next_id, shape_id + 1)
+
+def shape_id_allocator(shapes):
+    """
+    The allocator attached to shapes or - if there is none - a new one seeded from the slide
+    """
+    allocator = getattr(shapes, '_shape_id_allocator', None)
+    if allocator is None:
+        allocator = ShapeIdAllocator(shapes)
+    return allocator
+
+### python-pptx's own id lookups - put back when the last allocating_shape_ids block ends
+_pptx_next_shape_id = _BaseShapes._next_shape_id
+_pptx_add_freeform_sp = FreeformBuilder._add_freeform_sp
+_active_blocks = 0
+
+def _next_shape_id(self):
+    allocator = getattr(self, '_shape_id_allocator', None)
+    if allocator is None:
+        return _pptx_next_shape_id.fget(self)
+    return allocator.allocate()
+
+def _add_freeform_sp(self, origin_x, origin_y):
+    ### python-pptx gives freeforms the first unused id of the shape tree
+    if getattr(self._shapes, '_shape_id_allocator', None) is None:
+        return _pptx_add_freeform_sp(self, origin_x, origin_y)
+    shape_id = self._shapes._next_shape_id
+    sp = CT_Shape.new_freeform_sp(shape_id, "Freeform %d" % (shape_id - 1,), origin_x + self._left, \
+        origin_y + self._top, self._width, self._height)
+    self._shapes._spTree.insert_element_before(sp, 'p:extLst')
+    return sp
+
+@contextmanager
+def allocating_shape_ids(shapes):
+    """
+    Every shape added to shapes inside the with block gets its id from the ShapeIdAllocator
+    it yields (a block for shapes that already have one reuses it)
+
+        with rem.allocating_shape_ids(slide.shapes):
+            ...
+    """
+    global _active_blocks
+    allocator = getattr(shapes, '_shape_id_allocator', None)
+    if allocator is not None:
+        yield allocator
+        return
+
+    allocator = ShapeIdAllocator(shapes)
+    shapes._shape_id_allocator = allocator
+    if _active_blocks == 0:
+        _BaseShapes._next_shape_id = property(_next_shape_id)
+        FreeformBuilder._add_freeform_sp = _add_freeform_sp
+    _active_blocks = _active_blocks + 1
+    try:
+        yield allocator
+    finally:
+        _active_blocks = _active_blocks - 1
+        if _active_blocks == 0:
+            _BaseShapes._next_shape_id = _pptx_next_shape_id
+            FreeformBuilder._add_freeform_sp = _pptx_add_freeform_sp
+        del shapes._shape_id_allocator
+
+class Prototype:
+    """
+    XML of the first shape drawn for a prototype key and the element paths patched in the copies
+    """
+    def __init__(self, shape):
+        self.element = copy.deepcopy(shape._element)
+        ### python-pptx names shapes '<basename> <id - 1>'
+        self.name_base = shape.name.rsplit(' ', 1)[0]
+
+    def clone(self, shape_id, x, y, w, h, text):
+        element = copy.deepcopy(self.element)
+
+        c_nv_pr = element[0].find(C_NV_PR_TAG)
+        c_nv_pr.set('id', str(shape_id))
+        c_nv_pr.set('name', f"{self.name_base} {shape_id-1}")
+
+        xfrm = element.find(SP_PR_TAG).find(XFRM_TAG)
+        off = xfrm.find(OFF_TAG)
+        off.set('x', str(x))
+        off.set('y', str(y))
+        ext = xfrm.find(EXT_TAG)
+        ext.set('cx', str(w))
+        ext.set('cy', str(h))
+
+        if text is not None:
+            p = element.find(TX_BODY_TAG).find(P_TAG)
+            for child in p.content_children:
+                p.remove(child)
+            p.append_text(text)
+
+        return element, xfrm
+
+class PrototypeEmitter:
+    def __init__(self):
+        self._prototypes = {}
+
+    def __len__(self):
+        return len(self._prototypes)
+
+    def prototype_key(self, p):
+        if p.kind == scn.KIND_CONNECTOR:
+            return (p.kind,)
+        return (p.kind, p.style_id, p.geometry, p.text is None)
+
+    def emit(self, scene, shapes, emit_primitive, start=0):
+        """
+        Writes the scene primitives (from start on) into shapes - emit_primitive(shapes, primitive)
+        draws a primitive through python-pptx and returns the shape
+        """
+        sp_tree = shapes._spTree
+        shape_ids = shape_id_allocator(shapes)
+
+        for i in scene.draw_order(start=start):
+            p = scene.primitive(i)
+            key = None if p.kind == scn.KIND_POLYLINE else self.prototype_key(p)
+            prototype = None if key is None else self._prototypes.get(key)
+
+            if prototype is None:
+                shape = emit_primitive(shapes, p)
+                if key is not None:
+                    self._prototypes[key] = Prototype(shape)
+                shape_ids.seen(shape.shape_id)
+                continue
+
+            if p.kind == scn.KIND_CONNECTOR:
+                ### Connector offsets are to its end point - the extent is always positive
+                element, xfrm = prototype.clone(shape_id=shape_ids.allocate(), x=min(p.x, p.x+p.w), \
+                    y=min(p.y, p.y+p.h), w=abs(p.w), h=abs(p.h), text=None)
+                for flip, offset in [('flipH', p.w), ('flipV', p.h)]:
+                    if offset < 0:
+                        xfrm.set(flip, '1')
+                    elif flip in xfrm.attrib:
+                        del xfrm.attrib[flip]
+            else:
+                element, xfrm = prototype.clone(shape_id=shape_ids.allocate(), x=p.x, y=p.y, \
+                    w=p.w, h=p.h, text=p.text)
+
+            sp_tree.insert_element_before(element, 'p:extLst')
+
+        return shapes
+
+### Prototypes shared by all the roadmap slides in the process (like roadmap_style.STYLES)
+EMITTER = PrototypeEmitter()
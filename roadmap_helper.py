@@ -3,6 +3,8 @@ Funcitons for manaing the "helper" excel spreadsheet that augments the table dat
 in the roadmap_table.
 
 """
+import re
+
 import pandas as pd
 
 ROADMAP_HELPER_ROWS_TO_SKIP = [0]
@@ -38,6 +40,31 @@ ALL_COLS = [UNNAMED__0, IP_GENERATION, BUSINESS, SIMPLESEGMENT, SEGMENT, SHORTHA
 SI_PRODUCT_ONLY = 'SiProductName'
 SI_PRODUCT_SID = 'SiProductSID'
 
+### Long-form columns returned by parse_name_id_cells()
+CELL_ROW = 'row'
+CELL_POSITION = 'position'
+CELL_NAME = 'name'
+CELL_SID = 'sid'
+CELL_TBA = 'tba'
+CELL_BRACKET = 'bracket'
+CELL_COLS = [CELL_ROW, CELL_POSITION, CELL_NAME, CELL_SID, CELL_TBA, CELL_BRACKET]
+
+### One line of a "Name [SPEED ID]" cell:
+###     optional bullet, optional "Type:" prefix (up to the first ':' only - the name may hold
+###     more), the name, then [...] or (TBA) (anything after is ignored) - the [...] is only
+###     an id if it holds nothing but a number ([TBD] gives a name without an id).
+###     Every line matches, so positions follow the cell's lines.
+NAME_ID_LINE_BULLET = r"^[ \t\r\u2022\u00b7*-]*"
+NAME_ID_LINE_TYPE = r"(?:[^:\[\n]*:)?"
+NAME_ID_LINE_REST = r"[ \t\r]*(?P<name>[^\[\n]*?)[ \t\r]*"+\
+    r"(?:(?P<bracket>\[)(?:[ \t]*(?P<sid>\d+)[ \t]*\])?[^\n]*|(?P<tba>\(TBA\))[^\n]*)?$"
+NAME_ID_LINE_RE = re.compile(NAME_ID_LINE_BULLET + NAME_ID_LINE_TYPE + NAME_ID_LINE_REST, re.MULTILINE)
+### Same without the "Type:" prefix - for cells whose names are not prefixed (and may hold ':')
+NAME_ID_LINE_NO_TYPE_RE = re.compile(NAME_ID_LINE_BULLET + NAME_ID_LINE_REST, re.MULTILINE)
+
+### Columns held in the RoadmapHelper name index
+NAME_INDEX_COLS = [SEGMENT, SHORTHAND_NAME, SI_PRODUCT_SID]
+
 ### Simple Segments Names
 ENTHUSIAST = 'Enthusiast'
 PERFORMANCE = 'Performance'
@@ -62,7 +89,7 @@ class RoadmapHelper:
         self.path_to_helper_file = path_to_helper_file
         self._load_excel_file()
         self._add_si_name_column()
-        self._add_si_SID_column()
+        self._build_name_index()
         return
     
     def _load_excel_file(self):
@@ -70,12 +97,42 @@ class RoadmapHelper:
         return
     
     def _add_si_name_column(self):
-        self.df[SI_PRODUCT_ONLY] = self.df[SI_PRODUCT__SPEED_ID_].apply(series_split_name)
+        """
+        Adds the SI_PRODUCT_ONLY and SI_PRODUCT_SID columns from the first line
+        of each SI_PRODUCT__SPEED_ID_ cell (in one parse of the whole column)
+        """
+        self.cells = parse_name_id_cells(self.df[SI_PRODUCT__SPEED_ID_])
+        
+        first = self.cells.loc[(self.cells[CELL_POSITION] == 0) & \
+            (self.cells[CELL_BRACKET] | self.cells[CELL_TBA])].set_index(CELL_ROW)
+        
+        self.df[SI_PRODUCT_ONLY] = first[CELL_NAME].reindex(self.df.index)
+        self.df[SI_PRODUCT_SID] = first[CELL_SID].reindex(self.df.index).fillna(-1).astype(int)
     
-    def _add_si_SID_column(self):
-        self.df[SI_PRODUCT_SID] = self.df[SI_PRODUCT__SPEED_ID_].apply(series_split_id).apply(safe_int)
+    def _build_name_index(self):
+        """
+        Hash index of Si Product name -> (segment, shorthand, SID). First row wins, same as lookup().
+        
+        Every line of a multi-line Si Product cell is indexed, not just the first one.
+        """
+        lines = self.cells.loc[self.cells[CELL_BRACKET] | self.cells[CELL_TBA]]
+        lines = lines.drop_duplicates(subset=CELL_NAME, keep='first')
+        
+        index = self.df.loc[lines[CELL_ROW].values, [SEGMENT, SHORTHAND_NAME]]
+        index[SI_PRODUCT_SID] = lines[CELL_SID].fillna(-1).astype(int).values
+        index.index = pd.Index(lines[CELL_NAME].values, name=SI_PRODUCT_ONLY)
+        self.name_index = index[NAME_INDEX_COLS]
+        return
     
     def lookup(self, value, lookup_col, return_col):
+        if lookup_col == SI_PRODUCT_ONLY and return_col in NAME_INDEX_COLS:
+            try:
+                value = self.name_index.at[value, return_col]
+            except:
+                return None
+            if pd.isna(value):
+                return None
+            return value
         try:
             value = self.df.loc[self.df[lookup_col] == value][return_col].values[0]
             return value
@@ -87,6 +144,19 @@ class RoadmapHelper:
     
     def name_to_shorthand(self, name ):
         return self.lookup(value=name, lookup_col=SI_PRODUCT_ONLY , return_col=SHORTHAND_NAME)
+    
+    def enrich(self, names):
+        """
+        names - pd.Series of Si Product names
+
+        returns (DataFrame of NAME_INDEX_COLS aligned to names.index, set of names not found)
+        """
+        enriched = self.name_index.reindex(names.values)
+        enriched.index = names.index
+        
+        found = names.isin(self.name_index.index)
+        unmatched = set(names.loc[~found & names.notna()])
+        return enriched, unmatched
 
 
 def split_name_id(combined_cell_to_parse):
@@ -118,6 +188,42 @@ def split_name_id(combined_cell_to_parse):
     
     return name, sid
 
+def parse_name_id_cells( cells, type_prefix=True ):
+    """
+    Parses every line of every "Name [SPEED ID]" / "Name (TBA)" cell in one pass.
+
+    cells - pd.Series of cell text (non string cells are ignored)
+    type_prefix - lines may start with a "Type:" prefix (stripped up to the first ':')
+
+    returns a long-form DataFrame with CELL_COLS:
+        row - index label of the cell in cells
+        position - line number within the cell (blank lines are not counted, lines
+            without a name - e.g. "[123]" - are counted but not returned)
+        name - str
+        sid - nullable int (<NA> if no numeric [id] given)
+        tba - bool - True if the line was marked (TBA)
+        bracket - bool - True if the line had a [...] (numeric or not, e.g. [TBD])
+    """
+    text = cells.where(cells.map(lambda c: isinstance(c, str)))
+    found = text.astype(object).str.extractall(NAME_ID_LINE_RE if type_prefix else NAME_ID_LINE_NO_TYPE_RE)
+    
+    blank = (found[CELL_NAME].fillna('') == '') & found[CELL_BRACKET].isna() & found[CELL_TBA].isna()
+    found = found.loc[~blank]
+    positions = found.groupby(level=0, sort=False).cumcount()
+    named = (found[CELL_NAME].notna() & (found[CELL_NAME] != '')).values
+    found = found.loc[named]
+
+    long_form = pd.DataFrame({
+        CELL_ROW:found.index.get_level_values(0),
+        CELL_POSITION:positions.values[named],
+        CELL_NAME:found[CELL_NAME].values,
+        CELL_SID:pd.to_numeric(found[CELL_SID]).astype('Int64').values,
+        CELL_TBA:found[CELL_TBA].notna().values,
+        CELL_BRACKET:found[CELL_BRACKET].notna().values,
+        })
+
+    return long_form.reset_index(drop=True)
+
 def series_split_name( s ):
     return split_name_id(s)[0]
 
@@ -0,0 +1,166 @@
+"""
+roadmap_labels.py
+
+Placement of the text labels on a roadmap slide (milestone adjacent text, text and
+delta annotations, program names) so close milestones don't pile their labels on
+top of each other.
+
+Every label has a preferred box and a few alternative positions - staggered right
+past the labels in its way, nudged above or below. Labels are placed in order of
+their preferred left edge with a sweep line: each lane (label top position) keeps the
+right edge of the labels placed in it so far, so a candidate position is only checked
+against the lanes it overlaps vertically. Markers labels must not cover (and the labels
+placed by earlier place() calls) are kept in a roadmap_router.GridIndex. Placing n
+labels is O(n log n) - the sort.
+"""
+
+import bisect
+
+import roadmap_router as rtr
+
+### Space kept between labels in a lane
+LABEL_GAP_CM = 0.05
+### Furthest a label is staggered to the right of its preferred position
+MAX_STAGGER_CM = 1.0
+### How far a label is nudged above / below its preferred position
+LABEL_NUDGE_CM = 0.16
+### Lane tops closer than this are the same lane
+LANE_ROUNDING = 3
+
+### Positions a label can be placed at (in order of preference)
+PLACE_PREFERRED = 'preferred'
+PLACE_STAGGER = 'stagger'
+PLACE_ABOVE = 'above'
+PLACE_BELOW = 'below'
+### Nothing was free - the label stays at its preferred position
+PLACE_OVERLAP = 'overlap'
+
+ALL_PLACEMENTS = [PLACE_PREFERRED, PLACE_STAGGER, PLACE_ABOVE, PLACE_BELOW]
+### For right aligned labels (ending at their marker) - staggering would push them over it
+NO_STAGGER = [PLACE_PREFERRED, PLACE_ABOVE, PLACE_BELOW]
+FIXED = [PLACE_PREFERRED]
+
+class Label:
+    __slots__ = ['left', 'top', 'width', 'height', 'placements', 'payload', \
+        'placed_left', 'placed_top', 'placement']
+
+    def __init__(self, left, top, width, height, placements=ALL_PLACEMENTS, payload=None):
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.placements = placements
+        self.payload = payload
+
+        ### Filled in by LabelPlacer.place()
+        self.placed_left = None
+        self.placed_top = None
+        self.placement = None
+
+    def __str__(self):
+        return f"Label({self.left:0.2f},{self.top:0.2f} {self.width:0.2f}x{self.height:0.2f} {self.placement})"
+
+class LabelPlacer:
+    def __init__(self, nudge_cm=LABEL_NUDGE_CM, max_stagger_cm=MAX_STAGGER_CM, gap_cm=LABEL_GAP_CM):
+        self.nudge_cm = nudge_cm
+        self.max_stagger_cm = max_stagger_cm
+        self.gap_cm = gap_cm
+
+        self.blockers = rtr.GridIndex()
+        self.labels = []
+        self._unplaced = []
+
+        ### Lane top -> [right edge, height] of the labels placed in it, and the sorted lane tops
+        self._lanes = {}
+        self._lane_tops = []
+        self._max_height = 0.0
+
+    def __len__(self):
+        return len(self.labels)
+
+    def add_blocker(self, left_cm, top_cm, width_cm, height_cm):
+        """
+        Box (a milestone marker) no label may be placed over
+        """
+        return self.blockers.insert(left_cm=left_cm, top_cm=top_cm, width_cm=width_cm, height_cm=height_cm)
+
+    def add(self, left_cm, top_cm, width_cm, height_cm, placements=ALL_PLACEMENTS, payload=None):
+        label = Label(left=left_cm, top=top_cm, width=width_cm, height=height_cm, \
+            placements=placements, payload=payload)
+        self.labels.append(label)
+        self._unplaced.append(label)
+        return label
+
+    def _lanes_overlapping(self, top, height):
+        first = bisect.bisect_right(self._lane_tops, top - self._max_height)
+        last = bisect.bisect_left(self._lane_tops, top + height)
+        for lane_top in self._lane_tops[first:last]:
+            lane = self._lanes[lane_top]
+            if lane_top + lane[1] > top:
+                yield lane
+
+    def _lane_right(self, top, height):
+        """
+        Right edge of the labels already placed in the lanes overlapping top .. top + height
+        """
+        right = None
+        for lane in self._lanes_overlapping(top, height):
+            right = lane[0] if right is None else max(right, lane[0])
+        return right
+
+    def _is_free(self, label, left, top):
+        right = self._lane_right(top, label.height)
+        if right is not None and right + self.gap_cm > left:
+            return False
+        box = rtr.Box(left=left, top=top, right=left+label.width, bottom=top+label.height)
+        return len(self.blockers.query(box)) == 0
+
+    def _candidates(self, label):
+        for placement in label.placements:
+            if placement == PLACE_PREFERRED:
+                yield placement, label.left, label.top
+            elif placement == PLACE_STAGGER:
+                right = self._lane_right(label.top, label.height)
+                if right is not None and right + self.gap_cm - label.left <= self.max_stagger_cm:
+                    yield placement, max(label.left, right + self.gap_cm), label.top
+            elif placement == PLACE_ABOVE:
+                yield placement, label.left, label.top - self.nudge_cm
+            elif placement == PLACE_BELOW:
+                yield placement, label.left, label.top + self.nudge_cm
+
+    def _occupy(self, left, top, width, height):
+        lane_top = round(top, LANE_ROUNDING)
+        lane = self._lanes.get(lane_top)
+        if lane is None:
+            lane = [left + width, height]
+            self._lanes[lane_top] = lane
+            bisect.insort(self._lane_tops, lane_top)
+        else:
+            lane[0] = max(lane[0], left + width)
+            lane[1] = max(lane[1], height)
+        self._max_height = max(self._max_height, height)
+
+    def place(self):
+        """
+        Places the labels added since the last place() - returns them
+        """
+        labels = sorted(self._unplaced, key=lambda l: (l.left, l.top))
+        self._unplaced = []
+
+        for label in labels:
+            label.placement, label.placed_left, label.placed_top = PLACE_OVERLAP, label.left, label.top
+            for placement, left, top in self._candidates(label):
+                if self._is_free(label, left, top):
+                    label.placement, label.placed_left, label.placed_top = placement, left, top
+                    break
+            self._occupy(left=label.placed_left, top=label.placed_top, width=label.width, height=label.height)
+
+        ### The lanes only hold this sweep - labels added later are swept on their own
+        for label in labels:
+            self.add_blocker(left_cm=label.placed_left, top_cm=label.placed_top, width_cm=label.width, \
+                height_cm=label.height)
+        self._lanes = {}
+        self._lane_tops = []
+        self._max_height = 0.0
+
+        return labels
@@ -0,0 +1,154 @@
+"""
+roadmap_parallel.py
+
+Renders the slides of a deck spec in a pool of worker processes (python-pptx work is
+CPU bound - threads would all wait on the GIL).
+
+Every worker gets the compiled configuration (pickled), the roadmap table and the
+template path once - when it starts - and then renders slide specs onto its own copy of
+the template (roadmap_template.TEMPLATES). A slide comes back as its XML and a list of
+its relationships by target part name. The parent copies each slide's contents into
+the deck, in spec order, remapping the relationship ids onto the parent's parts (slide
+layout, pictures of the template slide, ...).
+
+Slides may only refer to parts that are already in the template - roadmaps are made of
+shapes, tables and text so they never add parts of their own.
+
+    pptx = rpl.render_deck_parallel_from_paths(..., slide_specs=slide_specs, workers=8)
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from lxml import etree
+from pptx.oxml import parse_xml
+
+import render_roadmap as rr
+import roadmap_config as rc
+import roadmap_template as rtm
+
+### Per worker process state (set by _init_worker)
+_worker = {}
+
+def worker_count(workers=None):
+    """
+    workers or - for None / 0 - the number of CPUs
+    """
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+def _init_worker(roadmap_template_path, roadmap_configuration, roadmap_table, roadmap_top_cm, \
+    roadmap_height_cm, input_slide_index):
+    _worker['roadmap_template_path'] = roadmap_template_path
+    _worker['roadmap_configuration'] = roadmap_configuration
+    _worker['roadmap_table'] = roadmap_table
+    _worker['roadmap_top_cm'] = roadmap_top_cm
+    _worker['roadmap_height_cm'] = roadmap_height_cm
+    _worker['input_slide_index'] = input_slide_index
+
+def slide_part_data(slide):
+    """
+    (slide XML, [(rId, reltype, target part name or external target, is external), ...])
+    """
+    rels = []
+    for r_id, rel in slide.part.rels.items():
+        if rel.is_external:
+            rels.append((r_id, rel.reltype, rel.target_ref, True))
+        else:
+            rels.append((r_id, rel.reltype, str(rel.target_part.partname), False))
+    return (etree.tostring(slide._element), rels)
+
+def render_slide_part(slide_spec):
+    """
+    Worker - renders slide_spec onto a copy of the template's input slide and returns
+    its slide_part_data
+    """
+    pptx = rtm.TEMPLATES.presentation(_worker['roadmap_template_path'])
+    slide = pptx.slides[_worker['input_slide_index']]
+    rr.render_roadmap_slide(slide=slide, \
+        roadmap_configuration=_worker['roadmap_configuration'].with_swimlanes(slide_spec.swimlanes), \
+        roadmap_table=_worker['roadmap_table'], start_ww=slide_spec.start_ww, end_ww=slide_spec.end_ww, \
+        roadmap_top_cm=_worker['roadmap_top_cm'], roadmap_height_cm=_worker['roadmap_height_cm'], \
+        align_zero=slide_spec.align_zero, pack=slide_spec.pack, title=slide_spec.title)
+    return slide_part_data(slide)
+
+def assemble_slide(slide, slide_xml, rels, parts):
+    """
+    Replaces the contents of slide with a slide rendered in a worker - parts maps part
+    names to the parts of slide's presentation
+    """
+    r_ids = {}
+    for r_id, reltype, target, is_external in rels:
+        if is_external:
+            r_ids[r_id] = slide.part.relate_to(target, reltype, is_external=True)
+            continue
+        if target not in parts:
+            raise ValueError(f"Rendered slide refers to {target} which isn't part of the template")
+        r_ids[r_id] = slide.part.relate_to(parts[target], reltype)
+
+    element = rtm.rewrite_r_ids(parse_xml(slide_xml), r_ids)
+    ### Move the shapes and background into the slide's own cSld / spTree - python-pptx
+    ### caches objects (slide.shapes, ...) that hold on to those elements
+    c_sld = slide._element.cSld
+    sp_tree = c_sld.spTree
+    rendered_c_sld = element.cSld
+    for child in list(sp_tree):
+        sp_tree.remove(child)
+    for child in list(rendered_c_sld.spTree):
+        sp_tree.append(child)
+
+    c_sld._remove_bg()
+    if rendered_c_sld.bg is not None:
+        c_sld.insert(0, rendered_c_sld.bg)
+    for name, value in rendered_c_sld.attrib.items():
+        c_sld.set(name, value)
+    return slide
+
+def render_deck_parallel(roadmap_template_path, slide_specs, roadmap_configuration, roadmap_table, \
+    roadmap_top_cm=1.5, roadmap_height_cm=16.5, input_slide_index=0, workers=None):
+    """
+    Same deck as render_roadmap.render_deck - with the slides rendered by workers processes
+
+    returns the presentation
+    """
+    workers = min(worker_count(workers), len(slide_specs))
+    pptx = rtm.TEMPLATES.presentation(roadmap_template_path)
+    if workers <= 1:
+        return rr.render_deck(pptx=pptx, slide_specs=slide_specs, roadmap_configuration=roadmap_configuration, \
+            roadmap_table=roadmap_table, roadmap_top_cm=roadmap_top_cm, roadmap_height_cm=roadmap_height_cm, \
+            input_slide_index=input_slide_index)
+
+    ### The slides to fill in - copies of the input slide right after it (like render_deck)
+    base_slide = pptx.slides[input_slide_index]
+    slides = [base_slide] + [rtm.duplicate_slide(pptx, base_slide, index=input_slide_index + i) \
+        for i in range(1, len(slide_specs))]
+    parts = {str(part.partname):part for part in pptx.part.package.iter_parts()}
+
+    print(f"Rendering {len(slide_specs)} slides with {workers} workers")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, \
+        initargs=(roadmap_template_path, roadmap_configuration, roadmap_table, \
+            roadmap_top_cm, roadmap_height_cm, input_slide_index)) as executor:
+        ### map() returns the results in spec order whichever worker finishes first
+        for slide, (slide_xml, rels) in zip(slides, executor.map(render_slide_part, slide_specs)):
+            assemble_slide(slide=slide, slide_xml=slide_xml, rels=rels, parts=parts)
+
+    return pptx
+
+def render_deck_parallel_from_paths( golden_doc_path, roadmap_helper_path, roadmap_config_path, \
+    roadmap_template_path, slide_specs, roadmap_top_cm=1.5, roadmap_height_cm=16.5, \
+        input_slide_index=0, roadmap_config=None, workers=None ):
+    """
+    render_roadmap.render_deck_from_paths with the slides rendered in parallel
+    """
+    if roadmap_config is None:
+        r_c = rc.load_roadmap_config(roadmap_config_path)
+    else:
+        r_c = roadmap_config
+
+    roadmap_table = rr.load_roadmap_table(golden_doc_path=golden_doc_path, \
+        roadmap_helper_path=roadmap_helper_path, roadmap_configuration=r_c)
+
+    return render_deck_parallel(roadmap_template_path=roadmap_template_path, slide_specs=slide_specs, \
+        roadmap_configuration=r_c, roadmap_table=roadmap_table, roadmap_top_cm=roadmap_top_cm, \
+        roadmap_height_cm=roadmap_height_cm, input_slide_index=input_slide_index, workers=workers)
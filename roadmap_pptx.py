@@ -10,6 +10,9 @@ Copyright Intel Corporation 2020
 
 from collections import OrderedDict
 import copy
+import heapq
+
+import numpy as np
 
 from pptx import Presentation
 from pptx.util import Inches, Pt, Cm
@@ -28,6 +31,13 @@ from pptx.shapes.connector import Connector    ### Used for a patch
 import intel_ww as iw
 import roadmap_table as rt
 import annotations as an
+import roadmap_style as rs
+import roadmap_router as rtr
+import roadmap_scene as scn
+import roadmap_emitter as rem
+import roadmap_text as rtx
+import roadmap_labels as rl
+import roadmap_template as rtm
 
 
 ### Patch for pptx
@@ -79,6 +89,13 @@ DEFAULT_FONT_NAME = 'Intel Clear'
 DEFAULT_FONT_SIZE_PT = 10
 
 TWO_MM = 0.2
+### Room left around measured text in a text box / beside it in a rounded milestone marker
+TEXT_PADDING_CM = 0.05
+MARKER_PADDING_CM = PRODUCT_MILESTONE_SHAPE_HEIGHT_CM / 2.0
+
+CLIPPED_MARKER_WIDTH_CM = 0.25
+### Space kept between programs packed into the same swimlane sub-row
+PACK_GAP_CM = 0.2
 
 
 def rotate_table_cell( table_cell, rotation=270 ):
@@ -98,23 +115,17 @@ def add_golden_roadmap_slide( presentation ):
     print('add_golden_roadmap_slide()')
     GOLDEN_LAYOUT_NAME = 'Right Quarter white new'
 
-    layout_dict = {}
-    for layout in presentation.slide_layouts:
-        layout_dict[layout.name]=layout
-    
-    golden_slide = presentation.slides.add_slide(layout_dict[GOLDEN_LAYOUT_NAME])
+    golden_slide = presentation.slides.add_slide(rtm.slide_layout(presentation, GOLDEN_LAYOUT_NAME))
 
     print(golden_slide.slide_layout.name)
 
     return golden_slide
 
-def text_length_to_cm( text, pts ):
-    len_cm = len(text) * pts * POINTS_PER_CM
-
-    if text == 'A0 TI':
-        len_cm = len_cm * 0.8
-        
-    return len_cm
+def text_length_to_cm( text, pts, font_name=DEFAULT_FONT_NAME, bold=False ):
+    """
+    Width of a text box for text - measured from the font's advance widths (roadmap_text)
+    """
+    return rtx.text_width_cm(text=text, size_pts=pts, font_name=font_name, bold=bold) + TEXT_PADDING_CM
 
 class Milestone:
     def __init__(self, text, ww_date, adjacent_text ='', \
@@ -151,6 +162,12 @@ class Milestone:
     def ww(self):
         return self.ww_date.ww
     
+    def is_rendered(self):
+        """
+        Milestones outside of the canvas window are not rendered (and have no position)
+        """
+        return self.marker_left_cm is not None
+    
     def year(self):
         return self.ww_date.year
     
@@ -224,6 +241,10 @@ class ProgramInformation:
         self.milestones = milestones_list   ## Of type list(Milestones)
         self.from_roadmap_top_cm = from_roadmap_top_cm
         self.component_list = component_list
+        
+        ### Set by RoadmapSlide.render_program if the program runs off the canvas window
+        self.clipped_start = False
+        self.clipped_end = False
         return
     
     def __str__(self):
@@ -265,6 +286,10 @@ class ConceptProgramInformation:
         self.shorthand_name = self.si_program.name
         self.milestones = self._create_milestones_list()
         self.from_roadmap_top_cm = from_roadmap_top_cm
+
+        ### Set by RoadmapSlide.render_program if the program runs off the canvas window
+        self.clipped_start = False
+        self.clipped_end = False
         return
     
     def __str__(self):
@@ -371,6 +396,20 @@ class Business:
         self.program_list = segment_list
         return
 
+### What CanvasGrid.ordinals_to_pct_width does with weeks outside of the grid
+OUT_OF_WINDOW_NAN = 'nan'
+OUT_OF_WINDOW_CLAMP = 'clamp'
+OUT_OF_WINDOW_RAISE = 'raise'
+
+def ww_ordinals(wws):
+    """
+    Float array of week ordinals from a list of WWs (None is NaN) or an array of ordinals
+    """
+    if isinstance(wws, np.ndarray):
+        return wws.astype(float)
+    return np.array([np.nan if w is None else (w.ordinal() if isinstance(w, iw.WW) else w) \
+        for w in wws], dtype=float)
+
 class CanvasGrid:
     """
     Class to collect up helper functions to figure out how to draw the 
@@ -390,8 +429,11 @@ class CanvasGrid:
 
         self.ww_span = self.left_edge_ww.ww_delta_from(self.right_edge_ww)
 
-        self.ww_to_pct = build_canvas_dict(left_ww=self.left_edge_ww,\
+        ### Fraction of the canvas width at each week - indexed by week ordinal - first_ordinal
+        self.first_ordinal = self.left_edge_ww.ordinal()
+        self.ww_to_pct = build_canvas_array(left_ww=self.left_edge_ww,\
              right_ww=self.right_edge_ww, quarter_count=self.total_quarters())
+        self.ww_to_pct.flags.writeable = False
         return
     
     def __str__(self):
@@ -425,16 +467,58 @@ class CanvasGrid:
         return  fyq + myq + lyq
     
     def ww_to_pct_width(self, ww):
-        return self.ww_to_pct[dict_str(ww=ww.ww, year=ww.year)]
-
-def dict_str(ww, year):
-    return f"{ww:02}'{year:02}"
+        """
+        Fraction of the canvas width at ww - KeyError if ww is outside of the grid
+        """
+        i = ww.ordinal() - self.first_ordinal
+        if i < 0 or i >= len(self.ww_to_pct):
+            raise KeyError(str(ww))
+        return self.ww_to_pct[i]
+    
+    def ordinals_to_pct_width(self, ordinals, out_of_window=OUT_OF_WINDOW_NAN):
+        """
+        Vectorized ww_to_pct_width for an array of week ordinals (NaN ordinals give NaN).
+        Weeks outside of the grid are NaN, clamped to the nearest edge (OUT_OF_WINDOW_CLAMP)
+        or raise a KeyError (OUT_OF_WINDOW_RAISE)
+        """
+        ordinals = np.asarray(ordinals, dtype=float)
+        index = ordinals - self.first_ordinal
+        last = len(self.ww_to_pct) - 1
+        outside = (index < 0) | (index > last)
+        
+        if out_of_window == OUT_OF_WINDOW_RAISE and np.any(outside):
+            raise KeyError(f"{int(np.sum(outside))} week(s) outside of {self}")
+        if out_of_window not in [OUT_OF_WINDOW_NAN, OUT_OF_WINDOW_CLAMP, OUT_OF_WINDOW_RAISE]:
+            raise ValueError(f"Unknown out_of_window {out_of_window}")
+        
+        missing = np.isnan(index)
+        pct = self.ww_to_pct[np.clip(np.where(missing, 0, index), 0, last).astype(np.int64)]
+        if out_of_window == OUT_OF_WINDOW_NAN:
+            missing = missing | outside
+        return np.where(missing, np.nan, pct)
+    
+    def contains(self, ww):
+        """
+        True if the ww falls between the left and right edges of the grid
+        """
+        return not (ww < self.left_edge_ww) and not (self.right_edge_ww < ww)
+    
+    def clamp(self, ww):
+        """
+        Returns the ww pulled back to the nearest edge of the grid if it falls outside
+        """
+        if ww < self.left_edge_ww:
+            return self.left_edge_ww
+        if self.right_edge_ww < ww:
+            return self.right_edge_ww
+        return ww
 
-def build_canvas_dict(left_ww, right_ww, quarter_count):
+def build_canvas_array(left_ww, right_ww, quarter_count):
     """
-    Maps ww's to the X axis.
+    Maps ww's to the X axis - element i is the fraction of the canvas width at
+    week ordinal left_ww.ordinal() + i
     """
-    ww_to_pct = OrderedDict()
+    ww_to_pct = []
 
     one_ww_pct = 1.0 / (quarter_count * iw.WW_PER_QTR)
     
@@ -458,7 +542,7 @@ def build_canvas_dict(left_ww, right_ww, quarter_count):
             if ww < start_ww:
                 continue
             
-            ww_to_pct[dict_str(ww=ww, year=year)] = pct_sum
+            ww_to_pct.append(pct_sum)
     
             ### Skip the ww's at the end
             if year == end_year and ww == end_ww:
@@ -467,7 +551,7 @@ def build_canvas_dict(left_ww, right_ww, quarter_count):
             pct_sum =pct_sum + my_ww_pct
         start_ww = 1
     
-    return ww_to_pct
+    return np.array(ww_to_pct, dtype=float)
 
 class RoadmapCanvas:
     DEFAULT_YEAR_HEIGHT_CM = 0.75
@@ -491,8 +575,16 @@ class RoadmapCanvas:
         self.cm_per_ww = self.canvas_width_cm / float(self.grid.total_quarters() * WW_PER_Q)
         return
     
-    def ww_to_slide_x_cm(self, ww):
-        pct_of_x_canvas = self.grid.ww_to_pct_width(ww=ww)
+    def ww_to_slide_x_cm(self, ww, out_of_window=OUT_OF_WINDOW_NAN):
+        """
+        Slide x of a WW (KeyError outside of the grid) - or of every week in an array of
+        week ordinals / list of WWs at once (see CanvasGrid.ordinals_to_pct_width for out_of_window)
+        """
+        if isinstance(ww, iw.WW):
+            pct_of_x_canvas = self.grid.ww_to_pct_width(ww=ww)
+        else:
+            pct_of_x_canvas = self.grid.ordinals_to_pct_width(ordinals=ww_ordinals(ww), \
+                out_of_window=out_of_window)
         from_left_edge_cm = pct_of_x_canvas * self.canvas_width_cm
         return self.canvas_left_edge_cm + from_left_edge_cm
     
@@ -613,7 +705,7 @@ class SwimlanesGrid:
     ROW_INDEX = 'RowNumber'
     NAME = 'Name'
 
-    def __init__(self, hierarchy, major_column_name, minor_column_name ):
+    def __init__(self, hierarchy, major_column_name, minor_column_name, row_index=None ):
         """
         herarchy is in the form:
         h = OrderedDict()
@@ -632,9 +724,13 @@ class SwimlanesGrid:
         as a name for a segment - this is used only to create
         an additional row of space in the layout - and is not
         included in the reporting of actual segments in the table
+
+        row_index - (major, minor) -> table row index, e.g. RoadmapConfig.swimlane_row_index
+        (worked out from the hierarchy's order if not given)
         """
         self.h = OrderedDict()
         self.row_count = 0
+        built_row_index = {}
         for major, major_d in hierarchy.items():
             self.h[major] = OrderedDict()
             self.h[major][SwimlanesGrid.ROW_COUNT]=len(major_d)
@@ -643,7 +739,10 @@ class SwimlanesGrid:
                 self.h[major][SwimlanesGrid.ROWS][minor]=OrderedDict()
                 self.h[major][SwimlanesGrid.ROWS][minor][SwimlanesGrid.NAME]=minor_namme
                 self.h[major][SwimlanesGrid.ROWS][minor][SwimlanesGrid.ROW_INDEX]=self.row_count
+                built_row_index[(major, minor)] = self.row_count
                 self.row_count = self.row_count + 1
+        
+        self.row_index = built_row_index if row_index is None else row_index
         return
     
     def major_row_values(self):
@@ -664,10 +763,10 @@ class SwimlanesGrid:
         return self.h[major_value][SwimlanesGrid.ROW_COUNT]
     
     def row_index_for_business_segment(self, business_name, segment_name):
-        return self.h[business_name][SwimlanesGrid.ROWS][segment_name][SwimlanesGrid.ROW_INDEX]
+        return self.row_index[(business_name, segment_name)]
     
     def row_index_for_major_column_minor_column(self, major_value, minor_value):
-        return self.h[major_value][SwimlanesGrid.ROWS][minor_value][SwimlanesGrid.ROW_INDEX]
+        return self.row_index[(major_value, minor_value)]
     
     def segment_name_for_business_segment(self, business_name, segment_name):
         return self.h[business_name][SwimlanesGrid.ROWS][segment_name][SwimlanesGrid.NAME]
@@ -675,6 +774,30 @@ class SwimlanesGrid:
     def third_column_for_major_column_minor_column(self, major_value, minor_value):
         return self.h[major_value][SwimlanesGrid.ROWS][minor_value][SwimlanesGrid.NAME]
 
+def pack_intervals(intervals, gap=0.0):
+    """
+    Greedy interval partitioning - assigns each (left, right) interval a sub-row so
+    intervals in a sub-row are at least gap apart, using the fewest sub-rows.
+    Intervals are taken in order of left edge, each going into the sub-row that frees
+    up first (a heap of sub-row right edges) if it's free, else into a new sub-row.
+
+    returns (list of sub-row index per interval, number of sub-rows)
+    """
+    order = sorted(range(len(intervals)), key=lambda i: (intervals[i][0], intervals[i][1]))
+    rows = [None] * len(intervals)
+    free_at = []   ### (right edge + gap, sub-row)
+    row_count = 0
+    for i in order:
+        left, right = intervals[i]
+        if len(free_at) > 0 and free_at[0][0] <= left:
+            _, row = heapq.heappop(free_at)
+        else:
+            row = row_count
+            row_count = row_count + 1
+        rows[i] = row
+        heapq.heappush(free_at, (right + gap, row))
+    return (rows, row_count)
+
 class SwimlaneTable:
     """
     Function to generate the Swimlanes Table
@@ -690,20 +813,44 @@ class SwimlaneTable:
         self.row_count = self.grid.row_count
         self.cm_per_row = self.table_height_cm / float(self.row_count)
 
+        ### Set by size_lanes() - otherwise every row is cm_per_row high
+        self.row_heights_cm = None
+        self.row_tops_cm = None
+
         return
     
+    def size_lanes( self, lane_row_counts ):
+        """
+        Sizes each row (lane) of the table to its share of lane_row_counts {row index: packed
+        program sub-rows} - lanes not in lane_row_counts count as one sub-row
+        """
+        counts = [max(1, lane_row_counts.get(row_index, 1)) for row_index in range(self.row_count)]
+        cm_per_sub_row = self.table_height_cm / float(sum(counts))
+        self.row_heights_cm = [count * cm_per_sub_row for count in counts]
+        self.row_tops_cm = []
+        top_cm = 0.0
+        for height_cm in self.row_heights_cm:
+            self.row_tops_cm.append(top_cm)
+            top_cm = top_cm + height_cm
+        return self.row_heights_cm
+    
+    def row_top_cm( self, row_index ):
+        if self.row_tops_cm is None:
+            return self.table_top_cm + (row_index * self.cm_per_row)
+        return self.table_top_cm + self.row_tops_cm[row_index]
+    
     def y_value_in_cm_for_segment( self, business, segment):
         row_index = self.grid.row_index_for_business_segment(business_name=business,\
             segment_name=segment)
         
-        return self.table_top_cm + (row_index * self.cm_per_row)
+        return self.row_top_cm(row_index)
 
     def y_value_in_cm_for_major_column_minor_column( self, major_value, minor_value ):
         row_index = \
             self.grid.row_index_for_major_column_minor_column(major_value=major_value, \
                 minor_value=minor_value)
         
-        return self.table_top_cm + (row_index * self.cm_per_row)
+        return self.row_top_cm(row_index)
     
     def render_swimlanes_table(self, shapes ):
             """
@@ -721,6 +868,11 @@ class SwimlaneTable:
             ## Set column widths
             table.columns[0].width = Cm(0.9)
 
+            ## Packed lanes (size_lanes) are not all the same height
+            if self.row_heights_cm is not None:
+                for row_index, height_cm in enumerate(self.row_heights_cm):
+                    table.rows[row_index].height = Cm(height_cm)
+
             # Defaults from the  Golden Roadmap
             table.first_col = False
             table.first_row = False
@@ -835,6 +987,17 @@ class RoadmapSlide:
         self.quarter_span = quarter_span
 
         self.cm_per_ww = self.roadmap_width_cm / (float(self.quarter_span) * WW_PER_Q)
+
+        ### Boxes drawn so far (bars, milestones, text) - connectors are routed around them
+        self.obstacles = rtr.GridIndex()
+
+        ### Everything is laid out into the scene first - emit() writes it to the slide
+        self.scene = scn.Scene()
+        self._emitted = 0
+
+        ### Labels are placed (roadmap_labels) and connectors routed just before emit()
+        self.labels = rl.LabelPlacer()
+        self._pending_routes = []
         #print('========>',self.cm_per_ww, '=', self.roadmap_width_cm,'/', float(self.quarter_span),'*', WW_PER_Q)
     
     def __str__(self):
@@ -856,43 +1019,80 @@ class RoadmapSlide:
         return self.roadmap_canvas.ww_to_slide_x_cm(ww)
         
 
-    def render_program(self, program_information, from_roadmap_top_cm=None, \
-        align_zero=False):
+    def program_bar_cm(self, program_information, align_zero=False):
         """
+        (left_cm, width_cm) of the program's bar - sets the program's clipped_start / clipped_end
         """
-        if from_roadmap_top_cm is None:
-            from_roadmap_top_cm = program_information.from_roadmap_top_cm
-        
-        vertical_offset_cm = from_roadmap_top_cm
-
         first_milestone = program_information.first_milestone()
+        last_milestone = program_information.last_milestone()
+        grid = self.roadmap_canvas.grid
         
         if align_zero:
             align_zero_ww = first_milestone.ww_date
+            start_ww = first_milestone.ww_date
+            end_ww = last_milestone.ww_date
         else:
             align_zero_ww = None
+            ### Clip the program bar to the canvas window
+            start_ww = grid.clamp(first_milestone.ww_date)
+            end_ww = grid.clamp(last_milestone.ww_date)
+            program_information.clipped_start = not grid.contains(first_milestone.ww_date)
+            program_information.clipped_end = not grid.contains(last_milestone.ww_date)
 
-        left_offset_cm = self.ww_to_offset_cm(ww=first_milestone.ww_date, \
-            align_zero_ww=align_zero_ww)
+        left_offset_cm = self.ww_to_offset_cm(ww=start_ww, align_zero_ww=align_zero_ww)
+
+        width_cm = start_ww.ww_delta_from(end_ww) * self.roadmap_canvas.cm_per_ww
+        return (left_offset_cm, width_cm)
+
+    def program_extent_cm(self, program_information, align_zero=False):
+        """
+        (left_cm, right_cm) of what render_program draws - the name to the left of the bar and the bar
+        """
+        left_offset_cm, width_cm = self.program_bar_cm(program_information=program_information, \
+            align_zero=align_zero)
+        name_width_cm = text_length_to_cm(program_information.shorthand_name, 8.0, \
+            font_name='Intel Clear', bold=True)
+        return (left_offset_cm - name_width_cm - TWO_MM, left_offset_cm + width_cm)
+
+    def render_program(self, program_information, from_roadmap_top_cm=None, \
+        align_zero=False):
+        """
+        """
+        if from_roadmap_top_cm is None:
+            from_roadmap_top_cm = program_information.from_roadmap_top_cm
         
-        last_milestone = program_information.last_milestone()
+        vertical_offset_cm = from_roadmap_top_cm
+
+        grid = self.roadmap_canvas.grid
 
-        width_cm = first_milestone.ww_date.ww_delta_from(last_milestone.ww_date) * self.roadmap_canvas.cm_per_ww
+        left_offset_cm, width_cm = self.program_bar_cm(program_information=program_information, \
+            align_zero=align_zero)
 
-        add_rounded_rectangle_marker(shapes=self.slide.shapes, \
-            left_cm=left_offset_cm,\
+        self.layout_marker(left_cm=left_offset_cm,\
             width_cm = width_cm, top_cm=vertical_offset_cm, text = None,\
                 font_size=PRODUCT_TEXT_IN_SHAPE_PTS, font_bold=True,\
                      line_rgb=RGBColor(0,0,0), line_width=PRODUCT_SHAPE_LINE_WIDTH)
+        self.obstacles.insert(left_cm=left_offset_cm, top_cm=vertical_offset_cm, width_cm=width_cm, \
+            height_cm=PRODUCT_SHAPE_HEIGHT_CM)
         
-        prog_left_offset_cm = left_offset_cm - \
-            text_length_to_cm(program_information.shorthand_name, PRODUCT_MILESTONE_TEXT_IN_SHAPE_PTS/Pt(1.0))-\
-                TWO_MM
-
+        ### Arrow heads on the bar show the program continues outside of the window
+        if program_information.clipped_start:
+            self.layout_marker(left_cm=left_offset_cm, \
+                top_cm=vertical_offset_cm, width_cm=CLIPPED_MARKER_WIDTH_CM, mso_shape=MSO_SHAPE.LEFT_ARROW,\
+                fill_rgb=RGBColor(0,0,0), line_rgb=None, adjustments=[])
         
-        text_width_cm = text_length_to_cm(program_information.shorthand_name, PRODUCT_MILESTONE_TEXT_IN_SHAPE_PTS/Pt(1.0))
+        if program_information.clipped_end:
+            self.layout_marker(\
+                left_cm=left_offset_cm+width_cm-CLIPPED_MARKER_WIDTH_CM, \
+                top_cm=vertical_offset_cm, width_cm=CLIPPED_MARKER_WIDTH_CM, mso_shape=MSO_SHAPE.RIGHT_ARROW,\
+                fill_rgb=RGBColor(0,0,0), line_rgb=None, adjustments=[])
         
-        add_text_box(shapes=self.slide.shapes, left_cm=prog_left_offset_cm, \
+        text_width_cm = text_length_to_cm(program_information.shorthand_name, 8.0, \
+            font_name='Intel Clear', bold=True)
+        
+        prog_left_offset_cm = left_offset_cm - text_width_cm - TWO_MM
+        
+        self.layout_label(left_cm=prog_left_offset_cm, placements=rl.NO_STAGGER, \
             top_cm=vertical_offset_cm+PRODUCT_MILESTONE_SHAPE_HEIGHT_CM/3.0, 
             width_cm = text_width_cm, \
                 height_cm=PRODUCT_MILESTONE_SHAPE_HEIGHT_CM,\
@@ -903,6 +1103,9 @@ class RoadmapSlide:
 
         vertical_offset_cm = vertical_offset_cm + ADD_TO_CENTER_MILESTONE_IN_PRODUCT_SHAPE
         
+        ### Every milestone's x in one array operation - NaN outside of the window
+        milestone_x_cm = self.roadmap_canvas.ww_to_slide_x_cm([ms.ww_date for ms in program_information.milestones])
+        
         updated_milestone_list = []   ### Make new copy to avoid changing items durin
                                     ### the enumeration below
         for i, ms in enumerate(program_information.milestones):
@@ -912,8 +1115,14 @@ class RoadmapSlide:
             elif i == len(program_information.milestones)-1:
                 is_last = True
             
+            in_window = not np.isnan(milestone_x_cm[i])
+            if not align_zero and not in_window:
+                ### Outside of the window - nothing to draw
+                updated_milestone_list.append(ms)
+                continue
+            
             updated_milestone = self.render_milestone(milestone=ms, vertical_offset_cm=vertical_offset_cm,\
-                 is_first=is_first, is_last=is_last)
+                 is_first=is_first, is_last=is_last, x_cm=milestone_x_cm[i] if in_window else None)
 
             updated_milestone_list.append(updated_milestone)
         
@@ -923,19 +1132,26 @@ class RoadmapSlide:
         return program_information
     
     def render_milestone(self, milestone, vertical_offset_cm, left_offset_cm=0.0, \
-        is_first=False, is_last=False):
+        is_first=False, is_last=False, x_cm=None):
+        """
+        x_cm - the milestone's slide x if it's already known (see render_program)
+        """
+        if x_cm is None:
+            x_cm = self.ww_to_offset_cm(ww=milestone.ww_date)
         
         shape_text = milestone.text
-        width_cm = text_length_to_cm(shape_text, PRODUCT_MILESTONE_TEXT_IN_SHAPE_PTS/Pt(1.0))
+        ### Marker text is in the shape_style_id default font (Arial)
+        width_cm = text_length_to_cm(shape_text, PRODUCT_MILESTONE_TEXT_IN_SHAPE_PTS/Pt(1.0), \
+            font_name='Arial') + MARKER_PADDING_CM
         
         if is_first and is_last:
             raise ValueError('Cannot specify both is_first=True and is_last=True')
 
         if is_last:
             ## Special case positioning the last milestone to be "right justified"
-            left_offset_cm = self.ww_to_offset_cm(ww=milestone.ww_date) - width_cm + left_offset_cm
+            left_offset_cm = x_cm - width_cm + left_offset_cm
         else:
-            left_offset_cm = self.ww_to_offset_cm(ww=milestone.ww_date) + left_offset_cm
+            left_offset_cm = x_cm + left_offset_cm
         
         ### Update the milestone passed in with information related to rendering
         milestone.is_first = is_first
@@ -943,29 +1159,35 @@ class RoadmapSlide:
         milestone.marker_left_cm = left_offset_cm
         milestone.marker_width_cm = width_cm
 
-        add_rounded_rectangle_marker(shapes=self.slide.shapes, left_cm=left_offset_cm,\
+        self.layout_marker(left_cm=left_offset_cm,\
             top_cm=vertical_offset_cm, width_cm = width_cm, height_cm=PRODUCT_MILESTONE_SHAPE_HEIGHT_CM,\
                 text = shape_text, fill_rgb=milestone.fill_rgb, font_size=PRODUCT_MILESTONE_TEXT_IN_SHAPE_PTS,\
                      font_rgb_color=milestone.text_rgb, line_rgb=None)
+        self.obstacles.insert(left_cm=left_offset_cm, top_cm=vertical_offset_cm, width_cm=width_cm, \
+            height_cm=PRODUCT_MILESTONE_SHAPE_HEIGHT_CM)
+        self.labels.add_blocker(left_cm=left_offset_cm, top_cm=vertical_offset_cm, width_cm=width_cm, \
+            height_cm=PRODUCT_MILESTONE_SHAPE_HEIGHT_CM)
 
 
         if milestone.adjacent_text != '':
         
             if is_last:
                 ## Special case positioning the last milestone to be "right justified"
-                text_width_cm = text_length_to_cm(milestone.adjacent_text, 8.0)
+                text_width_cm = text_length_to_cm(milestone.adjacent_text, 8.0, font_name='Intel Clear', bold=True)
                 left_offset_cm = left_offset_cm - text_width_cm - TWO_MM / 3.0
                 text_align = PP_ALIGN.RIGHT
+                placements = rl.NO_STAGGER
             else:
-                text_width_cm = text_length_to_cm(milestone.text, 8.0)
-                left_offset_cm = left_offset_cm + text_width_cm - TWO_MM / 2.0
+                text_width_cm = text_length_to_cm(milestone.adjacent_text, 8.0, font_name='Intel Clear', bold=True)
+                left_offset_cm = left_offset_cm + width_cm + TWO_MM / 4.0
                 text_align = PP_ALIGN.LEFT
+                placements = rl.ALL_PLACEMENTS
             
             ### Update the milestone passed in with information related to rendering
             milestone.text_box_left_cm = left_offset_cm
             milestone.text_box_width_cm = text_width_cm
             
-            add_text_box(shapes=self.slide.shapes, left_cm=left_offset_cm, \
+            self.layout_label(left_cm=left_offset_cm, placements=placements, milestone=milestone, \
                 top_cm=vertical_offset_cm, 
                 width_cm = text_width_cm, \
                     height_cm=PRODUCT_MILESTONE_SHAPE_HEIGHT_CM,\
@@ -977,74 +1199,135 @@ class RoadmapSlide:
         #print(milestone, "width_cm",width_cm, "left_offset_cm", left_offset_cm)
         return milestone
 
-    def render_annotations(self, pi, all_pis_dict):
-        for key, ann in pi.annotations().items():
-            ### Phase Implementation
-            if isinstance(ann, an.Text):
-                self._render_an_Text(pi=pi, ann=ann, all_pis_dict=all_pis_dict)
-            
-            if isinstance(ann, an.Delta):
-                self._render_an_Delta(pi=pi, ann=ann, all_pis_dict=all_pis_dict)
-    
-    def _render_an_Text(self, pi, ann, all_pis_dict ):
-        shape_text = ann.text
-
-        milestone_before = pi.milestone_by_text(ann.milestone)
-        
-        left_offset_cm  = milestone_before.right_of_marker_and_text()
+    def render_text_record(self, pi, milestone, shape_text, style_id ):
+        """
+        Text annotation to the right of milestone (see roadmap_annotations.render_records)
+        """
+        left_offset_cm  = milestone.right_of_marker_and_text()
 
-        width_cm = 1.0
+        width_cm = self.label_width_cm(text=shape_text, style_id=style_id)
 
         vertical_offset_cm = pi.from_roadmap_top_cm + ADD_TO_CENTER_MILESTONE_IN_PRODUCT_SHAPE
         
         left_offset_cm = left_offset_cm + SM_CM  ## Fudge it a little
 
-        add_text_box(shapes=self.slide.shapes, left_cm=left_offset_cm,\
+        self.layout_label(left_cm=left_offset_cm,\
                  top_cm=vertical_offset_cm, width_cm = width_cm, height_cm=PRODUCT_MILESTONE_SHAPE_HEIGHT_CM,\
-                text = shape_text, text_align=PP_ALIGN.LEFT, text_auto_size=MSO_AUTO_SIZE.NONE,\
-                fill_rgb=None, line_rgb = None, line_width= Pt(1.0), line_dash = None,\
-                font_name='Intel Clear', font_size = Pt(8), font_rgb_color=RGBColor(0,0,0), font_bold=True)
+                text = shape_text, style_id=style_id)
     
-    def _render_an_Delta(self, pi, ann, all_pis_dict ):
-        try:
-            milestone_before = pi.milestone_by_text(ann.start)
-        except:
-            print(f"Error rendering Delta{ann.text} milestone{ann.start} not found")
-            return
-        try:
-            milestone_after = pi.milestone_by_text(ann.end)
-        except:
-            print(f"Error rendering Delta '{ann.text}' milestone:{ann.end} not found")
-            return
-        
-        #print(ann.my_col, milestone_before.text, milestone_before.ww_date, milestone_after.text, milestone_after.ww_date)
-        
-        ww_delta = milestone_before.ww_date.ww_delta_from(milestone_after.ww_date)
-
-        if ann.date_format is None or ann.date_format == '' or \
-            ann.date_format == an.DF_D:
-            date_text = iw.wws_to_days_text(wws=ww_delta)
-        elif ann.date_format == an.DF_WWs:
-            date_text = iw.wws_to_text(wws=ww_delta)
-        elif ann.date_format == an.DF_QTR:
-            date_text = iw.wws_to_qtr_text(wws=ww_delta)
-        elif ann.date_format == an.DF_YRS:
-            date_text = iw.wws_to_years_text(wws=ww_delta)
-
-        shape_text = ann.text + date_text + ann.after_text
-        
+    def render_delta_record(self, pi, milestone_before, shape_text, style_id ):
+        """
+        Delta annotation (text already includes the formatted delta) to the right of milestone_before
+        """
         left_edge_cm = milestone_before.right_of_marker_and_text() + SM_CM
         
-        width_cm = 1.0
+        width_cm = self.label_width_cm(text=shape_text, style_id=style_id)
         
         vertical_offset_cm = pi.from_roadmap_top_cm + ADD_TO_CENTER_MILESTONE_IN_PRODUCT_SHAPE*0.5
         
-        add_text_box(shapes=self.slide.shapes, left_cm=left_edge_cm,\
+        self.layout_label(left_cm=left_edge_cm,\
                  top_cm=vertical_offset_cm, width_cm = width_cm, height_cm=PRODUCT_MILESTONE_SHAPE_HEIGHT_CM,\
-                text = shape_text, text_align=PP_ALIGN.LEFT, text_auto_size=MSO_AUTO_SIZE.NONE,\
-                fill_rgb=None, line_rgb = None, line_width= Pt(1.0), line_dash = None,\
-                font_name='Intel Clear', font_size = Pt(9), font_rgb_color=RGBColor(0,0,128), font_bold=True )
+                text = shape_text, style_id=style_id)
+
+
+    def layout_marker(self, left_cm, top_cm, width_cm, height_cm=PRODUCT_SHAPE_HEIGHT_CM,\
+        mso_shape=MSO_SHAPE.ROUNDED_RECTANGLE, text=None, adjustments=[1.0], style_id=None, z=0, **style_args):
+        """
+        Lays out what add_rounded_rectangle_marker would draw (same arguments) into the scene
+        """
+        if style_id is None:
+            style_id = shape_style_id(**style_args)
+        return self.scene.add_shape(mso_shape=mso_shape, left_cm=left_cm, top_cm=top_cm, \
+            width_cm=width_cm, height_cm=height_cm, adjustments=adjustments, text=text, \
+            style_id=style_id, z=z)
+    
+    def layout_text_box(self, left_cm, top_cm, width_cm, height_cm=PRODUCT_SHAPE_HEIGHT_CM,\
+        text=None, style_id=None, z=0, **style_args):
+        """
+        Lays out what add_text_box would draw (same arguments) into the scene
+        """
+        if style_id is None:
+            style_id = shape_style_id(**style_args)
+        return self.scene.add_text_box(left_cm=left_cm, top_cm=top_cm, width_cm=width_cm, \
+            height_cm=height_cm, text=text, style_id=style_id, z=z)
+    
+    def layout_label(self, left_cm, top_cm, width_cm, height_cm=PRODUCT_SHAPE_HEIGHT_CM, \
+        placements=rl.ALL_PLACEMENTS, milestone=None, **text_box_args):
+        """
+        Text box that place_labels() may move (to one of placements) so it doesn't
+        overlap other labels or milestone markers - milestone gets the final position
+        """
+        index = self.layout_text_box(left_cm=left_cm, top_cm=top_cm, width_cm=width_cm, \
+            height_cm=height_cm, **text_box_args)
+        self.labels.add(left_cm=left_cm, top_cm=top_cm, width_cm=width_cm, height_cm=height_cm, \
+            placements=placements, payload=(index, milestone))
+        return index
 
+    def label_width_cm(self, text, style_id):
+        """
+        Width of a label with text in the font of style_id
+        """
+        style = rs.STYLES.style(style_id)
+        pts = DEFAULT_FONT_SIZE_PT if style.font_size is None else style.font_size / Pt(1.0)
+        font_name = DEFAULT_FONT_NAME if style.font_name is None else style.font_name
+        return text_length_to_cm(text, pts, font_name=font_name, bold=bool(style.font_bold))
+
+    def place_labels(self):
+        """
+        Moves the labels laid out since the last call to where roadmap_labels placed them
+        """
+        for label in self.labels.place():
+            index, milestone = label.payload
+            self.scene.move(index, left_cm=label.placed_left, top_cm=label.placed_top)
+            self.obstacles.insert(left_cm=label.placed_left, top_cm=label.placed_top, \
+                width_cm=label.width, height_cm=label.height)
+            if milestone is not None:
+                milestone.text_box_left_cm = label.placed_left
+        return self.labels
+
+    def emit(self):
+        """
+        Writes everything laid out since the last emit() into the slide
+        """
+        self.place_labels()
+        self.route_pending()
+        emit_scene(scene=self.scene, shapes=self.slide.shapes, start=self._emitted)
+        self._emitted = len(self.scene)
+        return self.slide
+
+    def route_connector(self, x1, y1, x2, y2 ):
+        """
+        Dashed connector from (x1, y1) to (x2, y2) - routed around the boxes drawn
+        (and the labels placed) by the time the slide is emitted
+        """
+        self._pending_routes.append((x1, y1, x2, y2))
+
+    def route_pending(self):
+        for x1, y1, x2, y2 in self._pending_routes:
+            points = rtr.route(index=self.obstacles, x1=x1, y1=y1, x2=x2, y2=y2)
+            if len(points) == 2:
+                self.scene.add_connector(x1_cm=points[0][0], y1_cm=points[0][1], \
+                    x2_cm=points[1][0], y2_cm=points[1][1])
+            else:
+                self.scene.add_polyline(points_cm=points)
+        self._pending_routes = []
+
+    def render_line_to_record(self, start_geometry, end_geometry, shape_text, style_id ):
+        """
+        Line from the middle of one rendered milestone to the middle of another
+        (roadmap_annotations.MilestoneGeometry) - any text is put next to the start
+        """
+        x1 = (start_geometry.left_cm + start_geometry.right_cm) / 2.0
+        x2 = (end_geometry.left_cm + end_geometry.right_cm) / 2.0
+
+        self.route_connector(x1=x1, y1=start_geometry.center_y_cm, x2=x2, y2=end_geometry.center_y_cm)
+        
+        if shape_text is not None and shape_text != '':
+            self.layout_label(left_cm=start_geometry.right_cm + SM_CM, \
+                top_cm=start_geometry.center_y_cm - PRODUCT_MILESTONE_SHAPE_HEIGHT_CM/2.0, \
+                width_cm=self.label_width_cm(text=shape_text, style_id=style_id), \
+                height_cm=PRODUCT_MILESTONE_SHAPE_HEIGHT_CM, text=shape_text, style_id=style_id)
+        return
 
     def annotate_slip(self, start_pi, start_ms, end_pi, end_ms, align_zero=False ):
 
@@ -1077,14 +1360,15 @@ class RoadmapSlide:
 
         vertical_offset_cm = start_pi.from_roadmap_top_cm
 
-        add_rounded_rectangle_marker(shapes=self.slide.shapes, left_cm=left_offset_cm,\
+        self.layout_marker(left_cm=left_offset_cm,\
             top_cm=vertical_offset_cm, width_cm = width_cm, height_cm=PRODUCT_MILESTONE_SHAPE_HEIGHT_CM,\
                 mso_shape=MSO_SHAPE.PENTAGON,
                 text = shape_text, fill_rgb=RGBColor(128,0,0), font_size=PRODUCT_MILESTONE_TEXT_IN_SHAPE_PTS,\
                      font_rgb_color=RGBColor(255,255,255), line_rgb=None)
+        self.labels.add_blocker(left_cm=left_offset_cm, top_cm=vertical_offset_cm, width_cm=width_cm, \
+            height_cm=PRODUCT_MILESTONE_SHAPE_HEIGHT_CM)
         
-        add_connector(shapes=self.slide.shapes, x1=right_offset_cm, \
-            y1=vertical_offset_cm+PRODUCT_SHAPE_HEIGHT_CM/2.0,\
+        self.route_connector(x1=right_offset_cm, y1=vertical_offset_cm+PRODUCT_SHAPE_HEIGHT_CM/2.0,\
             x2=right_offset_cm, y2=end_pi.from_roadmap_top_cm+PRODUCT_SHAPE_HEIGHT_CM/2.0)
 
         return
@@ -1109,7 +1393,7 @@ class RoadmapSlide:
             width_cm = 1.0
             left_offset_cm = left_edge_cm
             
-            add_text_box(shapes=self.slide.shapes, left_cm=left_offset_cm,\
+            self.layout_label(left_cm=left_offset_cm, placements=rl.FIXED,\
                  top_cm=vertical_offset_cm, width_cm = width_cm, height_cm=PRODUCT_MILESTONE_SHAPE_HEIGHT_CM,\
                 text = shape_text, text_align=PP_ALIGN.CENTER, text_auto_size=MSO_AUTO_SIZE.NONE,\
                 fill_rgb=None, line_rgb = None, line_width= Pt(1.0), line_dash = None,\
@@ -1117,14 +1401,38 @@ class RoadmapSlide:
     
         return
 
+### Default annotation styles - formatting in the annotation cell overrides these
+TEXT_ANNOTATION_STYLE_ID = rs.STYLES.style_id(line_width=Pt(1.0), font_name='Intel Clear', \
+    font_size=Pt(8), font_rgb_color=RGBColor(0,0,0), font_bold=True, font_italic=False, \
+    font_underline=False, font_language_id=MSO_LANGUAGE_ID.NONE, text_align=PP_ALIGN.LEFT, \
+    text_auto_size=MSO_AUTO_SIZE.NONE)
+DELTA_ANNOTATION_STYLE_ID = rs.STYLES.style_id(line_width=Pt(1.0), font_name='Intel Clear', \
+    font_size=Pt(9), font_rgb_color=RGBColor(0,0,128), font_bold=True, font_italic=False, \
+    font_underline=False, font_language_id=MSO_LANGUAGE_ID.NONE, text_align=PP_ALIGN.LEFT, \
+    text_auto_size=MSO_AUTO_SIZE.NONE)
+
+def shape_style_id(text_align=PP_ALIGN.CENTER, text_auto_size=MSO_AUTO_SIZE.NONE,\
+        fill_rgb=None, line_rgb = None, line_width= Pt(1.0), line_dash = None,\
+             font_name='Arial', font_size = Pt(12), font_rgb_color=RGBColor(0,0,0), font_bold=False, font_italic=False,\
+             font_underline=False, font_language_id=MSO_LANGUAGE_ID.NONE ):
+    """
+    roadmap_style.STYLES style id - defaults are those of add_rounded_rectangle_marker / add_text_box
+    """
+    return rs.STYLES.style_id(fill_rgb=fill_rgb, line_rgb=line_rgb, line_width=line_width, \
+        line_dash=line_dash, font_name=font_name, font_size=font_size, font_rgb_color=font_rgb_color,\
+        font_bold=font_bold, font_italic=font_italic, font_underline=font_underline, \
+        font_language_id=font_language_id, text_align=text_align, text_auto_size=text_auto_size)
+
 def add_rounded_rectangle_marker(shapes, left_cm, top_cm, width_cm, height_cm=PRODUCT_SHAPE_HEIGHT_CM,\
          mso_shape=MSO_SHAPE.ROUNDED_RECTANGLE,\
          text = None, text_align=PP_ALIGN.CENTER, text_auto_size=MSO_AUTO_SIZE.NONE,\
         fill_rgb=None, line_rgb = None, line_width= Pt(1.0), line_dash = None,\
              font_name='Arial', font_size = Pt(12), font_rgb_color=RGBColor(0,0,0), font_bold=False, font_italic=False,\
-             font_underline=False, font_language_id=MSO_LANGUAGE_ID.NONE, adjustments = [1.0] ):
+             font_underline=False, font_language_id=MSO_LANGUAGE_ID.NONE, adjustments = [1.0], style_id=None ):
     """
     Function for drawing product indicators on roadamp pptxs
+
+    style_id - roadmap_style.STYLES style id, used instead of the fill/line/font arguments
     """
     shape = shapes.add_shape(mso_shape, Cm(left_cm), Cm(top_cm), Cm(width_cm), Cm(height_cm))
     
@@ -1132,11 +1440,25 @@ def add_rounded_rectangle_marker(shapes, left_cm, top_cm, width_cm, height_cm=PR
     for i, adj in enumerate(adjustments):
         shape.adjustments[i] = adj
 
+    if style_id is None:
+        style_id = shape_style_id(fill_rgb=fill_rgb, line_rgb=line_rgb, line_width=line_width, \
+            line_dash=line_dash, font_name=font_name, font_size=font_size, font_rgb_color=font_rgb_color,\
+            font_bold=font_bold, font_italic=font_italic, font_underline=font_underline, \
+            font_language_id=font_language_id, text_align=text_align, text_auto_size=text_auto_size)
+    
+    return rs.STYLES.apply(shape=shape, kind=rs.KIND_AUTO_SHAPE, style_id=style_id, text=text, \
+        set_style=set_shape_style)
+
+def set_shape_style(shape, style, text):
+    """
+    Sets the fill, line and text properties of a new shape from a roadmap_style.Style
+    (only used for the first shape of each style - see roadmap_style.StyleRegistry.apply)
+    """
     ### Manage the FillFormat properties
     fill = shape.fill
-    if fill_rgb is not None:
+    if style.fill_rgb is not None:
         fill.solid()
-        fill.fore_color.rgb = fill_rgb
+        fill.fore_color.rgb = style.fill_rgb
     else:
         fill.background()  # For transparent shapes - just here for reference
 
@@ -1155,10 +1477,10 @@ def add_rounded_rectangle_marker(shapes, left_cm, top_cm, width_cm, height_cm=PR
     SQUARE_DOT - Line is made up of square dots.
     DASH_STYLE_MIXED - Not supported.
     """
-    if line_rgb is not None:
-        line.color.rgb = line_rgb
-        line.width = line_width
-        line.dash_style = line_dash
+    if style.line_rgb is not None:
+        line.color.rgb = style.line_rgb
+        line.width = style.line_width
+        line.dash_style = style.line_dash
     else:
         line.fill.background()  # For transparent shapes - just here for reference
     
@@ -1173,7 +1495,7 @@ def add_rounded_rectangle_marker(shapes, left_cm, top_cm, width_cm, height_cm=PR
         """
         auto_size: MSO_AUTO_SIZE.NONE, MSO_AUTO_SIZE.SHAPE_TO_FIT_TEXT, or MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE.
         """
-        text_frame.auto_size = text_auto_size
+        text_frame.auto_size = style.text_auto_size
 
         text_frame.margin_left = Cm(0.0)
         text_frame.margin_right = Cm(0.0)
@@ -1181,9 +1503,10 @@ def add_rounded_rectangle_marker(shapes, left_cm, top_cm, width_cm, height_cm=PR
         text_frame.margin_top = Cm(0.0)
         
         paragraph = text_frame.paragraphs[0]
-        paragraph.alignment = text_align
-        set_font(font=paragraph.font, name=font_name, size = font_size, rgb_color=font_rgb_color,\
-            bold=font_bold, italic=font_italic, underline=font_underline, language_id=font_language_id )
+        paragraph.alignment = style.text_align
+        set_font(font=paragraph.font, name=style.font_name, size = style.font_size, \
+            rgb_color=style.font_rgb_color, bold=style.font_bold, italic=style.font_italic, \
+            underline=style.font_underline, language_id=style.font_language_id )
         paragraph.text = text
 
     return shape
@@ -1203,77 +1526,28 @@ def add_text_box(shapes, left_cm, top_cm, width_cm, height_cm=PRODUCT_SHAPE_HEIG
          text = None, text_align=PP_ALIGN.CENTER, text_auto_size=MSO_AUTO_SIZE.NONE,\
         fill_rgb=None, line_rgb = None, line_width= Pt(1.0), line_dash = None,\
              font_name='Arial', font_size = Pt(12), font_rgb_color=RGBColor(0,0,0), font_bold=False, font_italic=False,\
-             font_underline=False, font_language_id=MSO_LANGUAGE_ID.NONE, adjustments = [1.0] ):
+             font_underline=False, font_language_id=MSO_LANGUAGE_ID.NONE, adjustments = [1.0], style_id=None ):
     """
     Function for drawing product indicators on roadamp pptxs
+
+    style_id - roadmap_style.STYLES style id, used instead of the fill/line/font arguments
     """
     shape = shapes.add_textbox(Cm(left_cm), Cm(top_cm),\
          Cm(width_cm), Cm(height_cm))
 
-    ### Manage the FillFormat properties
-    fill = shape.fill
-    if fill_rgb is not None:
-        fill.solid()
-        fill.fore_color.rgb = fill_rgb
-    else:
-        fill.background()  # For transparent shapes - just here for reference
-
-    ### Manage the LineFormat properties
-    line = shape.line
-
-    """
-    MSO_LINE  for DASH STYLE
-    DASH - Line consists of dashes only.
-    DASH_DOT - Line is a dash-dot pattern.
-    DASH_DOT_DOT - Line is a dash-dot-dot pattern.
-    LONG_DASH - Line consists of long dashes.
-    LONG_DASH_DOT -Line is a long dash-dot pattern.
-    ROUND_DOT - Line is made up of round dots.
-    SOLID - Line is solid.
-    SQUARE_DOT - Line is made up of square dots.
-    DASH_STYLE_MIXED - Not supported.
-    """
-    if line_rgb is not None:
-        line.color.rgb = line_rgb
-        line.width = line_width
-        line.dash_style = line_dash
-    else:
-        line.fill.background()  # For transparent shapes - just here for reference
-    
-    """
-    shape.text_frame TextFrame Object
-    """
-    # TextFrame
-    if text is not None:
-        text_frame = shape.text_frame
-        text_frame.clear()    # Premptively remove any paragraphs
-
-        """
-        auto_size: MSO_AUTO_SIZE.NONE, MSO_AUTO_SIZE.SHAPE_TO_FIT_TEXT, or MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE.
-        """
-        text_frame.auto_size = text_auto_size
+    if style_id is None:
+        style_id = shape_style_id(fill_rgb=fill_rgb, line_rgb=line_rgb, line_width=line_width, \
+            line_dash=line_dash, font_name=font_name, font_size=font_size, font_rgb_color=font_rgb_color,\
+            font_bold=font_bold, font_italic=font_italic, font_underline=font_underline, \
+            font_language_id=font_language_id, text_align=text_align, text_auto_size=text_auto_size)
 
-        text_frame.margin_left = Cm(0.0)
-        text_frame.margin_right = Cm(0.0)
-        text_frame.margin_bottom = Cm(0.0)
-        text_frame.margin_top = Cm(0.0)
-        
-        paragraph = text_frame.paragraphs[0]
-        paragraph.alignment = text_align
-        set_font(font=paragraph.font, name=font_name, size = font_size, rgb_color=font_rgb_color,\
-            bold=font_bold, italic=font_italic, underline=font_underline, language_id=font_language_id )
-        paragraph.text = text
-
-    return shape
+    return rs.STYLES.apply(shape=shape, kind=rs.KIND_TEXT_BOX, style_id=style_id, text=text, \
+        set_style=set_shape_style)
 
 def add_connector(shapes, x1, y1, x2, y2, shadow=False ):
     
     connector = shapes.add_connector(MSO_CONNECTOR.STRAIGHT, Cm(x1), Cm(y1),Cm(x2), Cm(y2))
-    color_line = connector.line
-    color_line.width=Cm(0.02)
-    color_line.fill.solid()
-    color_line.fill.fore_color.rgb=RGBColor(0,0,0)
-    color_line.dash_style=MSO_LINE.DASH
+    set_connector_line(connector.line)
 
     #connector.line.fill.fore_color.rgb=RGBColor(0,0,0)
 
@@ -1283,6 +1557,65 @@ def add_connector(shapes, x1, y1, x2, y2, shadow=False ):
     #    connector.shadow.inherit=False
     
     return connector  
+
+def set_connector_line(color_line):
+    """
+    Thin black dashed line used for connectors and polylines
+    """
+    color_line.width=Cm(0.02)
+    color_line.fill.solid()
+    color_line.fill.fore_color.rgb=RGBColor(0,0,0)
+    color_line.dash_style=MSO_LINE.DASH
+    return color_line
+
+def add_polyline(shapes, points_cm ):
+    """
+    Open freeform through points_cm [(x_cm, y_cm), ...] - styled like add_connector
+    """
+    return _add_polyline_emu(shapes=shapes, points=[(Cm(x), Cm(y)) for x, y in points_cm])
+
+def _add_polyline_emu(shapes, points):
+    builder = shapes.build_freeform(start_x=points[0][0], start_y=points[0][1])
+    builder.add_line_segments(points[1:], close=False)
+    polyline = builder.convert_to_shape()
+    polyline.fill.background()
+    set_connector_line(polyline.line)
+    return polyline
+
+def emit_primitive(shapes, p):
+    """
+    Draws one roadmap_scene.Primitive through python-pptx and returns the shape
+    """
+    if p.kind == scn.KIND_SHAPE:
+        mso_shape, adjustments = p.geometry
+        shape = shapes.add_shape(mso_shape, p.x, p.y, p.w, p.h)
+        for i, adj in enumerate(adjustments):
+            shape.adjustments[i] = adj
+        return rs.STYLES.apply(shape=shape, kind=rs.KIND_AUTO_SHAPE, style_id=p.style_id, text=p.text, \
+            set_style=set_shape_style)
+    elif p.kind == scn.KIND_TEXT_BOX:
+        shape = shapes.add_textbox(p.x, p.y, p.w, p.h)
+        return rs.STYLES.apply(shape=shape, kind=rs.KIND_TEXT_BOX, style_id=p.style_id, text=p.text, \
+            set_style=set_shape_style)
+    elif p.kind == scn.KIND_CONNECTOR:
+        connector = shapes.add_connector(MSO_CONNECTOR.STRAIGHT, p.x, p.y, p.x+p.w, p.y+p.h)
+        set_connector_line(connector.line)
+        return connector
+    return _add_polyline_emu(shapes=shapes, points=list(p.geometry))
+
+def emit_scene(scene, shapes, start=0, fast=True):
+    """
+    Writes the primitives of a roadmap_scene.Scene (from start on) into shapes - fast
+    copies prototype XML (roadmap_emitter) instead of drawing every shape through python-pptx
+    """
+    with rem.allocating_shape_ids(shapes):
+        if fast:
+            return rem.EMITTER.emit(scene=scene, shapes=shapes, emit_primitive=emit_primitive, start=start)
+
+        for i in scene.draw_order(start=start):
+            emit_primitive(shapes, scene.primitive(i))
+    return shapes
+
 """
 class RoadmapPPT:
 
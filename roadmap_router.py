@@ -0,0 +1,159 @@
+"""
+roadmap_router.py
+
+Orthogonal routing of connectors around the boxes (program bars, milestone markers,
+text boxes) already drawn on a roadmap slide.
+
+Boxes are kept in a uniform grid (GridIndex) so checking a connector segment only
+looks at the boxes in the grid cells the segment passes through, not every box
+on the slide.
+"""
+
+import math
+
+### Size of a GridIndex cell - about one program row high
+GRID_CELL_CM = 1.0
+### Clearance between a routed connector and the boxes it goes around
+ROUTE_MARGIN_CM = 0.02
+### How far beside a blocking box a new vertical channel is tried
+CHANNEL_OFFSET_CM = 0.1
+### Distance from a milestone center to the (0.1cm) gap under / over its program bar
+ROW_EXIT_CM = 0.24
+### Vertical channels tried before giving up and going straight through
+MAX_CHANNEL_TRIES = 24
+
+class Box:
+    __slots__ = ['left', 'top', 'right', 'bottom']
+
+    def __init__(self, left, top, right, bottom):
+        self.left = min(left, right)
+        self.top = min(top, bottom)
+        self.right = max(left, right)
+        self.bottom = max(top, bottom)
+
+    def __str__(self):
+        return f"({self.left:0.2f},{self.top:0.2f})-({self.right:0.2f},{self.bottom:0.2f})"
+
+    def intersects(self, other):
+        return self.left < other.right and other.left < self.right and \
+            self.top < other.bottom and other.top < self.bottom
+
+class GridIndex:
+    """
+    Uniform grid of cell_cm square cells -> boxes overlapping the cell
+    """
+    def __init__(self, cell_cm=GRID_CELL_CM):
+        self.cell_cm = cell_cm
+        self.cells = {}
+        self.boxes = []
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _cell_range(self, box):
+        return (range(math.floor(box.left / self.cell_cm), math.floor(box.right / self.cell_cm) + 1),\
+            range(math.floor(box.top / self.cell_cm), math.floor(box.bottom / self.cell_cm) + 1))
+
+    def insert(self, left_cm, top_cm, width_cm, height_cm):
+        box = Box(left=left_cm, top=top_cm, right=left_cm+width_cm, bottom=top_cm+height_cm)
+        self.boxes.append(box)
+        xs, ys = self._cell_range(box)
+        for x in xs:
+            for y in ys:
+                self.cells.setdefault((x, y), []).append(box)
+        return box
+
+    def query(self, box):
+        """
+        Boxes intersecting box
+        """
+        found = []
+        seen = set()
+        xs, ys = self._cell_range(box)
+        for x in xs:
+            for y in ys:
+                for candidate in self.cells.get((x, y), []):
+                    if id(candidate) in seen:
+                        continue
+                    seen.add(id(candidate))
+                    if candidate.intersects(box):
+                        found.append(candidate)
+        return found
+
+def segment_box(x1, y1, x2, y2, margin=ROUTE_MARGIN_CM):
+    return Box(left=min(x1, x2)-margin, top=min(y1, y2)-margin, right=max(x1, x2)+margin, \
+        bottom=max(y1, y2)+margin)
+
+def blocking_boxes(index, points, ignore=()):
+    """
+    Boxes hit by the polyline through points (boxes in ignore - e.g. the ones the
+    connector starts / ends in - don't count)
+    """
+    blocking = []
+    for (x1, y1), (x2, y2) in zip(points[:-1], points[1:]):
+        for box in index.query(segment_box(x1, y1, x2, y2)):
+            if not any([box is i_box for i_box in ignore]) and box not in blocking:
+                blocking.append(box)
+    return blocking
+
+def _simplify(points):
+    """
+    Drops repeated points and the middle point of straight runs
+    """
+    simple = []
+    for point in points:
+        if len(simple) > 0 and simple[-1] == point:
+            continue
+        if len(simple) >= 2:
+            (x0, y0), (x1, y1) = simple[-2], simple[-1]
+            if (x0 == x1 == point[0]) or (y0 == y1 == point[1]):
+                simple[-1] = point
+                continue
+        simple.append(point)
+    return simple
+
+def route(index, x1, y1, x2, y2):
+    """
+    Orthogonal route from (x1, y1) to (x2, y2) - both usually the center of a milestone
+    marker on a program bar. The route leaves the start row into the gap beside it,
+    runs to a free vertical channel, follows that to the gap beside the end row and
+    comes back in:
+
+        (x1,y1) -> (x1,ya) -> (xc,ya) -> (xc,yb) -> (x2,yb) -> (x2,y2)
+
+    The channel xc is the nearest to x2 that no box blocks. Returns the list of (x, y) points.
+    """
+    ### The boxes the connector starts and ends in
+    ignore = index.query(segment_box(x1, y1, x1, y1, margin=0.0)) + \
+        index.query(segment_box(x2, y2, x2, y2, margin=0.0))
+
+    straight = [(x1, y1), (x1, y2), (x2, y2)] if x1 != x2 else [(x1, y1), (x2, y2)]
+    if abs(y2 - y1) <= 2 * ROW_EXIT_CM:
+        return _simplify(straight)
+
+    direction = 1.0 if y2 > y1 else -1.0
+    ya = y1 + direction * ROW_EXIT_CM
+    yb = y2 - direction * ROW_EXIT_CM
+
+    tried = set()
+    candidates = [x2, x1]
+    tries = 0
+    while len(candidates) > 0 and tries < MAX_CHANNEL_TRIES:
+        xc = candidates.pop(0)
+        if round(xc, 4) in tried:
+            continue
+        tried.add(round(xc, 4))
+        tries = tries + 1
+
+        points = [(x1, y1), (x1, ya), (xc, ya), (xc, yb), (x2, yb), (x2, y2)]
+        blocking = blocking_boxes(index=index, points=points[1:-1], ignore=ignore)
+        if len(blocking) == 0:
+            return _simplify(points)
+
+        ### Try just beside each box in the way - nearest to the end first
+        for box in blocking:
+            candidates.append(box.left - CHANNEL_OFFSET_CM)
+            candidates.append(box.right + CHANNEL_OFFSET_CM)
+        candidates.sort(key=lambda x: abs(x - x2))
+
+    return _simplify(straight)
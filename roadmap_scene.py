@@ -0,0 +1,129 @@
+"""
+roadmap_scene.py
+
+Flat, array backed list of the primitives (shapes, text boxes, connectors, polylines)
+laid out for a roadmap slide.
+
+RoadmapSlide lays the roadmap out into a Scene and roadmap_pptx.emit_scene() writes
+the scene into the slide afterwards - so a layout can be kept, compared (rows()) and
+tested without any PowerPoint objects. Nothing in here depends on python-pptx.
+"""
+
+from array import array
+from collections import namedtuple
+
+### Primitive kinds
+KIND_SHAPE = 0
+KIND_TEXT_BOX = 1
+KIND_CONNECTOR = 2
+KIND_POLYLINE = 3
+
+KIND_NAMES = {KIND_SHAPE:'shape', KIND_TEXT_BOX:'text_box', KIND_CONNECTOR:'connector', \
+    KIND_POLYLINE:'polyline'}
+
+EMU_PER_CM = 360000
+NO_ID = -1
+
+### A connector's w / h are the offsets to its end point (and can be negative)
+Primitive = namedtuple('Primitive', ['kind', 'x', 'y', 'w', 'h', 'text', 'style_id', 'z', 'geometry'])
+
+def cm_to_emu(cm):
+    """
+    Same rounding as pptx.util.Cm
+    """
+    return int(cm * EMU_PER_CM)
+
+class Scene:
+    def __init__(self):
+        self.kind = array('b')
+        self.x = array('q')
+        self.y = array('q')
+        self.w = array('q')
+        self.h = array('q')
+        self.text_id = array('l')
+        self.style_id = array('l')
+        self.z = array('l')
+        self.geometry_id = array('l')
+
+        ### Interned texts and geometries (autoshape type + adjustments, or polyline points)
+        self.texts = []
+        self._text_ids = {}
+        self.geometries = []
+        self._geometry_ids = {}
+
+    def __len__(self):
+        return len(self.kind)
+
+    def _intern(self, value, values, ids):
+        if value is None:
+            return NO_ID
+        v_id = ids.get(value)
+        if v_id is None:
+            v_id = len(values)
+            values.append(value)
+            ids[value] = v_id
+        return v_id
+
+    def _add(self, kind, x, y, w, h, text=None, style_id=NO_ID, z=0, geometry=None):
+        self.kind.append(kind)
+        self.x.append(x)
+        self.y.append(y)
+        self.w.append(w)
+        self.h.append(h)
+        self.text_id.append(self._intern(text, self.texts, self._text_ids))
+        self.style_id.append(NO_ID if style_id is None else style_id)
+        self.z.append(z)
+        self.geometry_id.append(self._intern(geometry, self.geometries, self._geometry_ids))
+        return len(self.kind) - 1
+
+    def add_shape(self, mso_shape, left_cm, top_cm, width_cm, height_cm, adjustments=(), \
+        text=None, style_id=NO_ID, z=0):
+        return self._add(kind=KIND_SHAPE, x=cm_to_emu(left_cm), y=cm_to_emu(top_cm), \
+            w=cm_to_emu(width_cm), h=cm_to_emu(height_cm), text=text, style_id=style_id, z=z, \
+            geometry=(mso_shape, tuple(adjustments)))
+
+    def add_text_box(self, left_cm, top_cm, width_cm, height_cm, text=None, style_id=NO_ID, z=0):
+        return self._add(kind=KIND_TEXT_BOX, x=cm_to_emu(left_cm), y=cm_to_emu(top_cm), \
+            w=cm_to_emu(width_cm), h=cm_to_emu(height_cm), text=text, style_id=style_id, z=z)
+
+    def add_connector(self, x1_cm, y1_cm, x2_cm, y2_cm, z=0):
+        x1, y1 = cm_to_emu(x1_cm), cm_to_emu(y1_cm)
+        return self._add(kind=KIND_CONNECTOR, x=x1, y=y1, w=cm_to_emu(x2_cm)-x1, \
+            h=cm_to_emu(y2_cm)-y1, z=z)
+
+    def add_polyline(self, points_cm, z=0):
+        points = tuple([(cm_to_emu(x), cm_to_emu(y)) for x, y in points_cm])
+        xs = [x for x, y in points]
+        ys = [y for x, y in points]
+        return self._add(kind=KIND_POLYLINE, x=min(xs), y=min(ys), w=max(xs)-min(xs), \
+            h=max(ys)-min(ys), z=z, geometry=points)
+
+    def move(self, i, left_cm, top_cm):
+        """
+        Moves primitive i (a shape or text box) to left_cm, top_cm
+        """
+        self.x[i] = cm_to_emu(left_cm)
+        self.y[i] = cm_to_emu(top_cm)
+
+    def primitive(self, i):
+        t_id = self.text_id[i]
+        g_id = self.geometry_id[i]
+        return Primitive(kind=self.kind[i], x=self.x[i], y=self.y[i], w=self.w[i], h=self.h[i], \
+            text=None if t_id == NO_ID else self.texts[t_id], style_id=self.style_id[i], z=self.z[i],\
+            geometry=None if g_id == NO_ID else self.geometries[g_id])
+
+    def draw_order(self, start=0):
+        """
+        Primitive indices from start on - by z then in the order they were laid out
+        """
+        return sorted(range(start, len(self)), key=lambda i: (self.z[i], i))
+
+    def rows(self):
+        """
+        Plain tuples (kind name, x, y, w, h, text, style id, z) - for comparing layouts
+        """
+        rows = []
+        for i in range(len(self)):
+            p = self.primitive(i)
+            rows.append((KIND_NAMES[p.kind], p.x, p.y, p.w, p.h, p.text, p.style_id, p.z))
+        return rows
@@ -0,0 +1,183 @@
+"""
+roadmap_style.py
+
+Interned shape styles (fill, line, font and text frame settings) for roadmap slides.
+
+Identical style settings share one style id. The first shape drawn with a style id
+is styled through the python-pptx property setters and its style XML (fill, line,
+bodyPr and paragraph properties) is captured - every later shape with that style id
+gets copies of the captured XML instead of going through the setters again.
+"""
+
+from collections import namedtuple
+import copy
+
+from pptx.dml.color import RGBColor
+from pptx.enum.dml import MSO_LINE
+from pptx.oxml.ns import qn
+from pptx.util import Pt
+
+import annotations as an
+
+Style = namedtuple('Style', ['fill_rgb', 'line_rgb', 'line_width', 'line_dash', \
+    'font_name', 'font_size', 'font_rgb_color', 'font_bold', 'font_italic', 'font_underline', \
+    'font_language_id', 'text_align', 'text_auto_size'])
+
+### Shape kinds - python-pptx creates autoshapes and text boxes with different default XML
+KIND_AUTO_SHAPE = 'auto_shape'
+KIND_TEXT_BOX = 'text_box'
+
+### spPr children that are replaced by a captured style
+FILL_TAGS = [qn('a:noFill'), qn('a:solidFill'), qn('a:gradFill'), qn('a:blipFill'), \
+    qn('a:pattFill'), qn('a:grpFill')]
+LN_TAG = qn('a:ln')
+GEOMETRY_TAGS = [qn('a:prstGeom'), qn('a:custGeom')]
+
+class StyleFragments:
+    """
+    Style XML captured from the first shape drawn with a style
+    """
+    def __init__(self, shape):
+        sp_pr = shape._element.spPr
+        self.fills = [copy.deepcopy(child) for child in sp_pr if child.tag in FILL_TAGS]
+        ln = sp_pr.find(LN_TAG)
+        self.ln = None if ln is None else copy.deepcopy(ln)
+
+        self.body_pr = None
+        self.p_pr = None
+        tx_body = shape._element.txBody
+        if tx_body is not None:
+            self.body_pr = copy.deepcopy(tx_body.bodyPr)
+            p_pr = tx_body.p_lst[0].pPr
+            self.p_pr = None if p_pr is None else copy.deepcopy(p_pr)
+
+    def paste(self, shape, text):
+        sp_pr = shape._element.spPr
+        for child in list(sp_pr):
+            if child.tag in FILL_TAGS or child.tag == LN_TAG:
+                sp_pr.remove(child)
+
+        ### Fill and line directly follow the geometry
+        position = len(sp_pr)
+        for i, child in enumerate(sp_pr):
+            if child.tag in GEOMETRY_TAGS:
+                position = i + 1
+
+        for new_child in self.fills + ([] if self.ln is None else [self.ln]):
+            sp_pr.insert(position, copy.deepcopy(new_child))
+            position = position + 1
+
+        if text is not None:
+            tx_body = shape._element.get_or_add_txBody()
+            tx_body.replace(tx_body.bodyPr, copy.deepcopy(self.body_pr))
+            for p in tx_body.p_lst[1:]:
+                tx_body.remove(p)
+
+            p = tx_body.p_lst[0]
+            if p.pPr is not None:
+                p.remove(p.pPr)
+            if self.p_pr is not None:
+                p.insert(0, copy.deepcopy(self.p_pr))
+            shape.text_frame.paragraphs[0].text = text
+
+        return shape
+
+
+class StyleRegistry:
+    """
+    Interns Style tuples into small integer style ids
+    """
+    def __init__(self):
+        self.styles = []
+        self._style_ids = {}
+        self._fragments = {}
+
+    def style_id(self, fill_rgb=None, line_rgb=None, line_width=None, line_dash=None, \
+        font_name=None, font_size=None, font_rgb_color=None, font_bold=None, font_italic=None, \
+            font_underline=None, font_language_id=None, text_align=None, text_auto_size=None):
+        style = Style(fill_rgb=fill_rgb, line_rgb=line_rgb, line_width=line_width, \
+            line_dash=line_dash, font_name=font_name, font_size=font_size, \
+            font_rgb_color=font_rgb_color, font_bold=font_bold, font_italic=font_italic, \
+            font_underline=font_underline, font_language_id=font_language_id, \
+            text_align=text_align, text_auto_size=text_auto_size)
+        return self.intern(style)
+
+    def intern(self, style):
+        s_id = self._style_ids.get(style)
+        if s_id is None:
+            s_id = len(self.styles)
+            self.styles.append(style)
+            self._style_ids[style] = s_id
+        return s_id
+
+    def style(self, style_id):
+        return self.styles[style_id]
+
+    def __len__(self):
+        return len(self.styles)
+
+    def text_format_style_id(self, text_format, style_id):
+        """
+        Style id of style_id with the values set in an annotations.TextFormat replacing it's values
+        """
+        if text_format is None:
+            return style_id
+
+        overrides = text_format_to_style_values(text_format)
+        if len(overrides) == 0:
+            return style_id
+        return self.intern(self.styles[style_id]._replace(**overrides))
+
+    def apply(self, shape, kind, style_id, text, set_style):
+        """
+        Styles shape - set_style(shape, style, text) is only called for the first shape
+        of each kind and style id, later shapes get copies of its XML
+        """
+        key = (kind, style_id, text is None)
+        fragments = self._fragments.get(key)
+        if fragments is None:
+            set_style(shape, self.styles[style_id], text)
+            self._fragments[key] = StyleFragments(shape)
+            return shape
+
+        return fragments.paste(shape=shape, text=text)
+
+
+def text_format_to_style_values(text_format):
+    """
+    Converts the (cell text based) values set in an annotations.TextFormat to Style values
+    """
+    values = {}
+    if text_format.fill_rgb is not None:
+        values['fill_rgb'] = RGBColor(*text_format.fill_rgb)
+    if text_format.line_rgb is not None:
+        try:
+            values['line_rgb'] = RGBColor(*an.text_rgb_triple(s=text_format.line_rgb))
+        except:
+            pass
+    if text_format.line_width is not None:
+        try:
+            values['line_width'] = Pt(float(text_format.line_width))
+        except:
+            pass
+    if text_format.line_dash is not None:
+        try:
+            values['line_dash'] = MSO_LINE[str(text_format.line_dash).strip().upper()]
+        except:
+            pass
+    if text_format.font_name is not None:
+        values['font_name'] = text_format.font_name
+    if text_format.font_size is not None:
+        try:
+            values['font_size'] = Pt(float(text_format.font_size))
+        except:
+            pass
+    if text_format.font_rgb is not None:
+        values['font_rgb_color'] = RGBColor(*text_format.font_rgb)
+    for key in [an.FONT_BOLD, an.FONT_ITALIC, an.FONT_UNDERLINE]:
+        if getattr(text_format, key) is not None:
+            values[key] = getattr(text_format, key)
+    return values
+
+### Registry shared by all the roadmap slides in the process
+STYLES = StyleRegistry()
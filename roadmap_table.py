@@ -6,10 +6,13 @@ Author Scott Tandy
 Copyright Intel Corporation 2020
 """
 from collections import OrderedDict
+import concurrent.futures as cf
 
+import numpy as np
 import pandas as pd
 import datetime
 import math
+from functools import lru_cache
 
 import intel_ww as iw
 import roadmap_helper as rh
@@ -78,6 +81,8 @@ SHORTHAND_NAME = rh.SHORTHAND_NAME
 
 SEGMENT_LABEL = 'Segment Label'
 
+CHILD_SPEED_ID = 'Child Speed ID'   ### Column in RoadmapTable.children_table()
+
 ### TYPE Options
 DIE = 'Die'
 SI_PRODUCT = 'Si Product'   ## This is the packaged SOC
@@ -103,17 +108,45 @@ CT_DESCRIPTION = 'DESCRIPTION'
 CT_NAME ='NAME'
 CT_COMPONENTOF = 'COMPONENTOF'
 
-def manage_sheets(excel_file_path, all=False, combine=False):
+### Columns the RoadmapTable needs regardless of the configured column projection
+GOLDEN_DOC_REQUIRED_COLUMNS = [BUSINESS, SEGMENT, SPEED_ID, FULL_NAME_IN_SPEED_ATLAS, TYPE, \
+    CHILD_COMPONENTS]
+
+### Predicate operators for RoadmapTable.column_mask()
+OP_EQ = '=='
+OP_ISIN = 'isin'
+
+SOURCE_SHEET = 'Source Sheet'   ### Column added to rows by manage_sheets(combine=True)
+
+THREAD_POOL = 'thread'
+PROCESS_POOL = 'process'
+
+def _parse_sheet(excel_file_path, sheet_name):
+    """
+    Worker for manage_sheets - each worker opens its own copy of the workbook
+    since pd.ExcelFile can't be shared across processes
+    """
+    return pd.read_excel(excel_file_path, sheet_name=sheet_name)
+
+def manage_sheets(excel_file_path, all=False, combine=False, pool=THREAD_POOL, max_workers=None):
     """
     Returns a list of Data Frames based on the sheets in an Excel file
+
+    combine - bool - parse every sheet in a worker pool and return a single
+                     Data Frame (in the list) with the columns aligned and a
+                     SOURCE_SHEET column recording where each row came from
+    pool - THREAD_POOL or PROCESS_POOL - which kind of worker pool to use for combine
+    max_workers - int - worker count for combine (None lets concurrent.futures pick)
     """
     xl = pd.ExcelFile(excel_file_path)
+    print(xl.sheet_names)  # see all sheet names
+
     if combine == True:
         all = True  ## Let's assume the user wants to look at all the sheets
-        raise NotImplementedError
+        return [combine_sheets(excel_file_path=excel_file_path, sheet_names=xl.sheet_names,\
+            pool=pool, max_workers=max_workers)], xl.sheet_names
 
     df_list = []
-    print(xl.sheet_names)  # see all sheet names
     for sheet_name in xl.sheet_names:
         print("reading / parsing: ", sheet_name)
 
@@ -124,86 +157,474 @@ def manage_sheets(excel_file_path, all=False, combine=False):
 
     return df_list, xl.sheet_names
 
+def combine_sheets(excel_file_path, sheet_names, pool=THREAD_POOL, max_workers=None):
+    """
+    Parses sheet_names in parallel and concatenates them once at the end.
+
+    Columns are aligned by name in first-seen order (missing cells are NaN) and every
+    row is tagged with its sheet in SOURCE_SHEET. Rows keep sheet order.
+    """
+    if pool == THREAD_POOL:
+        executor_class = cf.ThreadPoolExecutor
+    elif pool == PROCESS_POOL:
+        executor_class = cf.ProcessPoolExecutor
+    else:
+        raise ValueError('pool must be '+THREAD_POOL+' or '+PROCESS_POOL+' not: '+str(pool))
+
+    parsed = {}
+    with executor_class(max_workers=max_workers) as executor:
+        futures = {executor.submit(_parse_sheet, excel_file_path, sheet_name):sheet_name \
+            for sheet_name in sheet_names}
+        for future in cf.as_completed(futures):
+            sheet_name = futures[future]
+            parsed[sheet_name] = future.result()
+            print("parsed: ", sheet_name, parsed[sheet_name].shape)
+
+    columns = []
+    for sheet_name in sheet_names:
+        for col in parsed[sheet_name].columns:
+            if col not in columns:
+                columns.append(col)
+
+    df_list = []
+    for sheet_name in sheet_names:
+        df = parsed[sheet_name].reindex(columns=columns)
+        df[SOURCE_SHEET] = sheet_name
+        df_list.append(df)
+
+    return pd.concat(df_list, ignore_index=True)
+
+class RowChangeSet:
+    """
+    Result of RoadmapTable.reload() - which rows changed (by row key) and which
+    products could render differently because of it
+    """
+    def __init__(self, inserted=None, updated=None, deleted=None, products=None, \
+        annotations_changed=False, full_reload=False):
+        self.inserted = set() if inserted is None else inserted
+        self.updated = set() if updated is None else updated
+        self.deleted = set() if deleted is None else deleted
+        self.products = set() if products is None else products
+        self.annotations_changed = annotations_changed
+        self.full_reload = full_reload
+        return
+
+    def __str__(self):
+        return f"inserted:{len(self.inserted)} updated:{len(self.updated)} deleted:{len(self.deleted)}"+\
+            f" products:{len(self.products)} annotations_changed:{self.annotations_changed}"+\
+            f" full_reload:{self.full_reload}"
+
+    def is_empty(self):
+        return len(self.inserted) == 0 and len(self.updated) == 0 and len(self.deleted) == 0 \
+            and not self.annotations_changed and not self.full_reload
+
+def read_roadmap_excel(path_to_roadmap, column_projection=None):
+    """
+    Reads the roadmap sheet (and optional ANNOTATIONS sheet) from a golden doc or concept doc
+
+    column_projection - roadmap_config.ColumnProjection - if supplied only the projected
+        columns (plus the ones the table format requires) are read, with their declared types
+
+    returns (df, a_df, is_concept_format)
+    """
+    xl = pd.ExcelFile(path_to_roadmap)
+    sheet_names_upper = [sn.upper() for sn in xl.sheet_names]
+
+    if sheet_names_upper[0] == ANNOTATIONS_SHEET.upper():
+        raise ValueError('Cannot have ANNOTATIONS sheet as first sheet')
+
+    is_concept_format = sheet_names_upper[0] == CT_SHEET_PRECONCEPTS.upper()
+
+    if is_concept_format:
+        skip_rows = [0]    ### Skip the first "description"
+    else:
+        skip_rows = None
+
+    if column_projection is None:
+        df = xl.parse(sheet_name=xl.sheet_names[0], skiprows=skip_rows )
+    else:
+        if is_concept_format:
+            required_columns = [CT_NAME, CT_NAME.title()]
+        else:
+            required_columns = GOLDEN_DOC_REQUIRED_COLUMNS
+        df = xl.parse(sheet_name=xl.sheet_names[0], skiprows=skip_rows, \
+            usecols=column_projection.usecols(required_columns=required_columns), \
+            dtype=column_projection.dtypes )
+
+    print(df.columns)
+    print(df.shape)
+
+    if ANNOTATIONS_SHEET.upper() in sheet_names_upper:
+        a_index = sheet_names_upper.index(ANNOTATIONS_SHEET.upper())
+        a_df = xl.parse(sheet_name=xl.sheet_names[a_index])
+        print('Annotations shape:', a_df.shape )
+    else:
+        a_df = None
+        print('No annotations found')
+
+    return df, a_df, is_concept_format
+
+def fingerprint_rows(df, key_column, columns):
+    """
+    Returns a Series of content hashes (one per row) indexed by the row key
+    """
+    hashes = pd.util.hash_pandas_object(df[columns], index=False)
+    return pd.Series(hashes.values, index=df[key_column].values)
+
 class RoadmapTable:
     """
     Takes "golden doc" Excel file, parses it, and then provides helper functions to access the data
     in a product oriented way....
     """
-    def __init__( self, df=None, path_to_roadmap=None, path_to_helper_file=None ):
+    def __init__( self, df=None, path_to_roadmap=None, path_to_helper_file=None, column_projection=None ):
         if df is None and path_to_roadmap is None:
             raise ValueError("Must supply dataframe or path to roadmap file to build Roadmap class")
         self.df = None
         self.a_df = None ### Annotations dataframe
         self.path_to_roadmap = path_to_roadmap
+        self.column_projection = column_projection
         self.is_concept_format = False
+        self.version = 0    ### Bumped every time reload() changes the table
+        self._mask_cache = {}
+        self._mask_cache_version = None
+        self._annotation_store = None
 
         if df is None:
-                xl = pd.ExcelFile(self.path_to_roadmap)
-                sheet_names_upper = [sn.upper() for sn in xl.sheet_names]
-
-                if sheet_names_upper[0] == ANNOTATIONS_SHEET.upper():
-                    raise ValueError('Cannot have ANNOTATIONS sheet as first sheet')
-                
-                if sheet_names_upper[0] == CT_SHEET_PRECONCEPTS.upper():
-                    self.is_concept_format = True
-                
-                if self.is_concept_format:
-                    skip_rows = [0]    ### Skip the first "description"
-                else:
-                    skip_rows = None
-                
-                self.df = xl.parse(sheet_name=xl.sheet_names[0], skiprows=skip_rows )
-
-                print(self.df.columns)
-                print(self.df.shape)
-
-                if ANNOTATIONS_SHEET.upper() in sheet_names_upper:
-                    a_index = sheet_names_upper.index(ANNOTATIONS_SHEET.upper())
-                    self.a_df = xl.parse(sheet_name=xl.sheet_names[a_index])
-                    print('Annotations shape:', self.a_df.shape )
-                else:
-                    self.a_df = None
-                    print('No annotations found')
+            self.df, self.a_df, self.is_concept_format = read_roadmap_excel(self.path_to_roadmap, \
+                column_projection=self.column_projection)
         else:
             self.df = df
         
         if self.is_concept_format is False:
             self._fix_up_business_names()
 
+        ### Fingerprint before any helper columns are added so reload() compares like with like
+        self._source_columns = list(self.df.columns)
+        self._row_fingerprints = self._fingerprint(self.df)
+
+        self.unmatched_helper_names = set()
         if pd.notna(path_to_helper_file):
             self.rh = rh.RoadmapHelper(path_to_helper_file=path_to_helper_file)
-            self._add_simplesegment_column()
-            self._add_shorthand_name_column()
+            self._add_helper_columns()
         else:
             self.rh = None
         return
+
+    def row_key_column(self, df=None):
+        """
+        Column that uniquely identifies a row - SPEED_ID for the golden doc, NAME for concept docs
+        """
+        if df is None:
+            df = self.df
+        if not self.is_concept_format:
+            return SPEED_ID
+        for col in df.columns:
+            if str(col).upper() == CT_NAME:
+                return col
+        raise ValueError('No '+CT_NAME+' column found in concept doc')
+
+    def _fingerprint(self, df):
+        try:
+            key_column = self.row_key_column(df=df)
+        except ValueError:
+            return None
+        if key_column not in df.columns or df[key_column].duplicated().any():
+            return None   ### Can't diff rows without a unique key
+        return fingerprint_rows(df=df, key_column=key_column, columns=self._source_columns)
+
+    def reload(self, path=None):
+        """
+        Re-reads the roadmap file and applies only the inserted, updated and deleted rows.
+
+        Derived helper columns are recomputed only for rows that changed. Falls back to
+        a full rebuild when the row keys are not unique or the columns changed.
+
+        returns RowChangeSet
+        """
+        if path is None:
+            path = self.path_to_roadmap
+        if path is None:
+            raise ValueError('Must supply path to reload a RoadmapTable built from a dataframe')
+
+        new_df, new_a_df, is_concept_format = read_roadmap_excel(path, \
+            column_projection=self.column_projection)
+        self.path_to_roadmap = path
+
+        annotations_changed = not _same_frame(self.a_df, new_a_df)
+        self.a_df = new_a_df
+
+        if is_concept_format == self.is_concept_format and \
+            list(new_df.columns) == self._source_columns and \
+            self._row_fingerprints is not None:
+            
+            if not self.is_concept_format:
+                self._fix_up_business_names(df=new_df)
+            new_fingerprints = self._fingerprint(new_df)
+        else:
+            new_fingerprints = None
+
+        if new_fingerprints is None:
+            return self._full_reload(new_df=new_df, is_concept_format=is_concept_format)
+
+        old_fingerprints = self._row_fingerprints
+        old_keys = set(old_fingerprints.index)
+        new_keys = set(new_fingerprints.index)
+
+        inserted = new_keys - old_keys
+        deleted = old_keys - new_keys
+        common = list(old_keys & new_keys)
+        differs = old_fingerprints.loc[common].values != new_fingerprints.loc[common].values
+        updated = set(pd.Index(common)[differs])
+
+        changes = RowChangeSet(inserted=inserted, updated=updated, deleted=deleted, \
+            annotations_changed=annotations_changed)
+        
+        if changes.is_empty():
+            return changes
+
+        changes.products = self._affected_products(new_df=new_df, changed_keys=inserted | updated | deleted)
+
+        key_column = self.row_key_column()
+        derived_columns = [c for c in self.df.columns if c not in self._source_columns]
+        if len(derived_columns) > 0:
+            ### Carry forward derived values for unchanged rows, recompute just the changed ones
+            carried = self.df.set_index(key_column)[derived_columns]
+            carried = carried.loc[~carried.index.isin(deleted)]
+            for col in derived_columns:
+                new_df[col] = new_df[key_column].map(carried[col])
+            
+            changed_rows = new_df[key_column].isin(inserted | updated)
+            if self.rh is not None and changed_rows.any():
+                self._add_helper_columns(df=new_df, rows=changed_rows)
+
+        self.df = new_df
+        self._row_fingerprints = new_fingerprints
+        self.version = self.version + 1
+
+        return changes
+
+    def _full_reload(self, new_df, is_concept_format):
+        old_products = self._product_names(self.df)
+        self.df = new_df
+        self.is_concept_format = is_concept_format
+
+        if self.is_concept_format is False:
+            self._fix_up_business_names()
+
+        self._source_columns = list(self.df.columns)
+        self._row_fingerprints = self._fingerprint(self.df)
+
+        if self.rh is not None:
+            self._add_helper_columns()
+
+        self.version = self.version + 1
+        
+        return RowChangeSet(products=old_products | self._product_names(self.df), \
+            annotations_changed=True, full_reload=True)
+
+    def _product_names(self, df):
+        """
+        Names used to identify rendered programs
+        """
+        if self.is_concept_format:
+            return set(df[self.row_key_column(df=df)].dropna())
+        if SHORTHAND_NAME in df.columns:
+            return set(df.loc[df[TYPE] == SI_PRODUCT, SHORTHAND_NAME].dropna())
+        return set(df.loc[df[TYPE] == SI_PRODUCT, FULL_NAME_IN_SPEED_ATLAS].dropna())
+
+    def _affected_products(self, new_df, changed_keys):
+        """
+        Products whose rendered geometry could change. For the golden doc a Si Product
+        also inherits dates from its child components, so parents of changed rows count too.
+        """
+        key_column = self.row_key_column()
+        old_rows = self.df.loc[self.df[key_column].isin(changed_keys)]
+        new_rows = new_df.loc[new_df[key_column].isin(changed_keys)]
+
+        if self.is_concept_format:
+            return set(old_rows[key_column].dropna()) | set(new_rows[key_column].dropna())
+
+        products = set()
+        for rows in [old_rows, new_rows]:
+            si_rows = rows.loc[rows[TYPE] == SI_PRODUCT]
+            if SHORTHAND_NAME in si_rows.columns:
+                products.update(si_rows[SHORTHAND_NAME].dropna())
+            products.update(si_rows[FULL_NAME_IN_SPEED_ATLAS].dropna())
+        
+        changed_names = set(old_rows[FULL_NAME_IN_SPEED_ATLAS].dropna()) | \
+            set(new_rows[FULL_NAME_IN_SPEED_ATLAS].dropna())
+        changed_sids = set(old_rows[SPEED_ID].dropna()) | set(new_rows[SPEED_ID].dropna())
+
+        ### Parents naming a changed row (exact name or [id]) in their child components
+        for df, children in [(self.df, self.children_table()), \
+            (new_df, rh.parse_name_id_cells(new_df[CHILD_COMPONENTS]))]:
+            hit = children[rh.CELL_NAME].isin(changed_names) | children[rh.CELL_SID].isin(changed_sids)
+            parents = df.loc[df.index.isin(children.loc[hit, rh.CELL_ROW]) & (df[TYPE] == SI_PRODUCT)]
+            names = parents[FULL_NAME_IN_SPEED_ATLAS]
+            if SHORTHAND_NAME in parents.columns:
+                names = parents[SHORTHAND_NAME].where(parents[SHORTHAND_NAME].notna(), names)
+            products.update(names.dropna())
+        return products
     
-    def _fix_up_business_names(self):
+    def _fix_up_business_names(self, df=None):
         ### Turn Client/Integrated into Integrated
-        self.df.loc[(self.df[BUSINESS]==CLIENT) & (self.df[SEGMENT]==INTEGRATED ), BUSINESS] = INTEGRATED
-        return
-    
-    def _add_simplesegment_column(self):
-        self.df[SIMPLESEGMENT] = self.df[FULL_NAME_IN_SPEED_ATLAS].apply(self.rh.name_to_segment)
-        self.df.loc[:,SIMPLESEGMENT].fillna(self.df.loc[:,SEGMENT], inplace=True)
+        if df is None:
+            df = self.df
+        df.loc[(df[BUSINESS]==CLIENT) & (df[SEGMENT]==INTEGRATED ), BUSINESS] = INTEGRATED
         return
     
-    def _add_shorthand_name_column(self):
-        self.df[SHORTHAND_NAME] = self.df[FULL_NAME_IN_SPEED_ATLAS].apply(self.rh.name_to_shorthand)
-        self.df.loc[:,SHORTHAND_NAME].fillna(self.df.loc[:,FULL_NAME_IN_SPEED_ATLAS], inplace=True)
+    def _add_helper_columns(self, df=None, rows=None):
+        """
+        Adds the SIMPLESEGMENT and SHORTHAND_NAME columns with one hash join against the
+        RoadmapHelper name index. rows - bool Series - only (re)compute these rows of df
+
+        Names missing from the helper fall back to the golden doc SEGMENT / full name and
+        are collected in self.unmatched_helper_names.
+        """
+        if df is None:
+            df = self.df
+        if rows is None:
+            rows = pd.Series(True, index=df.index)
+
+        names = df.loc[rows, FULL_NAME_IN_SPEED_ATLAS]
+        enriched, unmatched = self.rh.enrich(names=names)
+
+        segments = enriched[rh.SEGMENT]
+        shorthands = enriched[rh.SHORTHAND_NAME]
+        df.loc[rows, SIMPLESEGMENT] = segments.where(segments.notna(), df.loc[rows, SEGMENT])
+        df.loc[rows, SHORTHAND_NAME] = shorthands.where(shorthands.notna(), names)
+
+        ### Only Si Products are in the helper - Die / IP rows are never looked up there
+        all_names = df.loc[df[TYPE] == SI_PRODUCT, FULL_NAME_IN_SPEED_ATLAS]
+        self.unmatched_helper_names = set(all_names.loc[all_names.notna() & \
+            ~all_names.isin(self.rh.name_index.index)])
+        if len(unmatched) > 0:
+            print('Names not found in helper file:', sorted(unmatched, key=str))
         return
     
-    def rows_matching_col_tuples(self, col_tuples):
-        df = self.df
+    def column_mask(self, col_name, value, op=OP_EQ):
+        """
+        Boolean numpy mask of the rows where col_name == value (OP_EQ) or
+        col_name is in value (OP_ISIN).
+
+        Masks are memoized per (column, op, value set) until the table version changes,
+        so the returned array must be treated as read only.
+        """
+        if self._mask_cache_version != self.version:
+            self._mask_cache = {}
+            self._mask_cache_version = self.version
+
+        if op == OP_EQ:
+            key = (col_name, op, value)
+        elif op == OP_ISIN:
+            value = frozenset(value)
+            key = (col_name, op, value)
+        else:
+            raise ValueError('Unknown predicate op: '+str(op))
+
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            if op == OP_EQ:
+                mask = (self.df[col_name] == value).to_numpy(dtype=bool)
+            else:
+                mask = self.df[col_name].isin(value).to_numpy(dtype=bool)
+            mask.setflags(write=False)
+            self._mask_cache[key] = mask
+        return mask
+
+    def mask_for_col_tuples(self, col_tuples, op=OP_EQ):
+        """
+        Combines one column_mask() per (col_name, value) tuple with a logical and
+        """
+        mask = np.ones(self.df.shape[0], dtype=bool)
         for col_name, col_value in col_tuples:
-            df = df.loc[df[col_name] == col_value]
-        return df
+            np.logical_and(mask, self.column_mask(col_name=col_name, value=col_value, op=op), out=mask)
+        return mask
+
+    def index_for_col_tuples(self, col_tuples, op=OP_EQ):
+        """
+        Positional row indices (for df.iloc / df.take) matching every (col_name, value) tuple
+        """
+        return np.flatnonzero(self.mask_for_col_tuples(col_tuples=col_tuples, op=op))
+
+    def rows_matching_col_tuples(self, col_tuples):
+        return self.df.iloc[self.index_for_col_tuples(col_tuples=col_tuples, op=OP_EQ)]
 
     def rows_isin_col_tuples(self, col_tuples):
-        df = self.df
-        for col_name, col_value in col_tuples:
-            df = df.loc[df[col_name].isin(col_value)]
-        return df
+        return self.df.iloc[self.index_for_col_tuples(col_tuples=col_tuples, op=OP_ISIN)]
+
+    def milestone_ordinal_span(self, milestone_columns):
+        """
+        Vectorized first / last milestone week ordinals for every row (float arrays).
+
+        Rows with no parsable dates are nan. Rows with a relative (+2Q style) or JSON
+        milestone cell span -inf..+inf since those dates can't be resolved without the row.
+        Empty cells of a row with child components take the earliest date of its children
+        (like SiProduct.milestone_dict) so the row is clipped rather than culled.
+        Cached per table version.
+        """
+        milestone_columns = tuple([c for c in milestone_columns if c in self.df.columns])
+        key = ('span', milestone_columns)
+        if self._mask_cache_version != self.version:
+            self._mask_cache = {}
+            self._mask_cache_version = self.version
+        if key in self._mask_cache:
+            return self._mask_cache[key]
+
+        row_count = self.df.shape[0]
+        first = np.full(row_count, np.nan)
+        last = np.full(row_count, np.nan)
+        unresolved = np.zeros(row_count, dtype=bool)
+        parent_pos, child_pos = self._child_positions()
+
+        for col in milestone_columns:
+            parsed = self.df[col].map(cell_to_ordinal)
+            ordinals = np.array([p[0] for p in parsed], dtype=float)
+            col_unresolved = np.array([p[1] for p in parsed], dtype=bool)
+
+            ### Empty cells are filled with the earliest child date (SiProduct.milestone_dict)
+            empty = np.isnan(ordinals) & ~col_unresolved
+            fill = empty[parent_pos]
+            if fill.any():
+                child_ordinals = np.full(row_count, np.nan)
+                np.fmin.at(child_ordinals, parent_pos[fill], ordinals[child_pos[fill]])
+                np.logical_or.at(col_unresolved, parent_pos[fill], col_unresolved[child_pos[fill]])
+                ordinals = np.where(empty, child_ordinals, ordinals)
+
+            unresolved |= col_unresolved
+            first = np.fmin(first, ordinals)
+            last = np.fmax(last, ordinals)
+        
+        first[unresolved] = -np.inf
+        last[unresolved] = np.inf
+        
+        self._mask_cache[key] = (first, last)
+        return first, last
+
+    def _child_positions(self):
+        """
+        (parent row positions, child row positions) of every child component found by speed id
+        """
+        if self.is_concept_format or CHILD_COMPONENTS not in self.df.columns:
+            return (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        
+        children = self.children_table()
+        sid_to_pos = pd.Series(np.arange(self.df.shape[0]), index=self.df[SPEED_ID])
+        sid_to_pos = sid_to_pos[~sid_to_pos.index.duplicated(keep='first')]
+        child_pos = children[CHILD_SPEED_ID].map(sid_to_pos).to_numpy(dtype=float)
+        parent_pos = self.df.index.get_indexer(children[rh.CELL_ROW]).astype(float)
+        found = ~np.isnan(child_pos) & (parent_pos >= 0)
+        return (parent_pos[found].astype(np.int64), child_pos[found].astype(np.int64))
+
+    def window_mask(self, start_ww, end_ww, milestone_columns):
+        """
+        Boolean mask of rows whose milestone span intersects start_ww..end_ww.
+
+        Rows whose span can't be worked out from the table (no dates - eg. a Si Product that
+        gets its dates from its children) are kept so the renderer can decide.
+        """
+        first, last = self.milestone_ordinal_span(milestone_columns=milestone_columns)
+        return ~((last < start_ww.ordinal()) | (first > end_ww.ordinal()))
 
     def business_list(self, business_column = BUSINESS):
         return list(self.df[business_column].unique())
@@ -223,39 +644,47 @@ class RoadmapTable:
     def by_type(self, business, segment, type_name, business_column = BUSINESS, \
             segment_column = SEGMENT, type_column = TYPE ):
         
-        return self.df.loc[ (self.df[business_column] == business) & \
-            (self.df[segment_column] == segment) & \
-            (self.df[type_column] == type_name)]
+        return self.rows_matching_col_tuples(col_tuples=[(business_column, business),\
+            (segment_column, segment), (type_column, type_name)])
     
     def by_type_simplesegment(self, business, simple_segment, type_name, business_column = BUSINESS, \
              ss_column = SIMPLESEGMENT, type_column = TYPE ):
         if self.is_concept_format:
             raise ValueError("By type simple segment list not available for concept_doc types")
 
-        return self.df.loc[ (self.df[business_column] == business) & \
-            (self.df[ss_column] == simple_segment) & \
-            (self.df[type_column] == type_name)]
+        return self.rows_matching_col_tuples(col_tuples=[(business_column, business),\
+            (ss_column, simple_segment), (type_column, type_name)])
 
     def children_speed_ids(self, children_str ):
         if self.is_concept_format:
             raise ValueError("Children speed id list not available for non concept_doc types")
-        try:
-            children_split = children_str.split('\n')
-        except:
+        if not isinstance(children_str, str):
             return []
 
-        id_list = []
-        for child in children_split:
-            if len(child.split(':')) < 2:
-                continue
-            child_name = child.split(':')[1].strip()
-            name_lookup = self.df.loc[self.df[FULL_NAME_IN_SPEED_ATLAS] == child_name][SPEED_ID]
-            if len(name_lookup.values) != 0:
-                id_list.append(name_lookup.values[0])
-            else:
-                #print('-'*10, "couldn't lookup ", child)
-                pass
-        return id_list
+        children = rh.parse_name_id_cells(pd.Series([children_str]))
+        return [sid for sid in self._children_to_speed_ids(children=children) if pd.notna(sid)]
+
+    def children_table(self):
+        """
+        Long-form table of every child component line of every row (see rh.parse_name_id_cells)
+        with a CHILD_SPEED_ID column - the [id] given in the cell, else looked up by name.
+        Cached per table version.
+        """
+        key = ('children',)
+        if self._mask_cache_version != self.version:
+            self._mask_cache = {}
+            self._mask_cache_version = self.version
+        if key not in self._mask_cache:
+            children = rh.parse_name_id_cells(self.df[CHILD_COMPONENTS])
+            children[CHILD_SPEED_ID] = self._children_to_speed_ids(children=children)
+            self._mask_cache[key] = children
+        return self._mask_cache[key]
+
+    def _children_to_speed_ids(self, children):
+        name_to_sid = self.df.drop_duplicates(subset=FULL_NAME_IN_SPEED_ATLAS, keep='first')\
+            .set_index(FULL_NAME_IN_SPEED_ATLAS)[SPEED_ID]
+        looked_up = children[rh.CELL_NAME].map(name_to_sid)
+        return children[rh.CELL_SID].astype(object).where(children[rh.CELL_SID].notna(), looked_up).tolist()
     
     def by_speed_id(self, speed_id):
         return self.df.loc[(self.df[SPEED_ID] == speed_id)]
@@ -263,16 +692,131 @@ class RoadmapTable:
     def by_shorthand_name(self, shorthand_name ):
         return self.df.loc[(self.df[SHORTHAND_NAME] == shorthand_name)]
     
+    def annotation_store(self):
+        """
+        AnnotationStore of the ANNOTATIONS sheet (None if there isn't one) - rebuilt only
+        when the sheet changes
+        """
+        if self.a_df is None:
+            return None
+        if self._annotation_store is None or self._annotation_store.a_df is not self.a_df:
+            self._annotation_store = AnnotationStore(a_df=self.a_df)
+        return self._annotation_store
+
     def annotations_list(self):
         if self.a_df is None:
             return None
-        al = []
-        for i, row in self.a_df.iterrows():
-            ad = {}
-            for col in self.a_df.columns:
-                ad[col] = row[col]
-            al.append(ad)  
-        return al
+        return self.annotation_store().to_list()
+
+### ANNOTATIONS sheet operand columns
+ANNOTATION_OPERANDS = [A, B, C, D]
+### Operand columns naming the program an annotation belongs to / all the programs it refers to
+### (other commands belong to A and refer to any of A-D)
+ANNOTATION_OWNER = {ANNOTTION_SLIP:SLIP_START_SHORT_NAME, ANNOTATION_INLINEWWS:INLINEWWS_PRODUCT}
+ANNOTATION_PRODUCTS = {ANNOTTION_SLIP:[SLIP_START_SHORT_NAME, SLIP_END_SHORT_NAME], \
+    ANNOTATION_INLINEWWS:[INLINEWWS_PRODUCT]}
+
+class AnnotationStore:
+    """
+    Column arrays of the ANNOTATIONS sheet (COMMAND, A-D, VALUE) indexed by the
+    product names each row refers to - so the annotations of one product are found
+    without looking at any other rows
+    """
+    def __init__(self, a_df):
+        self.a_df = a_df
+        self.row_count = a_df.shape[0]
+        self.columns = list(a_df.columns)
+        self._columns = {col:a_df[col].to_numpy(dtype=object) for col in self.columns}
+
+        def column(col_name):
+            if col_name in self._columns:
+                return self._columns[col_name]
+            return np.full(self.row_count, None, dtype=object)
+
+        self.commands = np.array([str(c).strip().upper() if not pd.isna(c) else '' \
+            for c in column(COMMAND_COL)], dtype=object)
+        self.operands = {col:column(col) for col in ANNOTATION_OPERANDS}
+        self.values = column(VALUE_STRING)
+
+        self.owner_index = {}
+        self.product_index = {}
+        for i, command in enumerate(self.commands):
+            if command == '':
+                continue
+            owner = self._product_name(self.operands[ANNOTATION_OWNER.get(command, A)][i])
+            if owner is not None:
+                self.owner_index.setdefault(owner, []).append(i)
+            for col in ANNOTATION_PRODUCTS.get(command, ANNOTATION_OPERANDS):
+                name = self._product_name(self.operands[col][i])
+                if name is not None:
+                    rows = self.product_index.setdefault(name, [])
+                    if len(rows) == 0 or rows[-1] != i:
+                        rows.append(i)
+        return
+
+    @staticmethod
+    def _product_name(value):
+        if value is None or pd.isna(value) or str(value).strip() == '':
+            return None
+        return str(value).strip()
+
+    def __len__(self):
+        return self.row_count
+
+    def rows_for_product(self, name):
+        """
+        Row numbers of every annotation referring to the product
+        """
+        return self.product_index.get(str(name).strip(), [])
+
+    def rows_owned_by(self, name):
+        """
+        Row numbers of the annotations belonging to (drawn from) the product
+        """
+        return self.owner_index.get(str(name).strip(), [])
+
+    def row(self, i):
+        """
+        dict of column name -> value for row i (the same as a row of annotations_list())
+        """
+        return {col:self._columns[col][i] for col in self.columns}
+
+    def to_list(self):
+        return [self.row(i) for i in range(self.row_count)]
+
+
+@lru_cache(maxsize=4096)
+def _cell_text_to_ordinal(text):
+    """
+    returns (week ordinal or nan, is_unresolved) for the text of a milestone cell.
+    Relative (+2Q style) and JSON milestone cells can't be resolved without the rest of the row.
+    """
+    if text.strip().startswith('{'):
+        return (math.nan, True)
+    try:
+        iw.delta_string_to_wws(text)
+        return (math.nan, True)
+    except:
+        pass
+
+    ww = iw.WW_from_string(text)
+    if ww is None:
+        return (math.nan, False)
+    return (float(ww.ordinal()), False)
+
+def cell_to_ordinal(cell):
+    if not isinstance(cell, str):
+        return (math.nan, False)
+    return _cell_text_to_ordinal(cell)
+
+def _same_frame(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    try:
+        return a.equals(b)
+    except (TypeError, ValueError) as e:
+        print('Can not compare frames, reloading everything:', e)
+        return False
 
 
 class SiProduct:
@@ -320,6 +864,7 @@ class SiProduct:
     
     def milestone_dict(self, tag_list, if_empty_fill_with_earliest_child=True ):
         ms_dict = {}
+        latest_valid_milestone_WW = None   ### Relative (+2Q style) milestones follow the previous one
 
         for tag in tag_list:
             #print(tag, '-', end='')
@@ -329,6 +874,7 @@ class SiProduct:
             
             if ms is not None:
                 ms_dict[tag] = ms
+                latest_valid_milestone_WW = ms
                 #print(str(ms))
             else:
                 pass
@@ -0,0 +1,146 @@
+"""
+roadmap_template.py
+
+PowerPoint templates read and parsed once per process.
+
+Presentation(path) unzips the template and parses every XML part in it for every deck.
+TemplateCache keeps one parsed Presentation per template (keyed by path and file mtime)
+and hands out copy.deepcopy() copies of it - the XML trees are copied (a few times
+faster than parsing them again), image and other binary part bytes are immutable and
+shared. Slide layouts are indexed by name once per template.
+
+duplicate_slide() copies a slide (e.g. a template's blank roadmap slide) within a
+presentation, so several roadmaps can be drawn on the same background.
+
+    pptx = rtm.TEMPLATES.presentation(roadmap_template_path)
+    slide = pptx.slides.add_slide(rtm.slide_layout(pptx, 'Right Quarter white new'))
+"""
+
+import copy
+import os
+
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+R_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+### Relationships duplicate_slide() doesn't copy (the layout is related by add_slide)
+NOT_COPIED_RELS = [RT.SLIDE_LAYOUT, RT.NOTES_SLIDE]
+
+def layout_index(presentation):
+    """
+    Layout name -> position in presentation.slide_layouts (the first name wins)
+    """
+    index = {}
+    for i, layout in enumerate(presentation.slide_layouts):
+        index.setdefault(layout.name, i)
+    return index
+
+def slide_layout(presentation, name):
+    """
+    The slide layout called name - KeyError if the presentation has none
+    """
+    index = getattr(presentation, '_layout_index', None)
+    if index is None:
+        index = layout_index(presentation)
+        presentation._layout_index = index
+    return presentation.slide_layouts[index[name]]
+
+def rewrite_r_ids(element, r_ids):
+    """
+    Replaces the relationship ids (r:id, r:embed, ...) in element and its children - r_ids
+    maps old rId -> new rId
+    """
+    for node in element.iter():
+        for name, value in list(node.attrib.items()):
+            if name.startswith(R_NS) and value in r_ids:
+                node.set(name, r_ids[value])
+    return element
+
+def duplicate_slide(presentation, slide, index=None):
+    """
+    New slide with slide's layout, background and a copy of its shapes - added at the
+    end of the presentation, or moved to index
+    """
+    new_slide = presentation.slides.add_slide(slide.slide_layout)
+    sp_tree = new_slide.shapes._spTree
+    ### The layout's placeholders - the copied shapes replace them
+    for shape_element in list(sp_tree.iter_shape_elms()):
+        sp_tree.remove(shape_element)
+
+    ### Pictures etc. refer to the slide's relationships by rId - the copies get new ones
+    r_ids = {}
+    for r_id, rel in slide.part.rels.items():
+        if rel.reltype in NOT_COPIED_RELS:
+            continue
+        if rel.is_external:
+            r_ids[r_id] = new_slide.part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+        else:
+            r_ids[r_id] = new_slide.part.relate_to(rel.target_part, rel.reltype)
+
+    def copy_element(element):
+        return rewrite_r_ids(copy.deepcopy(element), r_ids)
+
+    bg = slide._element.cSld.bg
+    if bg is not None:
+        new_slide._element.cSld._remove_bg()
+        new_slide._element.cSld.insert(0, copy_element(bg))
+
+    for shape_element in slide.shapes._spTree.iter_shape_elms():
+        sp_tree.insert_element_before(copy_element(shape_element), 'p:extLst')
+
+    if index is not None:
+        sld_id_lst = presentation.slides._sldIdLst
+        sld_id = sld_id_lst.sldId_lst[-1]
+        sld_id_lst.remove(sld_id)
+        sld_id_lst.insert(index, sld_id)
+
+    return new_slide
+
+class Template:
+    """
+    A template file parsed once - new_presentation() hands out independent copies
+    """
+    def __init__(self, path):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        self._presentation = Presentation(path)
+        self.layout_index = layout_index(self._presentation)
+
+    @property
+    def layout_names(self):
+        return list(self.layout_index.keys())
+
+    def new_presentation(self):
+        presentation = copy.deepcopy(self._presentation)
+        presentation._layout_index = self.layout_index
+        return presentation
+
+class TemplateCache:
+    def __init__(self):
+        self._templates = {}
+
+    def __len__(self):
+        return len(self._templates)
+
+    def template(self, path):
+        """
+        The parsed template at path - parsed again if the file changed since
+        """
+        key = os.path.abspath(path)
+        template = self._templates.get(key)
+        if template is None or template.mtime != os.path.getmtime(path):
+            template = Template(path)
+            self._templates[key] = template
+        return template
+
+    def presentation(self, path):
+        """
+        New Presentation with the contents of the template at path
+        """
+        return self.template(path).new_presentation()
+
+    def clear(self):
+        self._templates = {}
+
+### Templates shared by all the decks rendered in the process (like roadmap_emitter.EMITTER)
+TEMPLATES = TemplateCache()
@@ -0,0 +1,137 @@
+"""
+roadmap_text.py
+
+Text widths from glyph advance widths.
+
+The advance widths of a font are loaded once into an array - from the font file when
+one can be found (FONT_DIRS, or the directories in the ROADMAP_FONT_DIRS environment
+variable) or else from the Arial / Arial Bold table bundled below. Intel Clear falls
+back to Arial. Widths of the strings measured are kept in a bounded cache per
+(text, size, font, bold).
+"""
+
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+import os
+
+FONT_DIRS_ENV = 'ROADMAP_FONT_DIRS'
+FONT_DIRS = [os.path.expanduser('~/Library/Fonts'), '/Library/Fonts', \
+    '/System/Library/Fonts/Supplemental', 'C:\\Windows\\Fonts', \
+    os.path.expanduser('~/AppData/Local/Microsoft/Windows/Fonts'), \
+    os.path.expanduser('~/.fonts'), '/usr/share/fonts/truetype/msttcorefonts', '/usr/share/fonts/truetype']
+
+FALLBACK_FONT_NAME = 'Arial'
+### (lower case font name, bold) -> font file names
+FONT_FILES = {
+    ('intel clear', False):['IntelClear_Rg.ttf', 'intelclear_rg.ttf', 'IntelClear-Regular.ttf'],
+    ('intel clear', True):['IntelClear_Bd.ttf', 'intelclear_bd.ttf', 'IntelClear-Bold.ttf'],
+    ('arial', False):['arial.ttf', 'Arial.ttf'],
+    ('arial', True):['arialbd.ttf', 'Arial Bold.ttf', 'Arial_Bold.ttf'],
+    }
+
+UNITS_PER_EM = 1000
+POINTS_PER_INCH = 72.0
+CM_PER_INCH = 2.54
+CM_PER_PT = CM_PER_INCH / POINTS_PER_INCH
+
+### Advance widths are kept for chr(FIRST_CHAR) .. chr(LAST_CHAR)
+FIRST_CHAR = 32
+LAST_CHAR = 255
+TEXT_WIDTH_CACHE_SIZE = 8192
+
+### Bundled Arial advance widths (units per 1000 em) for ' ' .. '~'
+ARIAL_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,     ## ' ' .. '/'
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,     ## '0' .. '?'
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,    ## '@' .. 'O'
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,     ## 'P' .. '_'
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,     ## '`' .. 'o'
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584]          ## 'p' .. '~'
+ARIAL_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584]
+### Used for characters without an advance width
+DEFAULT_ADVANCE = 556
+
+FontMetrics = namedtuple('FontMetrics', ['font_name', 'bold', 'source', 'advances', 'default_advance'])
+
+_metrics_cache = {}
+
+def font_dirs():
+    dirs = os.environ.get(FONT_DIRS_ENV, '')
+    return [d for d in dirs.split(os.pathsep) if d != ''] + FONT_DIRS
+
+def find_font_file(font_name, bold=False):
+    """
+    Path of the font file for font_name or None
+    """
+    file_names = FONT_FILES.get((font_name.strip().lower(), bold), [])
+    for font_dir in font_dirs():
+        for file_name in file_names:
+            path = os.path.join(font_dir, file_name)
+            if os.path.isfile(path):
+                return path
+    return None
+
+def load_font_file(path):
+    """
+    Advance widths (units per 1000 em) of chr(FIRST_CHAR) .. chr(LAST_CHAR) in a font file
+    """
+    from PIL import ImageFont
+    font = ImageFont.truetype(path, size=UNITS_PER_EM)
+    return array('H', [int(round(font.getlength(chr(c)))) for c in range(FIRST_CHAR, LAST_CHAR+1)])
+
+def bundled_advances(bold=False):
+    widths = ARIAL_BOLD_WIDTHS if bold else ARIAL_WIDTHS
+    return array('H', widths + [DEFAULT_ADVANCE] * (LAST_CHAR + 1 - FIRST_CHAR - len(widths)))
+
+def font_metrics(font_name, bold=False):
+    """
+    FontMetrics of font_name - from its font file, the fallback font's file or the bundled table
+    """
+    key = (font_name, bold)
+    metrics = _metrics_cache.get(key)
+    if metrics is not None:
+        return metrics
+
+    for name in [font_name, FALLBACK_FONT_NAME]:
+        path = find_font_file(name, bold=bold)
+        if path is None:
+            continue
+        try:
+            metrics = FontMetrics(font_name=font_name, bold=bold, source=path, \
+                advances=load_font_file(path), default_advance=DEFAULT_ADVANCE)
+            break
+        except:
+            print(f"Could not read the advance widths in {path}")
+
+    if metrics is None:
+        metrics = FontMetrics(font_name=font_name, bold=bold, source='bundled', \
+            advances=bundled_advances(bold=bold), default_advance=DEFAULT_ADVANCE)
+
+    _metrics_cache[key] = metrics
+    return metrics
+
+@lru_cache(maxsize=TEXT_WIDTH_CACHE_SIZE)
+def text_width_pts(text, size_pts, font_name=FALLBACK_FONT_NAME, bold=False):
+    """
+    Width in points of text set in font_name at size_pts - the widest line for multi line text
+    """
+    metrics = font_metrics(font_name=font_name, bold=bold)
+    advances = metrics.advances
+    widest = 0
+    for line in text.replace('\v', '\n').split('\n'):
+        units = 0
+        for c in line:
+            i = ord(c) - FIRST_CHAR
+            units = units + (advances[i] if 0 <= i < len(advances) else metrics.default_advance)
+        widest = max(widest, units)
+    return widest * size_pts / UNITS_PER_EM
+
+def text_width_cm(text, size_pts, font_name=FALLBACK_FONT_NAME, bold=False):
+    return text_width_pts(text=text, size_pts=float(size_pts), font_name=font_name, bold=bold) * CM_PER_PT
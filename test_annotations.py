@@ -50,11 +50,46 @@ def test_cell_to_json():
         with pytest.raises(json.JSONDecodeError):
             an.cell_to_json(t)
 
+def test_normalize_keys():
+    d = an.normalize_keys({'TY':'t', 'Ty':'ignored', 'Font_Bold':'true'})
+    assert d == {'ty':'t', 'font_bold':'true'}
+    assert an.normalize_keys(d) is d
+    assert an.an_value_for_key(k='FONT_BOLD', d=d) == 'true'
+    with pytest.raises(ValueError):
+        an.an_key_in_dict('missing', d)
 
+def test_dict_to_text_format():
+    tf = an.dict_to_TextFormat({'FILL_RGB':'(1,2,3)', 'font_bold':' True ', 'font_italic':'maybe',\
+        'font_size':12})
+    assert tf.fill_rgb == (1,2,3)
+    assert tf.font_bold == True
+    assert tf.font_italic is None
+    assert tf.font_size == 12
+    assert tf.line_rgb is None
+
+NOT_ANNOTATIONS = [None, 12.5, '', "10'22", "'Hi there'", "{'a':b}", "{'a':'b'}", "['a']"]
+def test_cell_text_to_annotation():
+    an._cell_text_to_dict.cache_clear()
+    cell = "{'Ty':'delta', 'S':'A0', 'e':'PRQ', 'df':'q', 'font_bold':'true'}"
+    first = an.cell_text_to_annotation(my_col='A', text=cell)
+    second = an.cell_text_to_annotation(my_col='B', text=cell)
+    assert isinstance(first, an.Delta)
+    assert (first.start, first.end, first.date_format) == ('A0', 'PRQ', an.DF_QTR)
+    assert first.text_format.font_bold == True
+    assert (first.my_col, second.my_col) == ('A', 'B')
+    assert first is not second
+    assert an._cell_text_to_dict.cache_info().misses == 1
+
+    for text in NOT_ANNOTATIONS:
+        with pytest.raises(ValueError):
+            an.cell_text_to_annotation(my_col='A', text=text)
 
 if __name__ == '__main__':
     test_sq_to_dq()
     test_text_to_bool()
     test_text_rgb_triple()
     test_cell_to_json()
+    test_normalize_keys()
+    test_dict_to_text_format()
+    test_cell_text_to_annotation()
    
\ No newline at end of file
@@ -180,6 +180,15 @@ def test_day_of_the_year():
 
 
 
+def test_ww_ordinal_round_trip():
+    for year in range(0,iw.MAX_YEAR_SUPPORTED):
+        for ww in [1, 13, 52]:
+            my_ww = iw.WW(ww=ww, year=year)
+            assert iw.WW_from_ordinal(my_ww.ordinal()) == my_ww
+            assert my_ww.add_wws(1).ordinal() == my_ww.ordinal() + 1
+            assert my_ww.ww_delta_from(my_ww.add_wws(10)) == 10
+    return
+
 if __name__ == '__main__':
     test_construct_all_wws()
     test_check_all_the_dates_ww()
@@ -188,6 +197,5 @@ if __name__ == '__main__':
     test_datetime_round_trip()
     test_ww_in_yr_qtr()
     test_day_of_the_year()
-
-
+    test_ww_ordinal_round_trip()
 
@@ -0,0 +1,120 @@
+"""
+test_roadmap_annotations.py
+
+Tests for the roadmap_annotations.py annotation compiler
+"""
+
+import pandas as pd
+from pptx import Presentation
+
+import annotations as an
+import intel_ww as iw
+import roadmap_annotations as ra
+import roadmap_pptx as rp
+import roadmap_table as rt
+
+def concept_program(name, cells):
+    row = pd.Series(cells)
+    sp = rt.ConceptSiProduct(major_value='Client', minor_value='Entry', name=name, my_row=row)
+    return rp.ConceptProgramInformation(si_program=sp, from_roadmap_top_cm=0.0)
+
+def programs():
+    return [
+        concept_program('Alpha', {'A0':"10'21", 'PRQ':"40'22", \
+            'Note':"{'ty':'delta','s':'A0','e':'PRQ','t':'A0-PRQ ','df':'q','font_size':12}"}),
+        concept_program('Beta', {'A0':"30'22", 'PRQ':"+3Q", \
+            'Note':"{'ty':'t','t':'hello','s':'prq'}", 'Bad':"{'ty':'delta','s':'A0','e':'Missing'}"}),
+        ]
+
+def test_compile_annotations():
+    sheet = [
+        {rt.COMMAND_COL:'SLIP', rt.A:'Alpha', rt.B:'A0', rt.C:'Beta', rt.D:'A0'},
+        {rt.COMMAND_COL:'inlinewws', rt.A:'Client', rt.B:'Entry', rt.C:'Beta', rt.D:None},
+        {rt.COMMAND_COL:None},
+        {rt.COMMAND_COL:'SLIP', rt.A:'Gamma', rt.B:'A0', rt.C:'Beta', rt.D:'A0'},
+        {rt.COMMAND_COL:'WIGGLE', rt.A:'Alpha'},
+        ]
+    compiled = ra.compile_annotations(programs=programs(), annotations_list=sheet)
+
+    assert [r.type_code for r in compiled.records] == [ra.AT_DELTA, ra.AT_TEXT, ra.AT_SLIP, ra.AT_INLINEWWS]
+    delta, text, slip, inline = compiled.records
+
+    assert (delta.program, delta.start, delta.end) == (0, 0, 1)
+    assert delta.text.startswith('A0-PRQ ')
+    assert delta.style_id != rp.DELTA_ANNOTATION_STYLE_ID     ### font_size override
+
+    assert (text.program, text.start, text.text) == (1, 1, 'hello')
+    assert text.style_id == rp.TEXT_ANNOTATION_STYLE_ID
+
+    assert (slip.program, slip.start, slip.end_program, slip.end) == (0, 0, 1, 0)
+    assert inline.program == 1
+
+    assert not compiled.is_valid()
+    assert [e.source for e in compiled.errors] == ['Beta[Bad]', 'ANNOTATIONS row 4', 'ANNOTATIONS row 5']
+    assert 'Missing' in compiled.errors[0].message
+    assert 'Gamma' in compiled.errors[1].message
+
+def test_compile_annotation_store():
+    a_df = pd.DataFrame({rt.COMMAND_COL:['SLIP', 'SLIP', 'INLINEWWS'], rt.A:['Beta', 'Gamma', 'Client'], \
+        rt.B:['A0', 'A0', 'Entry'], rt.C:['Alpha', 'Beta', 'Alpha'], rt.D:['A0', 'A0', None]})
+    compiled = ra.compile_annotations(programs=programs(), annotation_store=rt.AnnotationStore(a_df=a_df))
+
+    assert [r.source for r in compiled.records_for_program(0)] == ['Alpha[Note]', 'ANNOTATIONS row 3']
+    assert [r.source for r in compiled.records_for_program(1)] == ['Beta[Note]', 'ANNOTATIONS row 1']
+    assert [e.source for e in compiled.errors] == ['Beta[Bad]', 'ANNOTATIONS row 2']
+
+def test_compile_annotation_store_shared_name():
+    a_df = pd.DataFrame({rt.COMMAND_COL:['SLIP', 'INLINEWWS'], rt.A:['Alpha', 'Client'], \
+        rt.B:['A0', 'Entry'], rt.C:['Beta', 'Alpha'], rt.D:['A0', None]})
+    both_alpha = programs() + [concept_program('Alpha', {'A0':"20'22"})]
+    compiled = ra.compile_annotations(programs=both_alpha, annotation_store=rt.AnnotationStore(a_df=a_df))
+
+    sources = [r.source for r in compiled.records]
+    assert sources.count('ANNOTATIONS row 1') == 1
+    assert sources.count('ANNOTATIONS row 2') == 1
+
+def test_programs_list():
+    alpha, beta = programs()
+    assert ra.programs_list({'Client':{'Entry':{'Alpha':alpha}, 'Mainstream':{'Beta':beta}}}) == [alpha, beta]
+    assert ra.programs_list({'Alpha':alpha}) == [alpha]
+
+def test_delta_date_text():
+    assert ra.delta_date_text(date_format=an.DF_WWs, wws=13) == ra.delta_date_text(date_format='ww', wws=13)
+    assert ra.delta_date_text(date_format=None, wws=1) == ra.delta_date_text(date_format=an.DF_D, wws=1)
+
+def render_programs(programs):
+    pptx = Presentation()
+    grid = rp.CanvasGrid(start_ww=iw.WW(1, 21), end_ww=iw.WW(50, 23))
+    canvas = rp.RoadmapCanvas(grid=grid, canvas_top_cm=1.5, canvas_height_cm=16.5)
+    slide = rp.RoadmapSlide(slide=pptx.slides.add_slide(pptx.slide_layouts[6]), roadmap_canvas=canvas)
+    for i, pi in enumerate(programs):
+        pi.from_roadmap_top_cm = 2.0 + i
+        slide.render_program(program_information=pi)
+    slide.emit()
+    return slide
+
+def test_cross_program_annotations():
+    alpha = concept_program('Alpha', {'A0':"10'21", 'PRQ':"40'22", \
+        'Link':"{'ty':'line_to','s':'PRQ','p':'Beta','e':'A0','t':'needs'}", \
+        'Slip':"{'ty':'slip','s':'A0','p':'Beta'}", \
+        'Bad':"{'ty':'line_to','s':'PRQ','p':'Nobody'}"})
+    beta = concept_program('Beta', {'A0':"30'22", 'PRQ':"30'23"})
+    slide = render_programs([alpha, beta])
+    shape_count = len(slide.slide.shapes)
+
+    compiled = ra.compile_annotations(programs=[alpha, beta])
+    line_to, slip = compiled.records
+    assert (line_to.type_code, line_to.program, line_to.start, line_to.end_program, line_to.end) == \
+        (ra.AT_LINE_TO, 0, 1, 1, 0)
+    assert (slip.type_code, slip.end_program, slip.end) == (ra.AT_SLIP, 1, 0)
+    assert [e.source for e in compiled.errors] == ['Alpha[Bad]']
+
+    geometry = compiled.index.milestone_geometry(program=1, milestone=0)
+    assert geometry.rendered
+    assert geometry.left_cm == beta.milestones[0].marker_left_cm
+    assert compiled.index.lookup(program_name='Beta', milestone_name='prq') == (1, 1)
+
+    ra.render_records(roadmap_slide=slide, compiled=compiled)
+    slide.emit()
+    ### Connector + text for the line, pentagon + connector for the slip
+    assert len(slide.slide.shapes) == shape_count + 4
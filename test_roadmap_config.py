@@ -0,0 +1,168 @@
+"""
+test_roadmap_config.py
+
+Tests for the roadmap_config.py classes and helper functions
+"""
+
+import datetime
+import pickle
+
+import pytest
+
+import pandas as pd
+import roadmap_config as rc
+import roadmap_table as rt
+
+def write_config(path, commands=None, swimlanes=None, roadmap_columns=None):
+    if commands is None:
+        commands = [('start_ww', "1'21", ''), ('end_ww', "52'23", '')]
+    if swimlanes is None:
+        swimlanes = [('Client', 'Entry', 'Entry'), ('Client', 'Mainstream', 'Mainstream'),\
+            ('Datacenter', 'Compute', 'Compute')]
+    
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame(commands, columns=rc.COMMAND_COLUMNS).to_excel(writer, \
+            sheet_name=rc.COMMAND_COLUMNS_SHEET, index=False)
+        pd.DataFrame(swimlanes, columns=['Business', 'Segment', 'Name']).to_excel(writer, \
+            sheet_name=rc.SWIMLANES_SHEET, index=False)
+        if roadmap_columns is not None:
+            pd.DataFrame(roadmap_columns, columns=rc.CS_COLUMNS).to_excel(writer, \
+                sheet_name=rc.ROADMAP_COLUMNS_SHEET, index=False)
+    return path
+
+ROADMAP_COLUMNS = [('A0', rc.MILESTONE, 'A0 TI'), ('PRQ', 'milestone', 'PRQ'), \
+    ('Process', rc.NON_MILESTONE, 'Process')]
+
+def test_roadmap_config_basics(tmp_path):
+    config = rc.RoadmapConfig(write_config(tmp_path / 'config.xlsx'))
+    assert config.commands['start_ww'] == "1'21"
+    assert list(config.swimlanes_hierarchy.keys()) == ['Client', 'Datacenter']
+    assert list(config.swimlanes_hierarchy['Client'].keys()) == ['Entry', 'Mainstream']
+    assert (config.major_column_name, config.minor_column_name, config.name_col) == \
+        ('Business', 'Segment', 'Name')
+    assert len(config.milestones) == 0
+    assert config.column_projection() is None
+
+def test_roadmap_columns_projection(tmp_path):
+    config = rc.RoadmapConfig(write_config(tmp_path / 'config.xlsx', roadmap_columns=ROADMAP_COLUMNS))
+    assert list(config.milestones.items()) == [('A0', 'A0 TI'), ('PRQ', 'PRQ')]
+    assert config.column_types['Process'] == rc.NON_MILESTONE
+
+    projection = config.column_projection()
+    assert projection.columns == ['Business', 'Segment', 'Name', 'A0 TI', 'PRQ', 'Process']
+    assert projection.dtypes == {'A0 TI':str, 'PRQ':str}
+
+    gd_path = tmp_path / 'gd.xlsx'
+    pd.DataFrame({rt.BUSINESS:['Client'], rt.SEGMENT:['Entry'], rt.SPEED_ID:[1], \
+        rt.FULL_NAME_IN_SPEED_ATLAS:['Prod'], rt.TYPE:[rt.SI_PRODUCT], rt.CHILD_COMPONENTS:[None], \
+        'A0 TI':[2021], 'PRQ':["10'22"], 'Unused':['x']}).to_excel(gd_path, index=False)
+    
+    table = rt.RoadmapTable(path_to_roadmap=gd_path, column_projection=projection)
+    assert 'Unused' not in table.df.columns
+    assert 'Process' not in table.df.columns
+    assert table.df['A0 TI'].values[0] == '2021'
+
+def test_roadmap_columns_bad_type(tmp_path):
+    with pytest.raises(ValueError):
+        rc.RoadmapConfig(write_config(tmp_path / 'config.xlsx', \
+            roadmap_columns=[('A0', 'Date', 'A0 TI')]))
+
+def test_roadmap_config_snapshot_round_trip(tmp_path):
+    config = rc.RoadmapConfig(write_config(tmp_path / 'config.xlsx', roadmap_columns=ROADMAP_COLUMNS,\
+        swimlanes=[('Client', 'Entry', 'Entry'), ('Client', None, None), ('Client', 'Entry', 'Dup'),\
+            ('Datacenter', 'Compute', 'Compute')]))
+    assert config.swimlane_rows == (('Client', 'Entry', 'Entry', 0), ('Client', '', '', 1), \
+        ('Datacenter', 'Compute', 'Compute', 2))
+    assert config.swimlane_row_index[('Datacenter', 'Compute')] == 2
+
+    path = config.save(tmp_path / 'config.json')
+    loaded = rc.load_roadmap_config(str(path))
+    assert loaded.to_snapshot() == config.to_snapshot()
+    assert list(loaded.milestones.items()) == list(config.milestones.items())
+    assert loaded.column_projection().columns == config.column_projection().columns
+
+def test_roadmap_config_save_values(tmp_path):
+    config = rc.RoadmapConfig(write_config(tmp_path / 'config.xlsx', \
+        commands=[('start_ww', "1'21", ''), ('end_ww', "52'23", ''), ('roadmap_top_cm', 1.5, '')]))
+    loaded = rc.load_roadmap_config(str(config.save(tmp_path / 'config.json')))
+    assert loaded.commands['roadmap_top_cm'] == 1.5
+
+    ### Dates (from Excel date cells) are not quietly saved as text
+    dated = rc.RoadmapConfig(write_config(tmp_path / 'dated.xlsx', \
+        commands=[('start_ww', "1'21", ''), ('end_ww', "52'23", ''), ('as_of', datetime.datetime(2023, 1, 2), '')]))
+    with pytest.raises(ValueError):
+        dated.save(tmp_path / 'dated.json')
+
+def test_roadmap_config_pickles(tmp_path):
+    config = rc.RoadmapConfig(write_config(tmp_path / 'config.xlsx', roadmap_columns=ROADMAP_COLUMNS, \
+        commands=[('start_ww', "1'21", ''), ('as_of', datetime.datetime(2023, 1, 2), '')]))
+    loaded = pickle.loads(pickle.dumps(config))
+    assert loaded.commands['as_of'] == datetime.datetime(2023, 1, 2)
+    assert loaded.to_snapshot(strict=False) == config.to_snapshot(strict=False)
+    assert loaded.swimlane_row_index == config.swimlane_row_index
+    with pytest.raises(AttributeError):
+        loaded.name_col = 'Other'
+
+def test_roadmap_config_is_read_only(tmp_path):
+    config = rc.RoadmapConfig(write_config(tmp_path / 'config.xlsx'))
+    with pytest.raises(AttributeError):
+        config.name_col = 'Other'
+    with pytest.raises(TypeError):
+        config.commands['start_ww'] = "2'21"
+    with pytest.raises(TypeError):
+        config.swimlanes_hierarchy['Client']['Entry'] = 'Other'
+    with pytest.raises(ValueError):
+        rc.RoadmapConfig(snapshot={'format':'something else'})
+
+def test_roadmap_config_with_swimlanes(tmp_path):
+    config = rc.RoadmapConfig(write_config(tmp_path / 'config.xlsx', roadmap_columns=ROADMAP_COLUMNS))
+    assert config.with_swimlanes(None) is config
+
+    client = config.with_swimlanes(['Client'])
+    assert client.swimlane_rows == (('Client', 'Entry', 'Entry', 0), ('Client', 'Mainstream', 'Mainstream', 1))
+    assert list(client.milestones.items()) == list(config.milestones.items())
+
+    compute = config.with_swimlanes([('Datacenter', 'Compute'), ('Client', 'Entry')])
+    ### Swimlanes keep the configuration's order
+    assert [row[:2] for row in compute.swimlane_rows] == [('Client', 'Entry'), ('Datacenter', 'Compute')]
+
+    ### Commands a snapshot can't hold (Excel date cells) are kept as they are
+    dated = rc.RoadmapConfig(write_config(tmp_path / 'dated.xlsx', roadmap_columns=ROADMAP_COLUMNS, \
+        commands=[('start_ww', "1'21", ''), ('as_of', datetime.datetime(2023, 1, 2), '')]))
+    dated_client = dated.with_swimlanes(['Client'])
+    assert dated_client.commands['as_of'] == datetime.datetime(2023, 1, 2)
+    assert dated_client.swimlane_row_index == {('Client', 'Entry'):0, ('Client', 'Mainstream'):1}
+
+    with pytest.raises(ValueError):
+        config.with_swimlanes(['Mobile'])
+    with pytest.raises(ValueError):
+        config.with_swimlanes([('Client', 'Compute')])
+
+def test_roadmap_config_extends(tmp_path, monkeypatch):
+    write_config(tmp_path / 'base.xlsx', roadmap_columns=ROADMAP_COLUMNS)
+    overlay_path = tmp_path / 'variant' / 'overlay.xlsx'
+    overlay_path.parent.mkdir()
+    with pd.ExcelWriter(overlay_path) as writer:
+        pd.DataFrame([(rc.EXTENDS, '../base.xlsx', ''), ('end_ww', "52'24", '')], \
+            columns=rc.COMMAND_COLUMNS).to_excel(writer, sheet_name=rc.COMMAND_COLUMNS_SHEET, index=False)
+        pd.DataFrame([('Datacenter', 'Accel', 'Accel'), ('Edge', 'IoT', 'IoT')], \
+            columns=['Business', 'Segment', 'Name']).to_excel(writer, sheet_name=rc.SWIMLANES_SHEET, index=False)
+
+    config = rc.RoadmapConfig(overlay_path)
+    assert config.commands['start_ww'] == "1'21"
+    assert config.commands['end_ww'] == "52'24"
+    assert [row[:2] for row in config.swimlane_rows] == [('Client', 'Entry'), ('Client', 'Mainstream'), \
+        ('Datacenter', 'Accel'), ('Edge', 'IoT')]
+    assert list(config.milestones.keys()) == ['A0', 'PRQ']
+
+    ### The base is only parsed once
+    parsed = []
+    monkeypatch.setattr(rc, 'load_roadmap_config', lambda path: parsed.append(path))
+    rc.RoadmapConfig(overlay_path)
+    assert parsed == []
+
+def test_roadmap_config_extends_cycle(tmp_path):
+    write_config(tmp_path / 'a.xlsx', commands=[(rc.EXTENDS, 'b.xlsx', '')])
+    write_config(tmp_path / 'b.xlsx', commands=[(rc.EXTENDS, 'a.xlsx', '')])
+    with pytest.raises(ValueError):
+        rc.RoadmapConfig(tmp_path / 'a.xlsx')
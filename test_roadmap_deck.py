@@ -0,0 +1,56 @@
+"""
+test_roadmap_deck.py
+
+Tests for the deck spec parsing in roadmap_deck.py
+"""
+
+import json
+
+import pytest
+
+import intel_ww as iw
+import roadmap_deck as rd
+
+def test_slide_spec_defaults():
+    defaults = {rd.START_WW:"1'21", rd.END_WW:"52'23", rd.PACK:True}
+    spec = rd.slide_spec_from_dict({rd.TITLE:'Client', rd.SWIMLANES:['Client', ['Datacenter', 'Compute']], \
+        rd.END_WW:"26'22"}, defaults=defaults)
+    assert spec.start_ww == iw.WW(1, 21)
+    assert spec.end_ww == iw.WW(26, 22)
+    assert spec.swimlanes == ['Client', ('Datacenter', 'Compute')]
+    assert spec.pack is True
+    assert spec.align_zero is False
+    assert spec.title == 'Client'
+
+    spec = rd.slide_spec_from_dict({}, defaults=defaults)
+    assert spec.swimlanes is None
+    assert rd.slide_spec_from_dict({rd.SWIMLANES:'Client'}, defaults=defaults).swimlanes == ['Client']
+    assert spec.title is None
+
+def test_slide_spec_errors():
+    with pytest.raises(ValueError):
+        rd.slide_spec_from_dict({rd.START_WW:"1'21", rd.END_WW:"52'23", 'colour':'red'})
+    with pytest.raises(ValueError):
+        rd.slide_spec_from_dict({rd.START_WW:'soon', rd.END_WW:"52'23"})
+    with pytest.raises(ValueError):
+        rd.slide_spec_from_dict({rd.END_WW:"52'23"})
+    with pytest.raises(ValueError):
+        rd.deck_spec_from_list([])
+    for swimlanes in [7, {'Client':'Entry'}, [['Datacenter']], [['Datacenter', 'Compute', 'x']]]:
+        with pytest.raises(ValueError):
+            rd.slide_spec_from_dict({rd.START_WW:"1'21", rd.END_WW:"52'23", rd.SWIMLANES:swimlanes})
+
+def test_slide_spec_bools():
+    defaults = {rd.START_WW:"1'21", rd.END_WW:"52'23"}
+    for value, expected in [(True, True), ('false', False), ('0', False), (' TRUE ', True), ('No', False), (1, True)]:
+        assert rd.slide_spec_from_dict({rd.ALIGN_ZERO:value, rd.PACK:value}, defaults=defaults).align_zero is expected
+    for value in ['maybe', '', 2, None, [True]]:
+        with pytest.raises(ValueError):
+            rd.slide_spec_from_dict({rd.PACK:value}, defaults=defaults)
+
+def test_load_deck_spec(tmp_path):
+    path = tmp_path / 'deck.json'
+    path.write_text(json.dumps({rd.SLIDES:[{rd.TITLE:'All'}, {rd.TITLE:'Zero', rd.ALIGN_ZERO:True}]}))
+    specs = rd.load_deck_spec(path, defaults={rd.START_WW:"1'21", rd.END_WW:"52'23"})
+    assert [s.title for s in specs] == ['All', 'Zero']
+    assert [s.align_zero for s in specs] == [False, True]
@@ -0,0 +1,72 @@
+"""
+test_roadmap_emitter.py
+
+Tests for the roadmap_emitter.py prototype emitter
+"""
+
+from lxml import etree
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+
+import roadmap_emitter as rem
+import roadmap_pptx as rp
+import roadmap_scene as scn
+
+def roadmap_scene():
+    scene = scn.Scene()
+    bar_style = rp.shape_style_id(line_rgb=RGBColor(0,0,0), font_bold=True)
+    marker_style = rp.shape_style_id(fill_rgb=RGBColor(0,128,255), line_rgb=None)
+    for row in range(3):
+        top_cm = 2.0 + row
+        scene.add_shape(mso_shape=MSO_SHAPE.ROUNDED_RECTANGLE, left_cm=1.0, top_cm=top_cm, \
+            width_cm=10.0+row, height_cm=0.4, adjustments=[1.0], style_id=bar_style)
+        scene.add_shape(mso_shape=MSO_SHAPE.ROUNDED_RECTANGLE, left_cm=2.0+row, top_cm=top_cm, \
+            width_cm=0.5, height_cm=0.3, adjustments=[1.0], text=f"A{row}\nx", style_id=marker_style)
+        scene.add_text_box(left_cm=0.1, top_cm=top_cm, width_cm=0.9, height_cm=0.4, \
+            text=f"Prog {row}", style_id=marker_style)
+    scene.add_connector(x1_cm=2.0, y1_cm=2.0, x2_cm=3.0, y2_cm=4.0)
+    scene.add_connector(x1_cm=5.0, y1_cm=4.0, x2_cm=3.0, y2_cm=2.0)
+    scene.add_polyline(points_cm=[(2.0, 2.0), (2.0, 3.5), (4.0, 3.5)])
+    return scene
+
+def slide_shapes(pptx):
+    return pptx.slides.add_slide(pptx.slide_layouts[6]).shapes
+
+def test_emitter_matches_python_pptx():
+    scene = roadmap_scene()
+    pptx = Presentation()
+    slow_shapes = rp.emit_scene(scene=scene, shapes=slide_shapes(pptx), fast=False)
+
+    emitter = rem.PrototypeEmitter()
+    fast_shapes = emitter.emit(scene=scene, shapes=slide_shapes(pptx), emit_primitive=rp.emit_primitive)
+    ### Bar, marker, text box and connector prototypes - the polyline isn't one
+    assert len(emitter) == 4
+
+    assert len(fast_shapes) == len(slow_shapes) == len(scene)
+    for fast, slow in zip(fast_shapes, slow_shapes):
+        assert etree.tostring(fast._element) == etree.tostring(slow._element)
+
+    ### Emitting more into the same slide keeps the ids unique
+    emitter.emit(scene=scene, shapes=fast_shapes, emit_primitive=rp.emit_primitive, start=3)
+    ids = [shape.shape_id for shape in fast_shapes]
+    assert len(ids) == len(set(ids)) == 2 * len(scene) - 3
+
+def test_shape_id_allocator():
+    pptx = Presentation()
+    shapes = pptx.slides.add_slide(pptx.slide_layouts[5]).shapes    ## Title placeholder
+    first_id = shapes._spTree.max_shape_id + 1
+    with rem.allocating_shape_ids(shapes) as shape_ids:
+        shapes.add_table(rows=2, cols=2, left=0, top=0, width=100, height=100)
+        rp.add_text_box(shapes=shapes, left_cm=1.0, top_cm=1.0, width_cm=1.0, text='a')
+        rp.add_connector(shapes=shapes, x1=1.0, y1=1.0, x2=2.0, y2=2.0)
+        rp.add_polyline(shapes=shapes, points_cm=[(1.0, 1.0), (1.0, 2.0), (2.0, 2.0)])
+        rp.emit_scene(scene=roadmap_scene(), shapes=shapes)
+
+    ids = [shape.shape_id for shape in shapes][1:]
+    assert ids == list(range(first_id, first_id + 4 + len(roadmap_scene())))
+    assert shape_ids.next_id == ids[-1] + 1
+
+    ### Outside the block python-pptx finds its own ids again (its classes are put back)
+    assert type(shapes)._next_shape_id is rem._pptx_next_shape_id
+    assert shapes.add_textbox(left=0, top=0, width=100, height=100).shape_id == ids[-1] + 1
@@ -0,0 +1,109 @@
+"""
+test_roadmap_helper.py
+
+Tests for the roadmap_helper.py classes and helper functions
+"""
+
+import pytest
+
+import pandas as pd
+import power_bi_gd as pbi
+import roadmap_helper as rh
+import roadmap_table as rt
+
+HELPER_ROWS = [
+    ('Entry', 'PA', 'Si: Prod A [101]'),
+    ('Mainstream', 'PB', 'Prod B [102]'),
+    ('Compute', 'PB-dup', 'Prod B [103]'),     ## First row wins
+    ('Entry', 'PT', 'Prod T (TBA)'),
+    ]
+
+def write_helper(path):
+    df = pd.DataFrame(HELPER_ROWS, columns=[rh.SEGMENT, rh.SHORTHAND_NAME, rh.SI_PRODUCT__SPEED_ID_])
+    ### Helper files have a title row above the headings
+    full = pd.DataFrame([['Helper']*3, list(df.columns)] + df.values.tolist())
+    full.to_excel(path, index=False, header=False)
+    return path
+
+def test_helper_lookups(tmp_path):
+    helper = rh.RoadmapHelper(write_helper(tmp_path / 'helper.xlsx'))
+    assert helper.name_to_segment('Prod A') == 'Entry'
+    assert helper.name_to_shorthand('Prod B') == 'PB'
+    assert helper.name_to_segment('Prod T') == 'Entry'
+    assert helper.name_to_segment('Nope') is None
+    assert helper.lookup(value=102, lookup_col=rh.SI_PRODUCT_SID, return_col=rh.SHORTHAND_NAME) == 'PB'
+
+    enriched, unmatched = helper.enrich(pd.Series(['Prod B', 'Nope', None], index=[5, 6, 7]))
+    assert list(enriched.index) == [5, 6, 7]
+    assert enriched.at[5, rh.SI_PRODUCT_SID] == 102
+    assert pd.isna(enriched.at[6, rh.SEGMENT])
+    assert unmatched == {'Nope'}
+
+def test_table_enrichment(tmp_path):
+    df = pd.DataFrame({rt.BUSINESS:[rt.CLIENT, rt.CLIENT, rt.CLIENT], rt.SEGMENT:['Entry', 'Other', 'Entry'], \
+        rt.SPEED_ID:[101, 200, 300], rt.FULL_NAME_IN_SPEED_ATLAS:['Prod A', 'Unknown', 'Die X'], \
+        rt.TYPE:[rt.SI_PRODUCT, rt.SI_PRODUCT, 'Die']})
+    table = rt.RoadmapTable(df=df, path_to_helper_file=write_helper(tmp_path / 'helper.xlsx'))
+    assert list(table.df[rt.SHORTHAND_NAME]) == ['PA', 'Unknown', 'Die X']
+    assert list(table.df[rt.SIMPLESEGMENT]) == ['Entry', 'Other', 'Entry']
+    ### Die / IP rows are never in the helper - they are not reported
+    assert table.unmatched_helper_names == {'Unknown'}
+
+def test_parse_name_id_cells():
+    cells = pd.Series(['Si: Prod A [101]\n\nDie: Die B (TBA)\n• Die C [7] (B0)', None, 12, 'Plain'], \
+        index=[10, 11, 12, 13])
+    parsed = rh.parse_name_id_cells(cells)
+
+    assert list(parsed.columns) == rh.CELL_COLS
+    assert list(parsed[rh.CELL_ROW]) == [10, 10, 10, 13]
+    assert list(parsed[rh.CELL_POSITION]) == [0, 1, 2, 0]
+    assert list(parsed[rh.CELL_NAME]) == ['Prod A', 'Die B', 'Die C', 'Plain']
+    assert list(parsed[rh.CELL_SID].fillna(-1)) == [101, -1, 7, -1]
+    assert list(parsed[rh.CELL_TBA]) == [False, True, False, False]
+
+    ### Same answers as the single cell parser for the first line
+    for cell in ['Si: Prod A [101]', 'Prod T (TBA)', 'Prod B [102]\nProd C [103]']:
+        first = rh.parse_name_id_cells(pd.Series([cell])).iloc[0]
+        name, sid = rh.split_name_id(cell)
+        assert first[rh.CELL_NAME] == name
+        assert (pd.isna(first[rh.CELL_SID]) and sid is None) or first[rh.CELL_SID] == sid
+
+def test_parse_name_id_cells_non_numeric_bracket(tmp_path):
+    parsed = rh.parse_name_id_cells(pd.Series(['Die: Prod [TBD]\nDie: Other [123]', '[9]\nDie: Third [7]']))
+    assert list(parsed[rh.CELL_NAME]) == ['Prod', 'Other', 'Third']
+    assert list(parsed[rh.CELL_POSITION]) == [0, 1, 1]
+    assert list(parsed[rh.CELL_SID].fillna(-1)) == [-1, 123, 7]
+    assert list(parsed[rh.CELL_BRACKET]) == [True, True, True]
+
+    ### Same answer as the single cell parser - the product keeps its first line
+    assert rh.split_name_id('Die: Prod [TBD]') == ('Prod', None)
+    path = tmp_path / 'helper.xlsx'
+    df = pd.DataFrame([('Entry', 'PR', 'Si: Prod [TBD]\nSi: Other [123]')], \
+        columns=[rh.SEGMENT, rh.SHORTHAND_NAME, rh.SI_PRODUCT__SPEED_ID_])
+    pd.DataFrame([['Helper']*3, list(df.columns)] + df.values.tolist()).to_excel(path, index=False, header=False)
+    helper = rh.RoadmapHelper(path)
+    assert list(helper.df[rh.SI_PRODUCT_ONLY]) == ['Prod']
+    assert list(helper.df[rh.SI_PRODUCT_SID]) == [-1]
+    assert helper.name_to_shorthand('Prod') == 'PR'
+
+def test_parse_name_id_cells_colon_in_name():
+    cells = pd.Series(['Die: Foo:Bar [3]\nGCD Die: Tile: Left (TBA)', '\u2022 Foo:Bar\n\u2022 Baz'])
+    parsed = rh.parse_name_id_cells(cells)
+    ### Only the text up to the first ':' is a type prefix
+    assert list(parsed[rh.CELL_NAME]) == ['Foo:Bar', 'Tile: Left', 'Bar', 'Baz']
+
+    parsed = rh.parse_name_id_cells(cells, type_prefix=False)
+    assert list(parsed[rh.CELL_NAME]) == ['Die: Foo:Bar', 'GCD Die: Tile: Left', 'Foo:Bar', 'Baz']
+    assert pbi.children_names_from_str('\u2022 Foo:Bar\n\u2022 Baz') == ['Foo:Bar', 'Baz']
+
+def test_multi_line_helper_cells_indexed(tmp_path):
+    path = tmp_path / 'helper.xlsx'
+    df = pd.DataFrame([('Entry', 'PM', 'Prod M [1]\nProd N [2]')], \
+        columns=[rh.SEGMENT, rh.SHORTHAND_NAME, rh.SI_PRODUCT__SPEED_ID_])
+    pd.DataFrame([['Helper']*3, list(df.columns)] + df.values.tolist()).to_excel(path, index=False, header=False)
+
+    helper = rh.RoadmapHelper(path)
+    assert list(helper.df[rh.SI_PRODUCT_ONLY]) == ['Prod M']
+    assert list(helper.df[rh.SI_PRODUCT_SID]) == [1]
+    assert helper.name_to_shorthand('Prod N') == 'PM'
+    assert helper.lookup(value='Prod N', lookup_col=rh.SI_PRODUCT_ONLY, return_col=rh.SI_PRODUCT_SID) == 2
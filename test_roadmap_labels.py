@@ -0,0 +1,41 @@
+"""
+test_roadmap_labels.py
+
+Tests for the roadmap_labels.py label placer
+"""
+
+import roadmap_labels as rl
+
+def placed(label):
+    return (label.placement, round(label.placed_left, 3), round(label.placed_top, 3))
+
+def test_place_labels():
+    placer = rl.LabelPlacer(nudge_cm=0.5, max_stagger_cm=1.0, gap_cm=0.1)
+    placer.add_blocker(left_cm=3.0, top_cm=0.0, width_cm=0.5, height_cm=0.3)
+
+    first = placer.add(left_cm=1.0, top_cm=0.0, width_cm=1.0, height_cm=0.3)
+    staggered = placer.add(left_cm=1.5, top_cm=0.0, width_cm=0.5, height_cm=0.3)
+    ### Staggering would put it over the blocker, it is nudged up instead
+    above = placer.add(left_cm=2.5, top_cm=0.0, width_cm=1.0, height_cm=0.3, placements=rl.NO_STAGGER)
+    fixed = placer.add(left_cm=2.6, top_cm=0.0, width_cm=0.2, height_cm=0.3, placements=rl.FIXED)
+    other_row = placer.add(left_cm=1.2, top_cm=1.0, width_cm=1.0, height_cm=0.3)
+
+    assert len(placer.place()) == 5
+    assert placed(first) == (rl.PLACE_PREFERRED, 1.0, 0.0)
+    assert placed(staggered) == (rl.PLACE_STAGGER, 2.1, 0.0)
+    assert placed(above) == (rl.PLACE_ABOVE, 2.5, -0.5)
+    assert placed(fixed) == (rl.PLACE_OVERLAP, 2.6, 0.0)
+    assert placed(other_row) == (rl.PLACE_PREFERRED, 1.2, 1.0)
+
+    ### Labels placed later keep clear of the ones already placed
+    later = placer.add(left_cm=1.2, top_cm=0.0, width_cm=0.5, height_cm=0.3)
+    assert placer.place() == [later]
+    assert placed(later) == (rl.PLACE_ABOVE, 1.2, -0.5)
+    assert len(placer) == 6
+
+def test_place_many_labels():
+    placer = rl.LabelPlacer()
+    labels = [placer.add(left_cm=(i * 0.37) % 30.0, top_cm=(i % 40) * 0.5, width_cm=0.8, height_cm=0.32) \
+        for i in range(10000)]
+    placer.place()
+    assert all([label.placement is not None for label in labels])
@@ -0,0 +1,72 @@
+"""
+test_roadmap_parallel.py
+
+Tests for the process-parallel deck rendering in roadmap_parallel.py
+"""
+
+import datetime
+
+from lxml import etree
+import pandas as pd
+from pptx import Presentation
+
+import render_roadmap as rr
+import roadmap_config as rc
+import roadmap_deck as rd
+import roadmap_parallel as rpl
+
+def write_inputs(tmp_path):
+    template_path = str(tmp_path / 'template.pptx')
+    pptx = Presentation()
+    pptx.slides.add_slide(pptx.slide_layouts[6])
+    pptx.save(template_path)
+
+    concept_path = str(tmp_path / 'concept.xlsx')
+    df = pd.DataFrame({'Business':['Client', 'Client', 'Datacenter'], 'Segment':['Entry', 'Mainstream', 'Compute'], \
+        'Name':['Alpha', 'Beta', 'Gamma'], 'A0':["10'21", "30'22", "5'23"], 'PRQ':["40'22", "+3Q", "30'24"]})
+    with pd.ExcelWriter(concept_path) as writer:
+        pd.DataFrame([['desc'] * len(df.columns), list(df.columns)] + df.values.tolist()).to_excel(writer, \
+            sheet_name='PRECONCEPTS', index=False, header=False)
+
+    config_path = str(tmp_path / 'config.xlsx')
+    with pd.ExcelWriter(config_path) as writer:
+        ### The date (an Excel date cell) can't go in a snapshot file but still reaches the workers
+        pd.DataFrame([('start_ww', "1'21", ''), ('as_of', datetime.datetime(2023, 1, 2), '')], \
+            columns=rc.COMMAND_COLUMNS).to_excel(writer, \
+            sheet_name=rc.COMMAND_COLUMNS_SHEET, index=False)
+        pd.DataFrame([('Client', 'Entry', 'Entry'), ('Client', 'Mainstream', 'Mainstream'), \
+            ('Datacenter', 'Compute', 'Compute')], columns=['Business', 'Segment', 'Name']).to_excel(writer, \
+            sheet_name=rc.SWIMLANES_SHEET, index=False)
+    
+    return dict(golden_doc_path=concept_path, roadmap_helper_path=None, roadmap_config_path=config_path, \
+        roadmap_template_path=template_path)
+
+def slide_xml(pptx):
+    return [etree.tostring(slide._element) for slide in pptx.slides]
+
+def test_parallel_deck_matches_serial(tmp_path):
+    paths = write_inputs(tmp_path)
+    slide_specs = rd.deck_spec_from_list([{rd.TITLE:'All'}, {rd.TITLE:'Client', rd.SWIMLANES:['Client']}, \
+        {rd.TITLE:'Compute', rd.SWIMLANES:[['Datacenter', 'Compute']], rd.START_WW:"1'22", rd.PACK:True}], \
+        defaults={rd.START_WW:"1'21", rd.END_WW:"52'23"})
+
+    serial = rr.render_deck_from_paths(slide_specs=slide_specs, **paths)
+    parallel = rpl.render_deck_parallel_from_paths(slide_specs=slide_specs, workers=2, **paths)
+
+    assert len(parallel.slides) == 3
+    assert slide_xml(parallel) == slide_xml(serial)
+    ### python-pptx's slide objects see the shapes too (not just the XML)
+    assert [len(s.shapes) for s in parallel.slides] == [len(s.shapes) for s in serial.slides]
+    assert min(len(s.shapes) for s in parallel.slides) > 0
+
+    path = str(tmp_path / 'deck.pptx')
+    parallel.save(path)
+    saved = Presentation(path)
+    assert [s.slide_layout.name for s in saved.slides] == ['Blank'] * 3
+    assert [[sh.text_frame.text for sh in s.shapes if sh.has_text_frame][0] for s in saved.slides] == \
+        ['All', 'Client', 'Compute']
+
+def test_worker_count():
+    assert rpl.worker_count(3) == 3
+    assert rpl.worker_count(None) >= 1
+    assert rpl.worker_count(0) == rpl.worker_count(None)
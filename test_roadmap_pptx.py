@@ -0,0 +1,68 @@
+"""
+test_roadmap_pptx.py
+
+Tests for the roadmap_pptx.py layout helpers
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+import intel_ww as iw
+import roadmap_pptx as rp
+
+def test_pack_intervals():
+    rows, row_count = rp.pack_intervals([(0.0, 2.0), (1.0, 3.0), (2.0, 4.0), (3.5, 5.0), (0.5, 0.9)])
+    assert row_count == 2
+    assert rows == [0, 1, 0, 1, 1]
+
+    ### gap keeps touching intervals apart
+    assert rp.pack_intervals([(0.0, 2.0), (2.0, 4.0)], gap=0.1) == ([0, 1], 2)
+    assert rp.pack_intervals([]) == ([], 0)
+
+def test_size_lanes():
+    h = OrderedDict()
+    h['Client'] = OrderedDict([('Entry', 'Entry'), ('Mainstream', 'Mainstream')])
+    h['Datacenter'] = OrderedDict([('Compute', 'Compute')])
+    table = rp.SwimlaneTable(grid=rp.SwimlanesGrid(hierarchy=h, major_column_name='Business', \
+        minor_column_name='Segment'), table_top_cm=4.0, table_height_cm=12.0)
+    assert table.y_value_in_cm_for_segment(business='Datacenter', segment='Compute') == 12.0
+
+    assert table.size_lanes({0:3, 2:0}) == pytest.approx([7.2, 2.4, 2.4])
+    assert table.y_value_in_cm_for_segment(business='Client', segment='Mainstream') == pytest.approx(11.2)
+    assert table.y_value_in_cm_for_major_column_minor_column(major_value='Datacenter', \
+        minor_value='Compute') == pytest.approx(13.6)
+
+def test_swimlanes_grid_row_index():
+    h = OrderedDict([('Client', OrderedDict([('Entry', 'Entry'), ('Mainstream', 'Mainstream')])), \
+        ('Datacenter', OrderedDict([('Compute', 'Compute')]))])
+    grid = rp.SwimlanesGrid(hierarchy=h, major_column_name='Business', minor_column_name='Segment')
+    assert grid.row_index_for_major_column_minor_column('Datacenter', 'Compute') == 2
+    grid = rp.SwimlanesGrid(hierarchy=h, major_column_name='Business', minor_column_name='Segment', \
+        row_index={('Client', 'Entry'):0, ('Client', 'Mainstream'):0, ('Datacenter', 'Compute'):1})
+    assert grid.row_index_for_business_segment('Client', 'Mainstream') == 0
+    with pytest.raises(KeyError):
+        grid.row_index_for_business_segment('Client', 'Other')
+
+def test_ww_to_slide_x_cm_array():
+    grid = rp.CanvasGrid(start_ww=iw.WW(ww=5, year=20), end_ww=iw.WW(ww=40, year=21))
+    canvas = rp.RoadmapCanvas(grid=grid)
+
+    wws = [iw.WW(ww=1, year=20), iw.WW(ww=30, year=20), iw.WW(ww=53, year=20), iw.WW(ww=52, year=21)]
+    xs = canvas.ww_to_slide_x_cm(wws)
+    assert xs.tolist() == [canvas.ww_to_slide_x_cm(ww) for ww in wws]
+    assert xs[0] == canvas.canvas_left_edge_cm
+    assert xs.tolist() == canvas.ww_to_slide_x_cm(rp.ww_ordinals(wws)).tolist()
+
+    ### Outside of the window / missing
+    outside = [iw.WW(ww=52, year=19), None, iw.WW(ww=1, year=22)]
+    assert np.isnan(canvas.ww_to_slide_x_cm(outside)).all()
+    clamped = canvas.ww_to_slide_x_cm(outside, out_of_window=rp.OUT_OF_WINDOW_CLAMP)
+    assert clamped[0] == canvas.canvas_left_edge_cm
+    assert np.isnan(clamped[1])
+    assert clamped[2] == canvas.ww_to_slide_x_cm(grid.right_edge_ww)
+    with pytest.raises(KeyError):
+        canvas.ww_to_slide_x_cm(outside, out_of_window=rp.OUT_OF_WINDOW_RAISE)
+    with pytest.raises(KeyError):
+        canvas.ww_to_slide_x_cm(outside[0])
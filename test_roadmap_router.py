@@ -0,0 +1,43 @@
+"""
+test_roadmap_router.py
+
+Tests for the roadmap_router.py grid index and connector routing
+"""
+
+import roadmap_router as rtr
+
+def lane_index(bars):
+    """
+    bars - (left, top, width) of 0.4cm high program bars
+    """
+    index = rtr.GridIndex()
+    for left, top, width in bars:
+        index.insert(left_cm=left, top_cm=top, width_cm=width, height_cm=0.4)
+    return index
+
+def test_grid_index_query():
+    index = lane_index([(0.0, 0.0, 10.0), (12.0, 0.0, 1.0), (0.0, 5.0, 1.0)])
+    assert len(index) == 3
+    assert len(index.query(rtr.Box(left=9.5, top=0.1, right=12.5, bottom=0.2))) == 2
+    assert index.query(rtr.Box(left=10.5, top=0.1, right=11.5, bottom=0.2)) == []
+    ### Only the cells the box covers are looked at
+    assert len(index.query(rtr.Box(left=0.0, top=4.9, right=0.5, bottom=5.1))) == 1
+
+def test_route_clear_path_is_straight():
+    index = lane_index([(0.0, 0.0, 10.0), (0.0, 3.0, 10.0)])
+    assert rtr.route(index=index, x1=5.0, y1=0.2, x2=5.0, y2=3.2) == [(5.0, 0.2), (5.0, 3.2)]
+
+def test_route_goes_around_bars():
+    ### A bar in the lane between the start and end of the connector
+    index = lane_index([(0.0, 0.0, 10.0), (2.0, 1.5, 6.0), (0.0, 3.0, 10.0)])
+    points = rtr.route(index=index, x1=5.0, y1=0.2, x2=5.0, y2=3.2)
+
+    assert points[0] == (5.0, 0.2) and points[-1] == (5.0, 3.2)
+    assert len(points) == 6
+    for (x1, y1), (x2, y2) in zip(points[:-1], points[1:]):
+        assert x1 == x2 or y1 == y2     ### Orthogonal
+    ### The vertical channel is beside the blocking bar
+    channel_x = points[2][0]
+    assert channel_x < 2.0 or channel_x > 8.0
+    assert rtr.blocking_boxes(index=index, points=points[1:-1], \
+        ignore=index.query(rtr.Box(5.0, 0.2, 5.0, 0.2)) + index.query(rtr.Box(5.0, 3.2, 5.0, 3.2))) == []
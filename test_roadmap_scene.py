@@ -0,0 +1,38 @@
+"""
+test_roadmap_scene.py
+
+Tests for the roadmap_scene.py Scene
+"""
+
+from pptx.util import Cm
+
+import roadmap_scene as scn
+
+def test_scene_layout():
+    scene = scn.Scene()
+    bar = scene.add_shape(mso_shape='rect', left_cm=1.0, top_cm=2.0, width_cm=3.3, height_cm=0.4, \
+        adjustments=[1.0], style_id=2, z=1)
+    label = scene.add_text_box(left_cm=1.1, top_cm=2.0, width_cm=1.0, height_cm=0.4, text='A0', style_id=3)
+    again = scene.add_shape(mso_shape='rect', left_cm=5.0, top_cm=2.0, width_cm=1.0, height_cm=0.4, \
+        adjustments=(1.0,), text='A0', style_id=2)
+    line = scene.add_connector(x1_cm=4.0, y1_cm=3.0, x2_cm=1.0, y2_cm=1.0)
+    poly = scene.add_polyline(points_cm=[(1.0, 1.0), (1.0, 2.5), (3.0, 2.5)])
+
+    assert len(scene) == 5
+    assert scene.draw_order() == [label, again, line, poly, bar]
+    assert scene.draw_order(start=3) == [line, poly]
+
+    ### Same rounding as python-pptx
+    p = scene.primitive(bar)
+    assert (p.x, p.y, p.w, p.h) == (Cm(1.0), Cm(2.0), Cm(3.3), Cm(0.4))
+    assert p.text is None and p.geometry == ('rect', (1.0,))
+
+    ### Texts and geometries are interned
+    assert len(scene.texts) == 1 and len(scene.geometries) == 2
+
+    p = scene.primitive(line)
+    assert (p.x + p.w, p.y + p.h) == (Cm(1.0), Cm(1.0))
+    p = scene.primitive(poly)
+    assert (p.x, p.y, p.w, p.h) == (Cm(1.0), Cm(1.0), Cm(2.0), Cm(1.5))
+
+    assert scene.rows()[label] == ('text_box', Cm(1.1), Cm(2.0), Cm(1.0), Cm(0.4), 'A0', 3, 0)
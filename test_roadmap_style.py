@@ -0,0 +1,59 @@
+"""
+test_roadmap_style.py
+
+Tests for the roadmap_style.py style registry
+"""
+
+import pytest
+
+from lxml import etree
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.util import Pt
+
+import annotations as an
+import roadmap_pptx as rp
+import roadmap_style as rs
+
+def style_xml(shape):
+    """
+    Shape XML without the id / name / position that differ between shapes
+    """
+    element = etree.fromstring(etree.tostring(shape._element))
+    for tag in ['{*}nvSpPr', '{*}spPr/{*}xfrm']:
+        for child in element.findall(tag):
+            child.getparent().remove(child)
+    return etree.tostring(element)
+
+def test_style_ids_are_interned():
+    registry = rs.StyleRegistry()
+    first = registry.style_id(fill_rgb=RGBColor(1,2,3), font_size=Pt(8))
+    assert registry.style_id(fill_rgb=RGBColor(1,2,3), font_size=Pt(8)) == first
+    assert registry.style_id(fill_rgb=RGBColor(1,2,4), font_size=Pt(8)) != first
+    assert len(registry) == 2
+
+    text_format = an.dict_to_TextFormat({'font_rgb':'(0,0,128)', 'font_bold':'true', 'font_size':9})
+    overridden = registry.text_format_style_id(text_format=text_format, style_id=first)
+    assert registry.style(overridden).fill_rgb == RGBColor(1,2,3)
+    assert registry.style(overridden).font_rgb_color == RGBColor(0,0,128)
+    assert registry.style(overridden).font_size == Pt(9)
+    assert registry.style(overridden).font_bold == True
+    assert registry.text_format_style_id(text_format=an.TextFormat(font_underline=None), \
+        style_id=first) == first
+
+@pytest.mark.parametrize('add_shape', [rp.add_rounded_rectangle_marker, rp.add_text_box])
+def test_copied_style_matches_set_style(add_shape):
+    shapes = Presentation().slides.add_slide(Presentation().slide_layouts[6]).shapes
+    kwargs = dict(width_cm=2.0, fill_rgb=RGBColor(128,0,0), line_rgb=RGBColor(0,0,0), \
+        font_name='Arial', font_size=Pt(7), font_rgb_color=RGBColor(255,255,255), font_bold=True)
+
+    rs.STYLES._fragments.clear()
+    first = add_shape(shapes=shapes, left_cm=1.0, top_cm=1.0, text='A', **kwargs)
+    second = add_shape(shapes=shapes, left_cm=5.0, top_cm=2.0, text='A', **kwargs)
+    third = add_shape(shapes=shapes, left_cm=5.0, top_cm=2.0, text='Other', **kwargs)
+
+    assert style_xml(first) == style_xml(second)
+    assert third.text_frame.text == 'Other'
+    assert third.text_frame.paragraphs[0].font.bold == True
+    assert third.fill.fore_color.rgb == RGBColor(128,0,0)
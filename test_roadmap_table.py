@@ -0,0 +1,193 @@
+"""
+test_roadmap_table.py
+
+Tests for the roadmap_table.py classes and helper functions
+"""
+
+import pytest
+
+import numpy as np
+import pandas as pd
+import intel_ww as iw
+import roadmap_table as rt
+
+def golden_doc_df():
+    return pd.DataFrame({
+        rt.BUSINESS:[rt.CLIENT, rt.CLIENT, rt.CLIENT, rt.DATACENTER],
+        rt.SEGMENT:['Entry', 'Entry', 'Entry', 'Compute'],
+        rt.SPEED_ID:[1, 2, 3, 4],
+        rt.FULL_NAME_IN_SPEED_ATLAS:['Prod A', 'Die A', 'Prod B', 'Prod C'],
+        rt.TYPE:[rt.SI_PRODUCT, rt.DIE, rt.SI_PRODUCT, rt.SI_PRODUCT],
+        rt.CHILD_COMPONENTS:['Die: Die A', None, None, None],
+        rt.A0_TI:[None, "10'21", "20'21", "30'21"],
+        rt.PRQ:["40'22", None, "10'23", "20'23"],
+        })
+
+def write_golden_doc(path, df):
+    with pd.ExcelWriter(path) as writer:
+        df.to_excel(writer, sheet_name='Roadmap', index=False)
+    return path
+
+def test_reload_no_changes(tmp_path):
+    path = write_golden_doc(tmp_path / 'gd.xlsx', golden_doc_df())
+    table = rt.RoadmapTable(path_to_roadmap=path)
+
+    changes = table.reload()
+    assert changes.is_empty()
+    assert table.version == 0
+
+def test_reload_applies_row_changes(tmp_path):
+    df = golden_doc_df()
+    path = write_golden_doc(tmp_path / 'gd.xlsx', df)
+    table = rt.RoadmapTable(path_to_roadmap=path)
+
+    df.loc[df[rt.SPEED_ID] == 2, rt.A0_TI] = "12'21"      ## Die under Prod A
+    df = df.loc[df[rt.SPEED_ID] != 4]                      ## Delete Prod C
+    df = pd.concat([df, pd.DataFrame({rt.BUSINESS:[rt.CLIENT], rt.SEGMENT:['Entry'], rt.SPEED_ID:[5], \
+        rt.FULL_NAME_IN_SPEED_ATLAS:['Prod D'], rt.TYPE:[rt.SI_PRODUCT], rt.A0_TI:["1'22"], rt.PRQ:["1'23"]})])
+    write_golden_doc(path, df)
+
+    changes = table.reload()
+    assert changes.updated == {2}
+    assert changes.deleted == {4}
+    assert changes.inserted == {5}
+    assert changes.products == {'Prod A', 'Prod C', 'Prod D'}
+    assert not changes.full_reload
+    assert table.version == 1
+    assert list(table.df[rt.SPEED_ID]) == [1, 2, 3, 5]
+    assert table.by_speed_id(2)[rt.A0_TI].values[0] == "12'21"
+
+def test_reload_affected_products_match_exact_child_names(tmp_path):
+    df = golden_doc_df()
+    df.loc[0, rt.CHILD_COMPONENTS] = 'Die: Die AX'          ## Not Die A
+    df.loc[2, rt.CHILD_COMPONENTS] = 'Die: Other [2]'       ## Die A by its [id]
+    path = write_golden_doc(tmp_path / 'gd.xlsx', df)
+    table = rt.RoadmapTable(path_to_roadmap=path)
+
+    df.loc[df[rt.SPEED_ID] == 2, rt.A0_TI] = "12'21"
+    write_golden_doc(path, df)
+
+    changes = table.reload()
+    assert changes.updated == {2}
+    assert changes.products == {'Prod B'}
+
+def test_reload_column_change_is_full_reload(tmp_path):
+    df = golden_doc_df()
+    path = write_golden_doc(tmp_path / 'gd.xlsx', df)
+    table = rt.RoadmapTable(path_to_roadmap=path)
+
+    df[rt.COMMENTS] = 'new column'
+    write_golden_doc(path, df)
+
+    changes = table.reload()
+    assert changes.full_reload
+    assert rt.COMMENTS in table.df.columns
+
+def test_manage_sheets_combine(tmp_path):
+    path = tmp_path / 'bu.xlsx'
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({'Name':['a','b'], 'PRQ':["1'22","2'22"]}).to_excel(writer, sheet_name='Client', index=False)
+        pd.DataFrame({'Name':['c'], 'A0 TI':["3'21"]}).to_excel(writer, sheet_name='Datacenter', index=False)
+
+    for pool in [rt.THREAD_POOL, rt.PROCESS_POOL]:
+        df_list, sheet_names = rt.manage_sheets(path, combine=True, pool=pool, max_workers=2)
+        assert sheet_names == ['Client', 'Datacenter']
+        assert len(df_list) == 1
+        df = df_list[0]
+        assert list(df.columns) == ['Name', 'PRQ', 'A0 TI', rt.SOURCE_SHEET]
+        assert list(df['Name']) == ['a', 'b', 'c']
+        assert list(df[rt.SOURCE_SHEET]) == ['Client', 'Client', 'Datacenter']
+        assert pd.isna(df['PRQ'].iloc[2])
+
+    with pytest.raises(ValueError):
+        rt.manage_sheets(path, combine=True, pool='bad')
+
+def test_col_tuple_predicates():
+    table = rt.RoadmapTable(df=golden_doc_df())
+
+    rows = table.rows_matching_col_tuples([(rt.BUSINESS, rt.CLIENT), (rt.TYPE, rt.SI_PRODUCT)])
+    assert list(rows[rt.SPEED_ID]) == [1, 3]
+
+    rows = table.rows_isin_col_tuples([(rt.BUSINESS, [rt.CLIENT, rt.DATACENTER]), (rt.SPEED_ID, [2, 4])])
+    assert list(rows[rt.SPEED_ID]) == [2, 4]
+    assert list(table.index_for_col_tuples([(rt.SPEED_ID, [2, 4])], op=rt.OP_ISIN)) == [1, 3]
+
+    ### Masks are reused until the table version changes
+    mask = table.column_mask(rt.BUSINESS, rt.CLIENT)
+    assert table.column_mask(rt.BUSINESS, rt.CLIENT) is mask
+    assert not mask.flags.writeable
+    table.version = table.version + 1
+    assert table.column_mask(rt.BUSINESS, rt.CLIENT) is not mask
+
+    with pytest.raises(ValueError):
+        table.column_mask(rt.BUSINESS, rt.CLIENT, op='<')
+
+def test_window_mask():
+    df = golden_doc_df()
+    df.loc[3, rt.A0_TI] = '+2Q'         ## Relative dates can't be culled
+    table = rt.RoadmapTable(df=df)
+    milestone_columns = [rt.A0_TI, rt.PRQ, 'Not A Column']
+
+    first, last = table.milestone_ordinal_span(milestone_columns)
+    ### Prod A's A0 comes from its child Die A
+    assert first[0] == last[1] == iw.WW(ww=10, year=21).ordinal()
+    assert last[0] == iw.WW(ww=40, year=22).ordinal()
+    assert first[2] == iw.WW(ww=20, year=21).ordinal()
+    assert last[2] == iw.WW(ww=10, year=23).ordinal()
+    assert first[3] == -np.inf and last[3] == np.inf
+
+    mask = table.window_mask(start_ww=iw.WW(ww=1, year=23), end_ww=iw.WW(ww=52, year=24), \
+        milestone_columns=milestone_columns)
+    assert list(mask) == [False, False, True, True]
+
+    mask = table.window_mask(start_ww=iw.WW(ww=1, year=19), end_ww=iw.WW(ww=1, year=20), \
+        milestone_columns=milestone_columns)
+    assert list(mask) == [False, False, False, True]
+
+def test_window_mask_keeps_child_filled_products():
+    df = golden_doc_df()
+    df.loc[0, rt.PRQ] = "40'23"
+    table = rt.RoadmapTable(df=df)
+
+    ### Only Prod A's child filled A0 (10'21) is in the window
+    mask = table.window_mask(start_ww=iw.WW(ww=1, year=21), end_ww=iw.WW(ww=15, year=21), \
+        milestone_columns=[rt.A0_TI, rt.PRQ])
+    assert list(mask) == [True, True, False, False]
+
+    ### Relative child dates can't be resolved - the parent is kept
+    df.loc[1, rt.A0_TI] = '+1Q'
+    first, last = rt.RoadmapTable(df=df).milestone_ordinal_span([rt.A0_TI, rt.PRQ])
+    assert first[0] == -np.inf and last[0] == np.inf
+
+def test_children_speed_ids():
+    df = golden_doc_df()
+    df.loc[0, rt.CHILD_COMPONENTS] = 'Die: Die A\nDie: Missing Die\nGCD Die: Other [77]'
+    table = rt.RoadmapTable(df=df)
+
+    assert table.children_speed_ids(df.loc[0, rt.CHILD_COMPONENTS]) == [2, 77]
+    assert table.children_speed_ids(None) == []
+
+    children = table.children_table()
+    assert list(children[rt.CHILD_SPEED_ID].fillna(-1)) == [2, -1, 77]
+
+def test_annotation_store():
+    a_df = pd.DataFrame({rt.COMMAND_COL:['SLIP', 'inlinewws', None, 'OTHER'], \
+        rt.A:['Prod A', 'Client', None, 'Prod C'], rt.B:['A0', 'Entry', None, 'x'], \
+        rt.C:['Prod B', 'Prod A', None, 'Prod B'], rt.D:['A0', None, None, None], \
+        rt.VALUE_STRING:[None, None, None, '{}']})
+    store = rt.AnnotationStore(a_df=a_df)
+
+    assert len(store) == 4
+    assert list(store.commands) == ['SLIP', 'INLINEWWS', '', 'OTHER']
+    assert store.rows_for_product('Prod A') == [0, 1]
+    assert store.rows_for_product(' Prod B ') == [0, 3]
+    assert store.rows_for_product('Client') == []
+    assert store.rows_owned_by('Prod A') == [0, 1]
+    assert store.rows_owned_by('Prod B') == []
+    assert store.rows_owned_by('Prod C') == [3]
+    assert store.row(3)[rt.VALUE_STRING] == '{}'
+
+    table = rt.RoadmapTable(df=golden_doc_df())
+    table.a_df = a_df
+    assert table.annotation_store() is table.annotation_store()
+    assert table.annotations_list()[0][rt.C] == 'Prod B'
@@ -0,0 +1,105 @@
+"""
+test_roadmap_template.py
+
+Tests for the parse-once template cache
+"""
+
+import os
+
+import pytest
+from pptx import Presentation
+
+import roadmap_template as rtm
+
+@pytest.fixture
+def template_path(tmp_path):
+    path = str(tmp_path / 'template.pptx')
+    Presentation().save(path)
+    return path
+
+def test_presentations_are_independent(template_path, tmp_path):
+    cache = rtm.TemplateCache()
+    a = cache.presentation(template_path)
+    b = cache.presentation(template_path)
+    assert len(cache) == 1
+
+    slide = a.slides.add_slide(rtm.slide_layout(a, 'Blank'))
+    slide.shapes.add_textbox(0, 0, 100, 100).text_frame.text = 'only in a'
+    assert len(a.slides) == 1
+    assert len(b.slides) == 0
+    assert len(cache.presentation(template_path).slides) == 0
+
+    ### A copy saves like the template it came from
+    out_path = str(tmp_path / 'out.pptx')
+    a.save(out_path)
+    saved = Presentation(out_path)
+    assert saved.slides[0].slide_layout.name == 'Blank'
+    assert saved.slides[0].shapes[0].text_frame.text == 'only in a'
+    assert [l.name for l in saved.slide_layouts] == [l.name for l in Presentation(template_path).slide_layouts]
+
+def test_copies_of_template_slides_are_independent(tmp_path):
+    from PIL import Image
+    image_path = str(tmp_path / 'logo.png')
+    Image.new('RGB', (4, 4), (255, 0, 0)).save(image_path)
+    template_path = str(tmp_path / 'pictures.pptx')
+    pptx = Presentation()
+    pptx.slides.add_slide(pptx.slide_layouts[6]).shapes.add_picture(image_path, 0, 0)
+    pptx.save(template_path)
+
+    cache = rtm.TemplateCache()
+    a = cache.presentation(template_path)
+    b = cache.presentation(template_path)
+    a.slides[0].shapes.add_textbox(0, 0, 100, 100).text_frame.text = 'only in a'
+    a.slides[0].shapes[0].left = 1000
+    a.slide_layouts[6].name = 'Renamed'
+    assert [len(p.slides[0].shapes) for p in [a, b, cache.presentation(template_path)]] == [2, 1, 1]
+    assert b.slides[0].shapes[0].left == 0
+    assert b.slide_layouts[6].name == 'Blank'
+
+    for name, p in [('a', a), ('b', b)]:
+        out_path = str(tmp_path / f'{name}.pptx')
+        p.save(out_path)
+        saved = Presentation(out_path).slides[0]
+        assert saved.shapes[0].image.blob == open(image_path, 'rb').read()
+    assert len(Presentation(str(tmp_path / 'a.pptx')).slides[0].shapes) == 2
+
+def test_template_reloaded_when_changed(template_path):
+    cache = rtm.TemplateCache()
+    template = cache.template(template_path)
+    assert cache.template(template_path) is template
+
+    changed = Presentation(template_path)
+    changed.slides.add_slide(changed.slide_layouts[0])
+    changed.save(template_path)
+    os.utime(template_path, (template.mtime + 10, template.mtime + 10))
+
+    assert cache.template(template_path) is not template
+    assert len(cache.presentation(template_path).slides) == 1
+
+def test_slide_layout():
+    pptx = Presentation()
+    assert rtm.slide_layout(pptx, 'Title Only').name == 'Title Only'
+    assert rtm.layout_index(pptx)['Title Slide'] == 0
+    with pytest.raises(KeyError):
+        rtm.slide_layout(pptx, 'No such layout')
+
+def test_duplicate_slide(tmp_path):
+    pptx = Presentation()
+    pptx.slides.add_slide(rtm.slide_layout(pptx, 'Title Only'))
+    slide = pptx.slides.add_slide(rtm.slide_layout(pptx, 'Blank'))
+    slide.shapes.add_textbox(0, 0, 100, 100).text_frame.text = 'background'
+    slide.background.fill.solid()
+
+    copy = rtm.duplicate_slide(pptx, slide, index=1)
+    assert [s.slide_id for s in pptx.slides][1] == copy.slide_id
+    assert copy.slide_layout.name == 'Blank'
+    assert [s.text_frame.text for s in copy.shapes] == ['background']
+    assert copy._element.cSld.bg is not None
+
+    ### The copy is independent of the slide it came from
+    copy.shapes.add_textbox(0, 0, 100, 100)
+    assert len(slide.shapes) == 1
+
+    path = str(tmp_path / 'out.pptx')
+    pptx.save(path)
+    assert [len(s.shapes) for s in Presentation(path).slides] == [1, 2, 1]
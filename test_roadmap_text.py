@@ -0,0 +1,50 @@
+"""
+test_roadmap_text.py
+
+Tests for the roadmap_text.py text measurement
+"""
+
+from array import array
+
+import pytest
+
+import roadmap_text as rtx
+
+@pytest.fixture
+def no_font_files(monkeypatch):
+    monkeypatch.setattr(rtx, 'FONT_DIRS', [])
+    monkeypatch.setenv(rtx.FONT_DIRS_ENV, '')
+    monkeypatch.setattr(rtx, '_metrics_cache', {})
+    rtx.text_width_pts.cache_clear()
+    yield
+    rtx.text_width_pts.cache_clear()
+
+def test_bundled_widths(no_font_files):
+    assert len(rtx.ARIAL_WIDTHS) == len(rtx.ARIAL_BOLD_WIDTHS) == ord('~') - ord(' ') + 1
+
+    metrics = rtx.font_metrics('Intel Clear', bold=True)
+    assert metrics.source == 'bundled'
+    assert rtx.font_metrics('Intel Clear', bold=True) is metrics
+
+    assert rtx.text_width_pts('A', 1000.0) == 667
+    assert rtx.text_width_pts('A', 1000.0, bold=True) == 722
+    assert rtx.text_width_pts('il', 10.0) == pytest.approx(4.44)
+    ### Widest line, characters outside the table get the default advance
+    assert rtx.text_width_pts('A\nAA\vA', 1000.0) == 2 * 667
+    assert rtx.text_width_pts('→', 1000.0) == rtx.DEFAULT_ADVANCE
+
+    assert rtx.text_width_cm('MMMM', 18.0) == pytest.approx(4 * 0.833 * 18.0 * 2.54 / 72.0)
+    assert rtx.text_width_pts.cache_info().currsize > 0
+
+def test_font_file_lookup(no_font_files, tmp_path, monkeypatch):
+    (tmp_path / 'arialbd.ttf').write_bytes(b'')
+    monkeypatch.setenv(rtx.FONT_DIRS_ENV, str(tmp_path))
+    monkeypatch.setattr(rtx, 'load_font_file', lambda path: array('H', [500] * 224))
+
+    assert rtx.find_font_file('Arial', bold=False) is None
+    assert rtx.find_font_file(' ARIAL ', bold=True) == str(tmp_path / 'arialbd.ttf')
+
+    ### Intel Clear isn't there - the Arial Bold file is used
+    metrics = rtx.font_metrics('Intel Clear', bold=True)
+    assert metrics.source == str(tmp_path / 'arialbd.ttf')
+    assert rtx.text_width_pts('AB', 10.0, font_name='Intel Clear', bold=True) == 10.0